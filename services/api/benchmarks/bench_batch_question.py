@@ -0,0 +1,92 @@
+"""Vazão de /question/batch vs uma chamada de /question/ por pergunta, e o efeito do lote
+na latência das perguntas interativas.
+
+1. N perguntas enviadas uma a uma para /question/ (como um script de avaliação faria).
+2. As mesmas N perguntas em uma única chamada a /question/batch.
+3. Latência de /question/ com a API ociosa e com um lote de N perguntas em andamento.
+
+Uso (a partir de services/api):
+    python -m benchmarks.bench_batch_question --questions 50 --llm-latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.harness import configure_env, install_stubs, index_synthetic_corpus, percentile
+
+configure_env()
+
+import httpx  # noqa: E402
+
+from main import app  # noqa: E402
+
+
+def _questions(n: int, offset: int = 0):
+    return [f"motor bearing maintenance procedure step {offset + i}" for i in range(n)]
+
+
+async def _sequential(client: httpx.AsyncClient, questions) -> float:
+    start = time.perf_counter()
+    for question in questions:
+        (await client.post("/question/", json={"question": question})).raise_for_status()
+    return time.perf_counter() - start
+
+
+async def _batch(client: httpx.AsyncClient, questions) -> tuple:
+    # o ASGITransport do httpx entrega o corpo inteiro no fim, então só o tempo total é medido
+    start = time.perf_counter()
+    answers = 0
+    async with client.stream("POST", "/question/batch", json={"questions": questions}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line == "event: answer":
+                answers += 1
+            elif line.startswith("data: ") and '"detail"' in line:
+                raise RuntimeError(json.loads(line[6:])["detail"])
+    return time.perf_counter() - start, answers
+
+
+async def _interactive(client: httpx.AsyncClient, questions) -> list:
+    latencies = []
+    for question in questions:
+        start = time.perf_counter()
+        (await client.post("/question/", json={"question": question})).raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=50)
+    parser.add_argument("--interactive", type=int, default=10, help="perguntas interativas medidas no passo 3")
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    install_stubs(embed_latency=args.embed_latency, first_token_latency=args.llm_latency)
+    chunks = index_synthetic_corpus(documents=2, pages=5)
+    print(f"Corpus: {chunks} chunks; embedding {args.embed_latency * 1000:.0f}ms, LLM {args.llm_latency * 1000:.0f}ms")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        sequential = await _sequential(client, _questions(args.questions))
+        batch, answers = await _batch(client, _questions(args.questions, args.questions))
+        assert answers == args.questions, answers
+        print(f"\n{args.questions} perguntas")
+        print(f"  uma chamada por pergunta: {sequential:7.2f}s  {args.questions / sequential:7.1f} perguntas/s")
+        print(f"  /question/batch:          {batch:7.2f}s  {args.questions / batch:7.1f} perguntas/s")
+
+        idle = await _interactive(client, _questions(args.interactive, 2 * args.questions))
+        batch_task = asyncio.create_task(_batch(client, _questions(args.questions, 3 * args.questions)))
+        await asyncio.sleep(args.embed_latency)
+        busy = await _interactive(client, _questions(args.interactive, 4 * args.questions))
+        await batch_task
+
+    print(f"\n/question/ interativo ({args.interactive} perguntas)")
+    print(f"  API ociosa:         p50 {percentile(idle, 50) * 1000:6.0f}ms  p95 {percentile(idle, 95) * 1000:6.0f}ms")
+    print(f"  com lote em curso:  p50 {percentile(busy, 50) * 1000:6.0f}ms  p95 {percentile(busy, 95) * 1000:6.0f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
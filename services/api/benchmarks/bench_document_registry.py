@@ -0,0 +1,106 @@
+"""Consultas de inventário: registro de documentos (SQLite) vs varredura da metadata do Chroma.
+
+Indexa `--documents` documentos com `--chunks-per-document` chunks cada e mede, por
+consulta, o p50 de:
+
+1. chunks de um documento (antes: `where={"source": ...}` no Chroma);
+2. documento já indexado pelo hash do conteúdo (antes: `where={"content_hash": ...}`);
+3. uma página da listagem de documentos (antes: ler a metadata de todos os chunks).
+
+Uso (a partir de services/api):
+    python -m benchmarks.bench_document_registry --documents 200 --chunks-per-document 50
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, List
+
+from benchmarks.harness import configure_env, percentile
+
+configure_env()
+
+from langchain_core.documents import Document  # noqa: E402
+
+from benchmarks.stubs import StubEmbeddings  # noqa: E402
+from benchmarks.synthetic_pdf import make_text_lines  # noqa: E402
+from libs.services import vector_service  # noqa: E402
+from libs.services.document_service import list_documents  # noqa: E402
+from libs.utils.envs import COLLECTION_NAME  # noqa: E402
+
+
+def _index(documents: int, chunks_per_document: int, rng: random.Random) -> List[dict]:
+    registry = vector_service.get_document_registry()
+    records = []
+    for d in range(documents):
+        record = {
+            "collection": COLLECTION_NAME,
+            "id": str(uuid.UUID(int=d)),
+            "source": f"manual-{d}.pdf",
+            "content_hash": f"{d:064x}",
+            "total_chunks": chunks_per_document,
+            "uploaded_at": datetime.utcnow().isoformat(),
+        }
+        metadata = {"source": record["source"], "content_hash": record["content_hash"], "document_id": record["id"]}
+        ids = [f"doc-{d}-chunk-{c}" for c in range(chunks_per_document)]
+        docs = [Document(page_content=" ".join(make_text_lines(4, rng)), metadata=metadata) for _ in ids]
+        vector_service.add_documents(docs, ids=ids)
+        registry.register(record, ids)
+        records.append(record)
+    return records
+
+
+def _p50_ms(call: Callable, args_list: list) -> float:
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        call(*args)
+        timings.append(time.perf_counter() - start)
+    return percentile(timings, 50) * 1000
+
+
+def _scan_sources():
+    metadatas = vector_service._get_vector_store()._collection.get(include=["metadatas"])["metadatas"]
+    return sorted({metadata["source"] for metadata in metadatas})[:100]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--chunks-per-document", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vector_service._embeddings = StubEmbeddings(size=16)
+    records = _index(args.documents, args.chunks_per_document, rng)
+    registry = vector_service.get_document_registry()
+    sample = [rng.choice(records) for _ in range(args.queries)]
+    print(f"{args.documents} documentos, {args.documents * args.chunks_per_document} chunks; p50 por consulta (ms)")
+
+    rows = [
+        (
+            "chunks de um documento",
+            _p50_ms(vector_service.get_chunk_ids, [({"source": r["source"]},) for r in sample]),
+            _p50_ms(registry.chunk_ids, [(COLLECTION_NAME, r["id"]) for r in sample]),
+        ),
+        (
+            "documento pelo hash",
+            _p50_ms(vector_service.get_chunk_ids, [({"content_hash": r["content_hash"]},) for r in sample]),
+            _p50_ms(registry.find_by_hash, [(COLLECTION_NAME, r["content_hash"]) for r in sample]),
+        ),
+        (
+            "listagem (100 documentos)",
+            _p50_ms(_scan_sources, [()] * min(args.queries, 10)),
+            _p50_ms(list_documents, [(None, 100, 0)] * args.queries),
+        ),
+    ]
+    print(f"{'consulta':>26} {'Chroma':>9} {'registro':>9}")
+    for name, chroma_ms, registry_ms in rows:
+        print(f"{name:>26} {chroma_ms:>9.2f} {registry_ms:>9.3f}  ({chroma_ms / registry_ms:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Pico de memória (RSS) da ingestão em função do tamanho do PDF.
+
+Compara o caminho em streaming (páginas -> splitter incremental) com o caminho antigo,
+que monta o texto inteiro antes de dividir. Com --index os chunks também passam pelos
+embeddings (stub) e são gravados no Chroma. Cada medição roda em um subprocesso próprio,
+porque o pico de RSS só cresce dentro de um processo.
+
+Uso (a partir de services/api):
+    python -m benchmarks.bench_ingest_memory --pages 50 200 400 [--index]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.harness import peak_rss_mib
+from benchmarks.synthetic_pdf import make_pdf
+
+
+def _child(mode: str, path: str, index: bool):
+    from benchmarks.harness import configure_env, install_stubs
+
+    configure_env()
+    install_stubs()
+
+    from fastapi import UploadFile
+    from langchain_core.documents import Document
+    from starlette.datastructures import Headers
+
+    from libs.services.document_service import process_document
+    from libs.services.pdf_service import extract_text_from_pdf, iter_pdf_pages
+    from libs.services.vector_service import add_documents, get_chunk_ids, get_text_splitter, iter_split_pages
+
+    if index:
+        get_chunk_ids({"source": "doc.pdf"})  # abre o Chroma e o BM25 antes da linha de base
+    baseline = peak_rss_mib()
+
+    with open(path, "rb") as fh:
+        file = UploadFile(file=fh, filename="doc.pdf", headers=Headers({"content-type": "application/pdf"}))
+        if mode == "streaming" and index:
+            chunks = process_document(file).total_chunks
+        elif mode == "streaming":
+            chunks = sum(1 for _ in iter_split_pages(iter_pdf_pages(file), {"source": "doc.pdf"}))
+        else:
+            text = extract_text_from_pdf(file)
+            docs = get_text_splitter().split_documents([Document(page_content=text, metadata={"source": "doc.pdf"})])
+            chunks = add_documents(docs) if index else len(docs)
+
+    print(f"{baseline:.1f} {peak_rss_mib():.1f} {chunks}")
+
+
+def _measure(mode: str, path: str, index: bool) -> tuple:
+    command = [sys.executable, "-m", "benchmarks.bench_ingest_memory", "--child", mode, path]
+    if index:
+        command.append("--index")
+    out = subprocess.run(command, capture_output=True, text=True, check=True)
+    baseline, peak, chunks = out.stdout.split()
+    return float(baseline), float(peak), int(chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200, 400])
+    parser.add_argument("--lines-per-page", type=int, default=40)
+    parser.add_argument("--index", action="store_true", help="inclui embeddings (stub) e gravação no Chroma/BM25")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child, args.index)
+        return
+
+    print(f"{'páginas':>8} {'KiB':>7} {'chunks':>7} {'streaming MiB':>14} {'texto inteiro MiB':>18}")
+    for pages in args.pages:
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(make_pdf(pages, args.lines_per_page))
+        try:
+            size_kib = os.path.getsize(tmp.name) / 1024
+            results = {mode: _measure(mode, tmp.name, args.index) for mode in ("streaming", "legacy")}
+        finally:
+            os.unlink(tmp.name)
+        stream_base, stream_peak, chunks = results["streaming"]
+        legacy_base, legacy_peak, _ = results["legacy"]
+        print(
+            f"{pages:>8} {size_kib:>7.0f} {chunks:>7} "
+            f"{stream_peak - stream_base:>14.1f} {legacy_peak - legacy_base:>18.1f}"
+        )
+    print("MiB = pico de RSS acima da linha de base do processo (após os imports)")
+    if args.index:
+        print("com --index o pico inclui o crescimento do próprio índice (HNSW do Chroma e BM25 em memória)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Throughput da extração de PDF (páginas/s) em função do número de workers.
+
+Uso (a partir de services/api):
+    python -m benchmarks.bench_pdf_extraction --pages 200 --workers 1 2 4
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.synthetic_pdf import make_pdf
+from libs.providers.pdf_backends import PdfTextReader
+from libs.services.pdf_service import _extract_page, _iter_pages_parallel
+
+
+def _sequential(path: str) -> int:
+    with PdfTextReader(path) as reader:
+        return sum(1 for index in range(reader.page_count) if _extract_page(reader, index)[0])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--lines-per-page", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers_list = args.workers or sorted({1, 2, 4, cpus})
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(make_pdf(args.pages, args.lines_per_page))
+    path = tmp.name
+
+    try:
+        print(f"PDF sintético: {args.pages} páginas, {os.path.getsize(path) / 1024:.0f} KiB, {cpus} CPUs")
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            _sequential(path)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        baseline = args.pages / elapsed
+        print(f"{'sequencial':>12}: {baseline:8.1f} páginas/s")
+
+        for workers in workers_list:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                list(_iter_pages_parallel(path, args.pages, pool, workers))  # aquece os processos
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    list(_iter_pages_parallel(path, args.pages, pool, workers))
+                elapsed = (time.perf_counter() - start) / args.repeat
+            rate = args.pages / elapsed
+            print(f"{workers:>4} workers: {rate:8.1f} páginas/s  ({rate / baseline:.2f}x)")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
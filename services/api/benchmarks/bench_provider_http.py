@@ -0,0 +1,170 @@
+"""Cliente novo por chamada vs pool de conexões compartilhado, contra um servidor HTTPS local
+que imita a API da OpenAI.
+
+O servidor espera `--connect-latency` a cada conexão nova antes do handshake TLS, para
+simular os round-trips de TCP + TLS até o provider, e `--latency` em cada resposta.
+
+1. `OpenAI(...)` criado a cada chamada, como o `llm_provider` fazia.
+2. `llm_provider.generate_answer`, que agora usa o cliente compartilhado.
+3. `ChatOpenAI` com os pools compartilhados, em chamadas concorrentes.
+
+Uso (a partir de services/api):
+    python -m benchmarks.bench_provider_http --calls 50 --connect-latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.harness import configure_env, percentile
+
+_COMPLETION = {
+    "id": "bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11},
+}
+
+
+def _serve(cert_dir: str, connect_latency: float, latency: float) -> ThreadingHTTPServer:
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(os.path.join(cert_dir, "cert.pem"), os.path.join(cert_dir, "key.pem"))
+    connections = {"count": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # cabeçalho e corpo saem em writes separados; sem isso o Nagle soma ~40ms por resposta
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            connections["count"] += 1
+            time.sleep(connect_latency)
+            self.request = context.wrap_socket(self.request, server_side=True)
+            super().setup()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            body = json.dumps(_COMPLETION).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.connections = connections
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _certificate(cert_dir: str):
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+            "-keyout", os.path.join(cert_dir, "key.pem"), "-out", os.path.join(cert_dir, "cert.pem"),
+        ],
+        capture_output=True, check=True,
+    )
+
+
+def _timed(calls: int, call) -> list:
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _report(name: str, latencies: list, connections: int):
+    print(
+        f"  {name:<34} p50 {percentile(latencies, 50) * 1000:6.1f}ms  p95 {percentile(latencies, 95) * 1000:6.1f}ms"
+        f"  total {sum(latencies):6.2f}s  conexões {connections:>4}"
+    )
+
+
+async def _concurrent(llm, calls: int, concurrency: int) -> float:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with slots:
+            await llm.ainvoke("ping")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--connect-latency", type=float, default=0.05, help="espera por conexão nova (TCP + TLS)")
+    parser.add_argument("--latency", type=float, default=0.01, help="tempo de resposta do provider")
+    args = parser.parse_args()
+
+    cert_dir = tempfile.mkdtemp(prefix="rag-http-")
+    _certificate(cert_dir)
+    server = _serve(cert_dir, args.connect_latency, args.latency)
+    # os clientes do SDK leem URL e certificado do ambiente
+    configure_env(
+        OPENAI_BASE_URL=f"https://127.0.0.1:{server.server_address[1]}/v1",
+        SSL_CERT_FILE=os.path.join(cert_dir, "cert.pem"),
+    )
+
+    from loguru import logger
+    from openai import OpenAI
+
+    from libs.providers import llm_provider
+    from libs.providers.http_clients import get_pool_stats, openai_client_kwargs
+
+    # generate_answer loga cada etapa em INFO
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    print(
+        f"{args.calls} chamadas; conexão nova {args.connect_latency * 1000:.0f}ms, "
+        f"resposta {args.latency * 1000:.0f}ms"
+    )
+
+    def per_call_client():
+        OpenAI(api_key="bench").chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "ping"}]
+        )
+
+    before = server.connections["count"]
+    _report("cliente novo por chamada", _timed(args.calls, per_call_client), server.connections["count"] - before)
+
+    before = server.connections["count"]
+    latencies = _timed(args.calls, lambda: llm_provider.generate_answer("ping", ["chunk"]))
+    _report("cliente compartilhado", latencies, server.connections["count"] - before)
+
+    from langchain_openai import ChatOpenAI
+
+    llm = ChatOpenAI(model="gpt-4o-mini", openai_api_key="bench", **openai_client_kwargs())
+    before = server.connections["count"]
+    elapsed = asyncio.run(_concurrent(llm, args.calls, args.concurrency))
+    print(
+        f"  {f'ChatOpenAI, {args.concurrency} simultâneas':<34}                            total {elapsed:6.2f}s  "
+        f"conexões {server.connections['count'] - before:>4}"
+    )
+    print(f"\npool: {json.dumps(get_pool_stats()['pools'])}")
+
+
+if __name__ == "__main__":
+    main()
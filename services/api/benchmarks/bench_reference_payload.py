@@ -0,0 +1,77 @@
+"""Tamanho e tempo de serialização da resposta de /question/ por TOP_K: referências com o
+texto completo de cada chunk (formato antigo) vs referências compactas com trecho.
+
+Os chunks têm CHUNK_SIZE caracteres de texto sintético; a serialização é a mesma que o
+FastAPI faz com o `response_model` (`model_dump_json` do pydantic).
+
+Uso (a partir de services/api):
+    python -m benchmarks.bench_reference_payload --top-k 10 50 100
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from benchmarks.harness import configure_env, percentile
+
+configure_env()
+
+from langchain_core.documents import Document  # noqa: E402
+from pydantic import BaseModel  # noqa: E402
+
+from benchmarks.synthetic_pdf import make_text_lines  # noqa: E402
+from libs.services.question_service import _references  # noqa: E402
+from libs.structures.question import QuestionResponse  # noqa: E402
+from libs.utils.envs import CHUNK_SIZE  # noqa: E402
+
+
+class _FullTextResponse(BaseModel):
+    answer: str
+    references: List[str]
+    prompt_tokens: int = 0
+    prompt_tokens_saved: int = 0
+
+
+def _docs(n: int, rng: random.Random) -> List[Document]:
+    docs = []
+    for i in range(n):
+        text = " ".join(make_text_lines(20, rng))[:CHUNK_SIZE]
+        metadata = {"source": f"manual-{i % 7}.pdf", "page_start": i + 1, "page_end": i + 2, "score": rng.random()}
+        docs.append(Document(id=f"chunk-{i}", page_content=text, metadata=metadata))
+    return docs
+
+
+def _serialize(response: BaseModel, repeat: int) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = response.model_dump_json()
+        timings.append(time.perf_counter() - start)
+    return len(body), percentile(timings, 50)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top-k", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    answer = " ".join(make_text_lines(5, rng))
+    print(f"CHUNK_SIZE={CHUNK_SIZE}")
+    print(f"{'top_k':>6} {'completo KiB':>13} {'compacto KiB':>13} {'completo µs':>12} {'compacto µs':>12}")
+    for top_k in args.top_k:
+        docs = _docs(top_k, rng)
+        full = _FullTextResponse(answer=answer, references=[doc.page_content for doc in docs])
+        compact = QuestionResponse(answer=answer, references=_references(docs))
+        full_bytes, full_s = _serialize(full, args.repeat)
+        compact_bytes, compact_s = _serialize(compact, args.repeat)
+        print(
+            f"{top_k:>6} {full_bytes / 1024:>13.1f} {compact_bytes / 1024:>13.1f} "
+            f"{full_s * 1e6:>12.0f} {compact_s * 1e6:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Latência ponta a ponta e tamanho do contexto com e sem reranking.
+
+Mesmo corpus do bench_retrieval (um código de peça único por chunk). Sem reranker vão
+TOP_K chunks para o LLM; com reranker são buscados RERANK_CANDIDATES e só RERANK_TOP_N
+seguem. O LLM stub tem latência proporcional ao tamanho do prompt, para que o custo de
+contextos maiores apareça na latência.
+
+Uso (a partir de services/api):
+    python -m benchmarks.bench_rerank --chunks 2000 --queries 100 --prompt-latency 0.5
+"""
+import argparse
+import random
+import time
+
+from benchmarks.harness import configure_env, install_stubs, percentile
+
+configure_env()
+
+from langchain_core.documents import Document  # noqa: E402
+
+from benchmarks.stubs import StubEmbeddings  # noqa: E402
+from benchmarks.synthetic_pdf import make_text_lines  # noqa: E402
+from libs.services import question_service, rerank_service, vector_service  # noqa: E402
+from libs.utils.envs import Reranker  # noqa: E402
+
+
+def _use_reranker(method: Reranker):
+    question_service.RERANKER = method
+    rerank_service.RERANKER = method
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--prompt-latency", type=float, default=0.5, help="segundos por 1000 tokens de prompt")
+    parser.add_argument("--rerankers", nargs="+", default=[r.value for r in Reranker])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    install_stubs(prompt_latency=args.prompt_latency)
+    rng = random.Random(args.seed)
+    vector_service._embeddings = StubEmbeddings(size=args.dim)
+
+    codes = rng.sample(range(100000, 999999), args.chunks)
+    docs, ids = [], []
+    for i, code in enumerate(codes):
+        text = " ".join(make_text_lines(6, rng)) + f" Part number PX{code} rated for continuous duty."
+        docs.append(Document(page_content=text, metadata={"source": "bench"}))
+        ids.append(f"chunk-{i}")
+    for start in range(0, len(docs), 500):
+        vector_service.add_documents(docs[start:start + 500], ids=ids[start:start + 500])
+
+    targets = rng.sample(range(args.chunks), min(args.queries, args.chunks))
+    queries = [(f"What is the rated duty of part PX{codes[i]}?", f"chunk-{i}") for i in targets]
+    print(f"Corpus: {args.chunks} chunks, {len(queries)} perguntas, prompt a {args.prompt_latency}s/1000 tokens")
+    print(f"{'reranker':>14} {'p50 ms':>8} {'p95 ms':>8} {'chunks':>7} {'tokens':>7} {'acerto':>7}")
+
+    for method in map(Reranker, args.rerankers):
+        _use_reranker(method)
+        latencies, chunks, tokens, hits = [], 0, 0, 0
+        for question, chunk_id in queries:
+            start = time.perf_counter()
+            _, references, usage = question_service.process_question(question)
+            latencies.append((time.perf_counter() - start) * 1000)
+            chunks += len(references)
+            tokens += usage["prompt_tokens"]
+            hits += any(reference["chunk_id"] == chunk_id for reference in references)
+        n = len(queries)
+        print(
+            f"{method.value:>14} {percentile(latencies, 50):>8.0f} {percentile(latencies, 95):>8.0f} "
+            f"{chunks / n:>7.1f} {tokens / n:>7.0f} {hits / n:>7.2f}"
+        )
+    print("acerto = fração das perguntas em que o chunk com o código foi para o prompt")
+
+
+if __name__ == "__main__":
+    main()
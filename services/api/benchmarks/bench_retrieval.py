@@ -0,0 +1,68 @@
+"""Recall@k e latência: busca só vetorial vs híbrida (BM25 + vetor com RRF).
+
+O corpus sintético tem um código de peça único por chunk; cada consulta pergunta por
+um código e o chunk relevante é o que o contém. Os embeddings stub têm poucas
+dimensões para imitar a perda de termos exatos dos embeddings reais.
+
+Uso (a partir de services/api):
+    python -m benchmarks.bench_retrieval --chunks 2000 --queries 200
+"""
+import argparse
+import random
+import time
+
+from benchmarks.harness import configure_env
+
+configure_env()
+
+from langchain_core.documents import Document  # noqa: E402
+
+from benchmarks.stubs import StubEmbeddings  # noqa: E402
+from benchmarks.synthetic_pdf import make_text_lines  # noqa: E402
+from libs.services import vector_service  # noqa: E402
+from libs.utils.envs import RetrievalMode  # noqa: E402
+
+K_VALUES = (1, 3, 5, 10)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    embeddings = StubEmbeddings(size=args.dim)
+    vector_service._embeddings = embeddings
+
+    codes = rng.sample(range(100000, 999999), args.chunks)
+    docs, ids = [], []
+    for i, code in enumerate(codes):
+        text = " ".join(make_text_lines(6, rng)) + f" Part number PX{code} rated for continuous duty."
+        docs.append(Document(page_content=text, metadata={"source": "bench"}))
+        ids.append(f"chunk-{i}")
+    for start in range(0, len(docs), 500):
+        vector_service.add_documents(docs[start:start + 500], ids=ids[start:start + 500])
+
+    targets = rng.sample(range(args.chunks), min(args.queries, args.chunks))
+    queries = [(f"What is the rated duty of part PX{codes[i]}?", ids[i]) for i in targets]
+    print(f"Corpus: {args.chunks} chunks, {len(queries)} consultas, embeddings com {args.dim} dimensões")
+
+    for mode in (RetrievalMode.VECTOR, RetrievalMode.HYBRID):
+        hits = {k: 0 for k in K_VALUES}
+        elapsed = 0.0
+        for query, expected in queries:
+            embedding = embeddings.embed_query(query)
+            start = time.perf_counter()
+            result = [doc.id for doc in vector_service.retrieve(query, embedding, top_k=max(K_VALUES), mode=mode)]
+            elapsed += time.perf_counter() - start
+            for k in K_VALUES:
+                hits[k] += expected in result[:k]
+        recall = "  ".join(f"recall@{k}={hits[k] / len(queries):.2f}" for k in K_VALUES)
+        print(f"{mode.value:>7}: {recall}  latência média={elapsed / len(queries) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Latência da busca com e sem o cache de buscas, num tráfego com perguntas repetidas.
+
+As consultas seguem uma distribuição Zipf sobre `--distinct` perguntas, cada repetição
+com variações de caixa e espaços (a mesma chave depois da normalização). O embedding da
+pergunta tem `--embed-latency` segundos, como a chamada ao provider, e só é pago quando a
+busca não está em cache. Cenários: sem cache, só memória e memória + SQLite; no último,
+uma segunda rodada com a memória vazia imita outro worker do uvicorn lendo o disco.
+
+Uso (a partir de services/api):
+    python -m benchmarks.bench_retrieval_cache --chunks 20000 --requests 2000 --mode hybrid
+"""
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+
+from benchmarks.harness import configure_env, percentile
+
+
+def _variant(question: str, rng: random.Random) -> str:
+    words = question.split()
+    if rng.random() < 0.5:
+        words[0] = words[0].upper()
+    return ("  " if rng.random() < 0.3 else " ").join(words) + ("\n" if rng.random() < 0.2 else "")
+
+
+def _run(queries, top_k: int, mode: str) -> dict:
+    from libs.services import vector_service
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        vector_service.retrieve(query, top_k=top_k, mode=mode)
+        latencies.append(time.perf_counter() - start)
+    stats = vector_service.get_retrieval_cache_stats() or {}
+    return {
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "hit_rate": stats.get("hit_rate", 0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--distinct", type=int, default=300)
+    parser.add_argument("--zipf", type=float, default=1.1)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--mode", choices=("vector", "hybrid"), default="hybrid")
+    parser.add_argument("--backend", choices=("chroma", "numpy"), default="chroma")
+    parser.add_argument("--embed-latency", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data_dir = configure_env(VECTOR_BACKEND=args.backend, RETRIEVAL_CACHE_ENABLED="true")
+    from benchmarks.stubs import StubEmbeddings
+    from benchmarks.synthetic_pdf import make_text_lines
+    from libs.providers.retrieval_cache import RetrievalCache
+    from libs.services import vector_service
+
+    rng, np_rng = random.Random(args.seed), np.random.default_rng(args.seed)
+    vector_service._embeddings = StubEmbeddings(size=args.dim)
+    for offset in range(0, args.chunks, 5000):
+        size = min(5000, args.chunks - offset)
+        texts = [" ".join(make_text_lines(3, rng)) for _ in range(size)]
+        vector_service.upsert_chunks(
+            [f"chunk-{i}" for i in range(offset, offset + size)],
+            vector_service._embeddings.embed_documents(texts),
+            texts,
+            [{"source": f"manual-{i // 50}.pdf", "chunk_index": i % 50} for i in range(offset, offset + size)],
+        )
+    # a latência do provider só entra nas consultas
+    vector_service._embeddings.latency = args.embed_latency
+
+    questions = [" ".join(make_text_lines(1, rng)).rstrip(".") + "?" for _ in range(args.distinct)]
+    weights = 1 / np.arange(1, args.distinct + 1) ** args.zipf
+    picks = np_rng.choice(args.distinct, size=args.requests, p=weights / weights.sum())
+    queries = [_variant(questions[i], rng) for i in picks]
+    print(
+        f"{args.chunks} chunks, {args.requests} consultas ({len(set(picks))} distintas), modo {args.mode}, "
+        f"backend {args.backend}, embedding {args.embed_latency * 1000:.0f}ms"
+    )
+
+    path = os.path.join(data_dir, "retrieval_cache.sqlite3")
+    scenarios = [
+        ("sem cache", None),
+        ("memória", RetrievalCache(max_entries=10000)),
+        ("memória + disco", RetrievalCache(max_entries=10000, path=path, disk_max_entries=100000)),
+        # outro processo: memória vazia, mesmo arquivo
+        ("disco (outro worker)", RetrievalCache(max_entries=10000, path=path, disk_max_entries=100000)),
+    ]
+    print(f"{'cenário':>22} {'média ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'hit rate':>9}")
+    for name, cache in scenarios:
+        vector_service.RETRIEVAL_CACHE_ENABLED = cache is not None
+        vector_service._retrieval_cache = cache
+        result = _run(queries, args.top_k, args.mode)
+        print(
+            f"{name:>22} {result['mean_ms']:>9.2f} {result['p50_ms']:>8.2f} "
+            f"{result['p95_ms']:>8.2f} {result['hit_rate']:>9.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Throughput (chunks/s) de export e import de snapshots de collection, e o tamanho do arquivo.
+
+Gera uma collection com `--chunks` chunks (vetores gaussianos, texto sintético) gravados
+direto no store, exporta em float32 e em int8, e importa cada snapshot de volta na mesma
+collection (apagada antes), medindo o caminho completo: store, BM25 e registro. No fim
+compara os vetores dos dois snapshots: cosseno médio e recall@10 da busca exata sobre os
+primeiros `--recall-rows` chunks.
+
+Uso (a partir de services/api):
+    python -m benchmarks.bench_snapshot --chunks 1000000 --backend chroma
+"""
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+
+from benchmarks.harness import configure_env, peak_rss_mib
+
+_GENERATE_BATCH = 5000
+
+
+def _generate(chunks: int, dim: int, lines_per_chunk: int, seed: int) -> float:
+    from benchmarks.synthetic_pdf import make_text_lines
+    from libs.services.vector_service import upsert_chunks
+
+    rng, np_rng = random.Random(seed), np.random.default_rng(seed)
+    start = time.perf_counter()
+    for offset in range(0, chunks, _GENERATE_BATCH):
+        size = min(_GENERATE_BATCH, chunks - offset)
+        vectors = np_rng.normal(size=(size, dim)).astype(np.float32)
+        indexes = range(offset, offset + size)
+        upsert_chunks(
+            [f"chunk-{i}" for i in indexes],
+            vectors,
+            [" ".join(make_text_lines(lines_per_chunk, rng)) for _ in indexes],
+            [{"source": f"manual-{i // 50}.pdf", "chunk_index": i % 50} for i in indexes],
+        )
+    return time.perf_counter() - start
+
+
+def _vectors(path: str, rows: int) -> np.ndarray:
+    from libs.providers.snapshot_file import SnapshotReader
+
+    parts, total = [], 0
+    with open(path, "rb") as file:
+        for _, vectors, _, _ in SnapshotReader(file):
+            parts.append(vectors[:rows - total])
+            total += len(parts[-1])
+            if total >= rows:
+                break
+    return np.concatenate(parts)
+
+
+def _fidelity(exact_path: str, int8_path: str, rows: int, queries: int, seed: int):
+    exact, approx = _vectors(exact_path, rows), _vectors(int8_path, rows)
+    exact /= np.linalg.norm(exact, axis=1, keepdims=True)
+    approx /= np.linalg.norm(approx, axis=1, keepdims=True)
+    cosine = float(np.mean(np.sum(exact * approx, axis=1)))
+
+    rng = np.random.default_rng(seed)
+    probes = exact[rng.integers(0, len(exact), queries)] + rng.normal(scale=0.5 / np.sqrt(exact.shape[1]), size=(queries, exact.shape[1]))
+    expected = np.argsort(-(probes @ exact.T), axis=1)[:, :10]
+    found = np.argsort(-(probes @ approx.T), axis=1)[:, :10]
+    recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(expected, found)])
+    print(f"int8 vs float32 ({len(exact)} chunks): cosseno médio {cosine:.5f}, recall@10 {recall:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--backend", choices=("chroma", "numpy"), default="chroma")
+    parser.add_argument("--lines-per-chunk", type=int, default=3)
+    parser.add_argument("--recall-rows", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data_dir = configure_env(VECTOR_BACKEND=args.backend)
+    from benchmarks.stubs import StubEmbeddings
+    from libs.services import vector_service
+    from libs.services.snapshot_service import export_collection, import_collection
+
+    # os vetores vêm prontos; o stub só evita criar o cliente do provider ao abrir o store
+    vector_service._embeddings = StubEmbeddings(size=args.dim)
+    build_s = _generate(args.chunks, args.dim, args.lines_per_chunk, args.seed)
+    print(f"{args.chunks} chunks, dim={args.dim}, backend {args.backend}: gerados em {build_s:.1f}s")
+
+    paths = {quantization: os.path.join(data_dir, f"{quantization}.ragsnap") for quantization in ("none", "int8")}
+    exports = {}
+    for quantization, path in paths.items():
+        with open(path, "wb") as file:
+            exports[quantization] = export_collection(file, quantization=quantization)["seconds"]
+
+    print(f"{'vetores':>8} {'export/s':>10} {'arquivo MiB':>12} {'bytes/chunk':>12} {'import/s':>10}")
+    for quantization, path in paths.items():
+        vector_service.drop_collection(vector_service.resolve_collection())
+        with open(path, "rb") as file:
+            import_s = import_collection(file)["seconds"]
+        size = os.path.getsize(path)
+        print(
+            f"{'float32' if quantization == 'none' else quantization:>8} {args.chunks / exports[quantization]:>10.0f} "
+            f"{size / 2**20:>12.1f} {size / args.chunks:>12.0f} {args.chunks / import_s:>10.0f}"
+        )
+    print(f"pico de RSS: {peak_rss_mib():.0f} MiB")
+    _fidelity(paths["none"], paths["int8"], min(args.recall_rows, args.chunks), args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Tempo de boot, perfil de imports e latência da primeira requisição, com e sem warm-up.
+
+1. Roda `python -X importtime -c "import main"` e mostra o tempo total e os pacotes que
+   mais pesam; faz o mesmo com os clientes que agora só são importados no primeiro uso.
+2. Sobe a API em um processo novo, sobre um índice já gravado em disco, e mede o tempo
+   até o primeiro `/health` e a latência da primeira e da segunda pergunta, com
+   WARMUP_ON_STARTUP ligado (esperando `/health/ready`) e desligado.
+
+Uso (a partir de services/api):
+    python -m benchmarks.bench_startup --top 15
+"""
+import time
+
+_PROCESS_START = time.perf_counter()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+from collections import defaultdict  # noqa: E402
+
+from benchmarks.harness import configure_env  # noqa: E402
+
+_DEFERRED = ("langchain_openai", "langchain_ollama", "langchain_chroma", "langchain_text_splitters", "pdfplumber")
+
+
+def _importtime(statement: str, env: dict) -> tuple:
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    total = 0
+    by_package = defaultdict(int)
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue
+        by_package[name.split(".")[0]] += self_us
+        total += self_us
+    return total / 1000, sorted(by_package.items(), key=lambda item: item[1], reverse=True)
+
+
+def _child(data_dir: str, warmup: bool):
+    configure_env(data_dir, WARMUP_ON_STARTUP="true" if warmup else "false", PDF_EXTRACTION_WORKERS="1")
+
+    start = time.perf_counter()
+    import main
+    import_ms = (time.perf_counter() - start) * 1000
+
+    from fastapi.testclient import TestClient
+
+    from benchmarks.harness import install_stubs
+
+    install_stubs()
+    result = {"import_main_ms": round(import_ms)}
+    with TestClient(main.app) as client:
+        client.get("/health/").raise_for_status()
+        result["first_health_ms"] = round((time.perf_counter() - _PROCESS_START) * 1000)
+
+        if warmup:
+            start = time.perf_counter()
+            while client.get("/health/ready").status_code != 200:
+                time.sleep(0.01)
+            result["warmup_ms"] = round((time.perf_counter() - start) * 1000)
+
+        for name in ("first_question_ms", "second_question_ms"):
+            start = time.perf_counter()
+            client.post("/question/", json={"question": "motor bearing maintenance procedure"}).raise_for_status()
+            result[name] = round((time.perf_counter() - start) * 1000)
+    print(json.dumps(result))
+
+
+def _prepare_index(data_dir: str):
+    # processo separado: grava um índice pequeno em disco para os boots medidos abrirem
+    code = (
+        "from benchmarks.harness import configure_env, install_stubs, index_synthetic_corpus\n"
+        f"configure_env({data_dir!r}, PDF_EXTRACTION_WORKERS='1')\n"
+        "install_stubs()\n"
+        "print(index_synthetic_corpus(documents=2, pages=10))\n"
+    )
+    subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+
+def _boot(data_dir: str, warmup: bool) -> dict:
+    command = [sys.executable, "-m", "benchmarks.bench_startup", "--child", data_dir]
+    if warmup:
+        command.append("--warmup")
+    out = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--warmup", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.warmup)
+        return
+
+    data_dir = tempfile.mkdtemp(prefix="rag-startup-")
+    configure_env(data_dir)
+    env = dict(os.environ)
+
+    total, packages = _importtime("import main", env)
+    print(f"import main: {total:.0f}ms (soma do tempo próprio de cada módulo)")
+    for name, self_us in packages[:args.top]:
+        print(f"  {name:<28} {self_us / 1000:8.1f}ms")
+
+    deferred_total, deferred = _importtime(f"import main, {', '.join(_DEFERRED)}", env)
+    print(f"\nimports adiados para o warm-up / primeiro uso: +{deferred_total - total:.0f}ms")
+    baseline = dict(packages)
+    extra = sorted(((name, us - baseline.get(name, 0)) for name, us in deferred), key=lambda item: item[1], reverse=True)
+    for name, self_us in extra[:args.top]:
+        print(f"  {name:<28} {self_us / 1000:8.1f}ms")
+
+    _prepare_index(data_dir)
+    print(f"\n{'warm-up':>8} {'import main':>12} {'1º /health':>11} {'warm-up':>9} {'1ª pergunta':>12} {'2ª pergunta':>12}")
+    for warmup in (False, True):
+        result = _boot(data_dir, warmup)
+        print(
+            f"{'on' if warmup else 'off':>8} {result['import_main_ms']:>10}ms {result['first_health_ms']:>9}ms "
+            f"{str(result.get('warmup_ms', '-')) + ('ms' if warmup else ''):>9} "
+            f"{result['first_question_ms']:>10}ms {result['second_question_ms']:>10}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Equivalência e throughput (páginas/s) da limpeza de texto extraído do PDF.
+
+Antes de medir, compara `_clean_extracted_text` com a implementação anterior (copiada
+abaixo como referência) num conjunto de casos difíceis e em páginas aleatórias; qualquer
+diferença é mostrada no stderr e o script sai com código 1. Com `--check-only` só a
+comparação roda, para uso em CI.
+
+Uso (a partir de services/api):
+    python -m benchmarks.bench_text_cleaning --pages 500 --fuzz 20000
+    python benchmarks/bench_text_cleaning.py --check-only
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from typing import List
+
+if not __package__:
+    # executado como arquivo (python benchmarks/bench_text_cleaning.py): services/api no path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_pdf import make_text_lines
+from libs.services.pdf_service import _clean_extracted_text
+
+
+def _reference_clean(text: str) -> str:
+    if not text:
+        return ""
+
+    text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]', '', text)
+
+    text = re.sub(r'\(cid:\d+\)', '', text)
+    text = re.sub(r'[•]{3,}', '', text)
+    text = re.sub(r'[\.]{4,}', '...', text)
+
+    lines = text.split('\n')
+    cleaned_lines = []
+
+    for line in lines:
+        line = line.strip()
+
+        if not line:
+            continue
+
+        if line.isdigit():
+            continue
+
+        if len(line) < 3:
+            continue
+
+        if re.match(r'^[\s\W]+$', line):
+            continue
+
+        cleaned_lines.append(line)
+
+    text = '\n'.join(cleaned_lines)
+
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
+
+    return text.strip()
+
+
+_GOLDEN = [
+    "",
+    "\n\n\n",
+    "12\n345\n²³⁴\n٣٤٥\nab\n___\n-- \n...\n!!!",
+    "Sumário........ 12\nIntrodução.......... 3\nFim. ... ....",
+    "(cid:12)(cid:3)Texto (cid:) (cid:x1) com cid\n(ci\x01d:7)junto",
+    "••• lista\n•(cid:4)•• ponto\n•• dois •••• quatro",
+    "linha\r\ncom\tCRLF\r\n\x0cnova\x0bpágina\x85fim\x9f\x7f",
+    "espaços\xa0não\u2003quebráveis\u2028e separadores\u3000ok",
+    "Tensão nominal: 220 V ± 10%\nΩ Ω Ω\n日本語のテキスト\n😀😀😀",
+    "   \t indentado   \n\x00\x01\x02abc\x1c\x1d\x1e\x1f",
+    ".....\n....x\nx....\n(cid:1)(cid:2)(cid:3)",
+]
+
+_ALPHABET = (
+    list("abcXYZ019_ .-•()\n\n\n\t\r") + ["(cid:", "(cid:42)", "....", "•••", "²", "é", "ã", "Ω"]
+    + ["\x00", "\x0b", "\x0c", "\x1c", "\x7f", "\x85", "\x9f", "\xa0", "\u2028", "\u3000"]
+)
+
+
+def _fuzz_pages(count: int, rng: random.Random) -> List[str]:
+    return ["".join(rng.choice(_ALPHABET) for _ in range(rng.randint(0, 80))) for _ in range(count)]
+
+
+def _synthetic_pages(count: int, lines_per_page: int, rng: random.Random, accents: bool) -> List[str]:
+    pages = []
+    for page_num in range(1, count + 1):
+        lines = make_text_lines(lines_per_page, rng)
+        if accents:
+            lines = [line.replace("cao", "ção").replace("ens", "ensã") for line in lines]
+        # rodapé com o número da página e um sumário com pontilhado, como nos manuais
+        section = "Seção" if accents else "Secao"
+        lines += [f"{section} {page_num} " + "." * 20 + f" {page_num}", "•••", str(page_num)]
+        pages.append("\n".join(lines))
+    return pages
+
+
+def _check(pages: List[str]) -> int:
+    """Quantas páginas divergem da implementação anterior; cada divergência vai para o stderr."""
+    mismatches = 0
+    for text in pages:
+        expected, got = _reference_clean(text), _clean_extracted_text(text)
+        if expected != got:
+            mismatches += 1
+            print(f"divergência para {text!r}:\n  esperado {expected!r}\n  obtido   {got!r}", file=sys.stderr)
+    return mismatches
+
+
+def _rate(clean, pages: List[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in pages:
+            clean(text)
+    return len(pages) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--lines-per-page", type=int, default=40)
+    parser.add_argument("--fuzz", type=int, default=20000, help="páginas aleatórias na checagem de equivalência")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check-only", action="store_true", help="só a checagem de equivalência, sem medir")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpora = {
+        "ASCII": _synthetic_pages(args.pages, args.lines_per_page, rng, accents=False),
+        "acentuado": _synthetic_pages(args.pages, args.lines_per_page, rng, accents=True),
+    }
+
+    pages = [_GOLDEN, _fuzz_pages(args.fuzz, rng), *corpora.values()]
+    checked = sum(len(group) for group in pages)
+    mismatches = sum(_check(group) for group in pages)
+    if mismatches:
+        sys.exit(f"equivalência: {mismatches} de {checked} páginas diferentes da implementação anterior")
+    print(f"equivalência: {checked} páginas idênticas à implementação anterior\n")
+    if args.check_only:
+        return
+
+    print(f"{'corpus':>10} {'anterior pág/s':>15} {'atual pág/s':>12}")
+    for name, pages in corpora.items():
+        before = _rate(_reference_clean, pages, args.repeat)
+        after = _rate(_clean_extracted_text, pages, args.repeat)
+        print(f"{name:>10} {before:>15.0f} {after:>12.0f}  ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
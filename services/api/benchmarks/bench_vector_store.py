@@ -0,0 +1,149 @@
+"""Latência, recall e memória: Chroma (HNSW) vs índice NumPy em força bruta, por tamanho de corpus.
+
+Os vetores são aleatórios (gaussianos, normalizados) e gravados direto no store pelo
+`vector_service`, sem passar por embeddings. Para cada backend e tamanho, um subprocesso
+grava o índice em disco e outro o abre e faz as consultas, uma a uma e em lotes
+(`search_by_vectors`), então o pico de RSS medido é o de servir buscas, e não o da
+construção. O recall@k é contra a busca exata.
+
+Uso (a partir de services/api):
+    python -m benchmarks.bench_vector_store --sizes 1000 10000 30000 --dim 384
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.harness import configure_env, peak_rss_mib, percentile
+
+BACKENDS = ("chroma", "numpy")
+
+
+def _build(data_dir: str, backend: str, size: int, dim: int, seed: int, queries: int, top_k: int):
+    configure_env(data_dir, VECTOR_BACKEND=backend)
+    from libs.services import vector_service
+
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(size, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    store, bm25_index = vector_service._get_handle()
+    start = time.perf_counter()
+    for offset in range(0, size, 1000):
+        batch = vectors[offset:offset + 1000]
+        ids = [f"chunk-{offset + i}" for i in range(len(batch))]
+        texts = [f"chunk {offset + i}" for i in range(len(batch))]
+        store._collection.upsert(
+            ids=ids,
+            embeddings=batch.tolist(),
+            documents=texts,
+            metadatas=[{"source": "bench"}] * len(batch),
+        )
+        # mantém o BM25 em dia para que a abertura não o reconstrua a partir do store
+        bm25_index.add(ids, texts)
+    build_s = time.perf_counter() - start
+
+    # consultas perto de chunks existentes, como perguntas sobre o conteúdo indexado; o
+    # gabarito da busca exata é calculado aqui para não pesar no RSS do processo de consulta
+    probes = vectors[rng.integers(0, size, queries)] + rng.normal(scale=0.5 / np.sqrt(dim), size=(queries, dim))
+    exact = np.argsort(-(probes @ vectors.T), axis=1)[:, :top_k]
+    np.save(os.path.join(data_dir, "probes.npy"), probes.astype(np.float32))
+    np.save(os.path.join(data_dir, "exact.npy"), exact)
+    print(json.dumps({"build_s": round(build_s, 2)}))
+
+
+def _query(data_dir: str, backend: str, top_k: int, batch: int):
+    configure_env(data_dir, VECTOR_BACKEND=backend)
+    from libs.services import vector_service
+
+    probes = np.load(os.path.join(data_dir, "probes.npy")).tolist()
+    exact = np.load(os.path.join(data_dir, "exact.npy"))
+
+    # imports e cliente de embeddings fora da medição: open ms e RSS refletem só o índice
+    import langchain_chroma  # noqa: F401
+
+    vector_service._get_embeddings()
+    baseline = peak_rss_mib()
+    start = time.perf_counter()
+    vector_service._get_vector_store(create=False)
+    open_ms = (time.perf_counter() - start) * 1000
+
+    latencies, hits = [], 0
+    for probe, expected in zip(probes, exact):
+        start = time.perf_counter()
+        docs = vector_service.search_by_vector(probe, top_k=top_k)
+        latencies.append(time.perf_counter() - start)
+        hits += len({doc.id for doc in docs} & {f"chunk-{i}" for i in expected})
+
+    start = time.perf_counter()
+    for offset in range(0, len(probes), batch):
+        vector_service.search_by_vectors(probes[offset:offset + batch], top_k=top_k)
+    batched_ms = (time.perf_counter() - start) * 1000 / len(probes)
+
+    print(json.dumps({
+        "open_ms": round(open_ms, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "batched_ms": round(batched_ms, 3),
+        "recall": round(hits / (len(probes) * top_k), 3),
+        "rss_mib": round(peak_rss_mib() - baseline, 1),
+    }))
+
+
+def _run(*args) -> dict:
+    command = [sys.executable, "-m", "benchmarks.bench_vector_store", "--child", *map(str, args)]
+    out = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 30000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=32, help="consultas por chamada em search_by_vectors")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        stage, data_dir, backend, size = args.child[:4]
+        if stage == "build":
+            _build(data_dir, backend, int(size), args.dim, args.seed, args.queries, args.top_k)
+        else:
+            _query(data_dir, backend, args.top_k, args.batch)
+        return
+
+    print(f"dim={args.dim}, top_k={args.top_k}, {args.queries} consultas, lotes de {args.batch}")
+    print(
+        f"{'chunks':>7} {'backend':>8} {'build s':>8} {'open ms':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'lote ms/q':>10} {'recall':>7} {'RSS MiB':>8} {'disco MiB':>10}"
+    )
+    for size in args.sizes:
+        for backend in BACKENDS:
+            data_dir = tempfile.mkdtemp(prefix=f"rag-store-{backend}-")
+            build = _run(
+                "build", data_dir, backend, size,
+                "--dim", args.dim, "--seed", args.seed, "--queries", args.queries, "--top-k", args.top_k,
+            )
+            query = _run("query", data_dir, backend, size, "--top-k", args.top_k, "--batch", args.batch)
+            disk = sum(
+                os.path.getsize(os.path.join(root, name))
+                for root, _, names in os.walk(data_dir)
+                for name in names
+                if not name.endswith(".npy") or root != data_dir
+            ) / 2**20
+            print(
+                f"{size:>7} {backend:>8} {build['build_s']:>8} {query['open_ms']:>8} {query['p50_ms']:>8} "
+                f"{query['p95_ms']:>8} {query['batched_ms']:>10} {query['recall']:>7} {query['rss_mib']:>8} {disk:>10.1f}"
+            )
+    print("RSS MiB = pico de RSS ao abrir o índice e responder as consultas, acima da linha de base")
+
+
+if __name__ == "__main__":
+    main()
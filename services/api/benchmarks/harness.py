@@ -0,0 +1,71 @@
+"""Montagem do ambiente offline usado pelos benchmarks.
+
+`configure_env` precisa ser chamado antes de qualquer import de `libs` ou `main`,
+porque `libs.utils.envs` lê as variáveis de ambiente no import.
+"""
+import io
+import os
+import resource
+import tempfile
+from typing import List
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+
+def configure_env(data_dir: str | None = None, **overrides: str) -> str:
+    data_dir = data_dir or tempfile.mkdtemp(prefix="rag-bench-")
+    os.environ.update({
+        "OPENAI_API_KEY": "bench",
+        "CHROMA_PERSIST_DIR": os.path.join(data_dir, "chroma"),
+        "EMBEDDING_CACHE_ENABLED": "false",
+        "EMBEDDING_CACHE_PATH": os.path.join(data_dir, "embedding_cache.sqlite3"),
+        "ANSWER_CACHE_ENABLED": "false",
+        "RETRIEVAL_CACHE_ENABLED": "false",
+        "INGESTION_SPOOL_DIR": os.path.join(data_dir, "uploads"),
+        "SNAPSHOT_SPOOL_DIR": os.path.join(data_dir, "snapshots"),
+        **overrides,
+    })
+    return data_dir
+
+
+def install_stubs(
+    embed_latency: float = 0.0,
+    first_token_latency: float = 0.0,
+    token_latency: float = 0.0,
+    prompt_latency: float = 0.0,
+):
+    from benchmarks.stubs import StubChatModel, StubEmbeddings
+    from libs.services import question_service, vector_service
+
+    vector_service._embeddings = StubEmbeddings(latency=embed_latency)
+    question_service._llm = StubChatModel(
+        first_token_latency=first_token_latency,
+        token_latency=token_latency,
+        prompt_latency=prompt_latency,
+    )
+
+
+def upload_file(data: bytes, filename: str) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename=filename, headers=Headers({"content-type": "application/pdf"}))
+
+
+def index_synthetic_corpus(documents: int, pages: int, lines_per_page: int = 40) -> int:
+    from benchmarks.synthetic_pdf import make_pdf
+    from libs.services.document_service import process_documents
+
+    files = [upload_file(make_pdf(pages, lines_per_page, seed=i), f"doc-{i}.pdf") for i in range(documents)]
+    return process_documents(files)["total_chunks"]
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mib() -> float:
+    # ru_maxrss é em KiB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
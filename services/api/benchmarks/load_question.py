@@ -0,0 +1,77 @@
+"""Teste de carga de /question: handler síncrono (threadpool) vs caminho async.
+
+Sobe a API em processo com provedores stub de latência configurável e dispara
+N perguntas simultâneas em cada nível de concorrência.
+
+Uso (a partir de services/api):
+    python -m benchmarks.load_question --concurrency 1 10 50 100 200 --llm-latency 0.5
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.harness import configure_env, install_stubs, index_synthetic_corpus, percentile
+
+configure_env()
+
+import httpx  # noqa: E402
+from fastapi import APIRouter  # noqa: E402
+
+from main import app  # noqa: E402
+from libs.services.question_service import process_question  # noqa: E402
+from libs.structures.question import QuestionRequest, QuestionResponse  # noqa: E402
+
+baseline = APIRouter()
+
+
+@baseline.post("/bench/sync-question", response_model=QuestionResponse)
+def sync_question(request: QuestionRequest):
+    answer, references, usage = process_question(request.question)
+    return QuestionResponse(answer=answer, references=references, **usage)
+
+
+app.include_router(baseline)
+
+
+async def _run(client: httpx.AsyncClient, path: str, concurrency: int) -> dict:
+    async def one(i: int) -> float:
+        start = time.perf_counter()
+        response = await client.post(path, json={"question": f"motor bearing maintenance {i}"})
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "req_s": concurrency / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100, 200])
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    install_stubs(embed_latency=args.embed_latency, first_token_latency=args.llm_latency)
+    chunks = index_synthetic_corpus(documents=2, pages=5)
+    print(f"Corpus: {chunks} chunks; embedding {args.embed_latency * 1000:.0f}ms, LLM {args.llm_latency * 1000:.0f}ms")
+    print(f"{'concorrência':>12} | {'sync req/s':>10} {'p95 ms':>8} | {'async req/s':>11} {'p95 ms':>8}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for concurrency in args.concurrency:
+            sync = await _run(client, "/bench/sync-question", concurrency)
+            async_ = await _run(client, "/question/", concurrency)
+            print(
+                f"{concurrency:>12} | {sync['req_s']:>10.1f} {sync['p95_ms']:>8.0f} | "
+                f"{async_['req_s']:>11.1f} {async_['p95_ms']:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""Provedores locais e determinísticos para benchmarks, sem rede.
+
+`StubEmbeddings` usa o hashing trick sobre as palavras do texto (textos com palavras em
+comum ficam próximos) e `StubChatModel` devolve uma resposta fixa token a token. Ambos
+simulam a latência do provider com `time.sleep` / `asyncio.sleep`; a do chat pode crescer
+com o tamanho do prompt (`prompt_latency`).
+"""
+import asyncio
+import hashlib
+import re
+import time
+from typing import Any, AsyncIterator, Iterator, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class StubEmbeddings(Embeddings):
+    def __init__(self, size: int = 256, latency: float = 0.0):
+        self.size = size
+        self.latency = latency
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return self._vector(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(self.latency)
+        return self._vector(text)
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.size, dtype=np.float32)
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.size
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+
+class StubChatModel(BaseChatModel):
+    answer: str = "Stub answer generated from the retrieved documents for benchmarking purposes."
+    first_token_latency: float = 0.0
+    token_latency: float = 0.0
+    # segundos por 1000 tokens de prompt, somados à latência do primeiro token
+    prompt_latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _tokens(self) -> List[str]:
+        return re.findall(r"\S+\s*", self.answer)
+
+    def _prefill(self, messages: List[BaseMessage]) -> float:
+        prompt_tokens = sum(len(str(message.content)) for message in messages) / 4
+        return self.first_token_latency + self.prompt_latency * prompt_tokens / 1000
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self._prefill(messages) + self.token_latency * len(self._tokens()))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self._prefill(messages) + self.token_latency * len(self._tokens()))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+    def _stream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._prefill(messages))
+        for token in self._tokens():
+            time.sleep(self.token_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._prefill(messages))
+        for token in self._tokens():
+            await asyncio.sleep(self.token_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
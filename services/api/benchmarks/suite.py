@@ -0,0 +1,201 @@
+"""Suíte de benchmark ponta a ponta, reproduzível e offline.
+
+Gera PDFs sintéticos, indexa pelo caminho real (`process_documents` -> `add_documents`)
+e responde perguntas por `process_question` e pela rota async `/question/`, com
+embeddings e chat stub de latência configurável. Mede páginas/s, chunks/s, latência
+p50/p95/p99, pico de RSS e vazão por nível de concorrência, e grava um JSON que pode
+ser comparado com o de outro commit.
+
+Uso (a partir de services/api):
+    python -m benchmarks.suite --documents 4 --pages 50 --questions 200
+    python -m benchmarks.suite --compare benchmarks/results/<anterior>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from benchmarks.harness import configure_env, install_stubs, peak_rss_mib, percentile, upload_file
+
+configure_env()
+
+import httpx  # noqa: E402
+
+from benchmarks.synthetic_pdf import make_pdf, make_text_lines  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+# métricas em que valores maiores são melhores; nas demais (latência, memória) menor é melhor
+_HIGHER_IS_BETTER = ("per_s",)
+
+
+def _latency_summary(latencies) -> dict:
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def _questions(n: int, seed: int):
+    rng = random.Random(seed)
+    return [f"{line} Qual o procedimento indicado? ({i})" for i, line in enumerate(make_text_lines(n, rng, 8))]
+
+
+def bench_ingestion(documents: int, pages: int, lines_per_page: int) -> dict:
+    from libs.services.document_service import process_documents
+
+    files = [upload_file(make_pdf(pages, lines_per_page, seed=i), f"suite-{i}.pdf") for i in range(documents)]
+    start = time.perf_counter()
+    result = process_documents(files)
+    elapsed = time.perf_counter() - start
+    total_pages = documents * pages
+    return {
+        "documents": documents,
+        "pages": total_pages,
+        "chunks": result["total_chunks"],
+        "seconds": round(elapsed, 3),
+        "pages_per_s": round(total_pages / elapsed, 2),
+        "chunks_per_s": round(result["total_chunks"] / elapsed, 2),
+    }
+
+
+def bench_questions(questions) -> dict:
+    from libs.services.question_service import process_question
+
+    latencies = []
+    for question in questions:
+        start = time.perf_counter()
+        process_question(question)
+        latencies.append(time.perf_counter() - start)
+    return {"questions": len(questions), **_latency_summary(latencies)}
+
+
+async def bench_concurrency(questions, levels) -> dict:
+    from main import app
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for level in levels:
+            async def one(i: int) -> float:
+                start = time.perf_counter()
+                response = await client.post("/question/", json={"question": questions[i % len(questions)]})
+                response.raise_for_status()
+                return time.perf_counter() - start
+
+            start = time.perf_counter()
+            latencies = await asyncio.gather(*(one(i) for i in range(level)))
+            elapsed = time.perf_counter() - start
+            results[str(level)] = {"requests_per_s": round(level / elapsed, 2), **_latency_summary(latencies)}
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return None
+
+
+def _flatten(data: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """Imprime as diferenças entre dois resultados e devolve quantas métricas pioraram além do limite."""
+    old, new = _flatten(baseline["results"]), _flatten(current["results"])
+    print(f"\nComparação com {baseline.get('commit') or '?'} ({baseline.get('timestamp')})")
+    regressions = 0
+    for name in sorted(old.keys() & new.keys()):
+        if not name.endswith(("_ms", "_per_s", "_mib")) or not old[name]:
+            continue
+        change = (new[name] - old[name]) / old[name] * 100
+        worse = -change if name.endswith(_HIGHER_IS_BETTER) else change
+        flag = "  <-- regressão" if worse > threshold else ""
+        regressions += bool(flag)
+        print(f"{name:>40}: {old[name]:>10.2f} -> {new[name]:>10.2f} ({change:+6.1f}%){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--lines-per-page", type=int, default=40)
+    parser.add_argument("--questions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--embed-latency", type=float, default=0.02)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--token-latency", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="default: benchmarks/results/<data>-<commit>.json")
+    parser.add_argument("--compare", default=None, help="JSON de uma execução anterior")
+    parser.add_argument("--threshold", type=float, default=10.0, help="piora (%%) considerada regressão")
+    args = parser.parse_args()
+
+    install_stubs(
+        embed_latency=args.embed_latency,
+        first_token_latency=args.llm_latency,
+        token_latency=args.token_latency,
+    )
+    questions = _questions(args.questions, args.seed)
+
+    print(f"Ingestão: {args.documents} PDFs x {args.pages} páginas")
+    ingestion = bench_ingestion(args.documents, args.pages, args.lines_per_page)
+    print(f"  {ingestion['pages_per_s']} páginas/s, {ingestion['chunks_per_s']} chunks/s ({ingestion['chunks']} chunks)")
+    rss_after_ingestion = peak_rss_mib()
+
+    print(f"Perguntas sequenciais: {len(questions)}")
+    sequential = bench_questions(questions)
+    print(f"  p50 {sequential['p50_ms']}ms  p95 {sequential['p95_ms']}ms  p99 {sequential['p99_ms']}ms")
+
+    print(f"Concorrência em /question/: {args.concurrency}")
+    concurrency = asyncio.run(bench_concurrency(questions, args.concurrency))
+    for level, result in concurrency.items():
+        print(f"  {level:>4}: {result['requests_per_s']} req/s  p95 {result['p95_ms']}ms  p99 {result['p99_ms']}ms")
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {"python": platform.python_version(), "cpus": os.cpu_count(), "platform": platform.platform()},
+        "params": vars(args),
+        "results": {
+            "ingestion": ingestion,
+            "questions": sequential,
+            "concurrency": concurrency,
+            "memory": {"peak_rss_after_ingestion_mib": round(rss_after_ingestion, 1), "peak_rss_mib": round(peak_rss_mib(), 1)},
+        },
+    }
+    print(f"Pico de RSS: {report['results']['memory']['peak_rss_mib']} MiB")
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{report['commit'] or 'nogit'}.json")
+    with open(output, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Resultados gravados em {output}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(json.load(fh), report, args.threshold)
+        if regressions:
+            raise SystemExit(f"{regressions} métricas pioraram mais de {args.threshold}%")
+
+
+if __name__ == "__main__":
+    main()
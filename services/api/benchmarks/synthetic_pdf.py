@@ -0,0 +1,85 @@
+import random
+from typing import List
+
+_WORDS = (
+    "motor instalacao manutencao tensao corrente frequencia rolamento eixo "
+    "isolamento carcaca ventilacao temperatura torque potencia rotor estator "
+    "procedimento seguranca inspecao lubrificacao vibracao alinhamento "
+    "installation maintenance voltage bearing shaft insulation cooling "
+    "clause section warranty specification inspection torque rating"
+).split()
+
+
+def make_text_lines(n_lines: int, rng: random.Random, words_per_line: int = 12) -> List[str]:
+    lines = []
+    for _ in range(n_lines):
+        words = [rng.choice(_WORDS) for _ in range(words_per_line)]
+        if rng.random() < 0.1:
+            words.append(f"PN-{rng.randint(1000, 9999)}")
+        lines.append(" ".join(words).capitalize() + ".")
+    return lines
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: int, lines_per_page: int = 40, seed: int = 0, shuffled_pages: float = 0.0) -> bytes:
+    """Gera um PDF mínimo (Helvetica, só camada de texto) com `pages` páginas.
+
+    Uma fração `shuffled_pages` das páginas desenha as linhas fora da ordem de leitura, cada
+    uma na sua posição absoluta, como fazem alguns geradores de PDF.
+    """
+    rng = random.Random(seed)
+    # rng separado para não mudar o texto dos PDFs gerados sem embaralhamento
+    shuffle_rng = random.Random(seed + 1)
+    objects: List[bytes] = []
+
+    def add(obj: bytes) -> int:
+        objects.append(obj)
+        return len(objects)
+
+    catalog_id = add(b"")
+    pages_id = add(b"")
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    page_ids = []
+    for page_num in range(1, pages + 1):
+        lines = make_text_lines(lines_per_page, rng)
+        ops = ["BT", "/F1 9 Tf", "11 TL", "40 800 Td"]
+        if shuffled_pages and shuffle_rng.random() < shuffled_pages:
+            order = list(range(len(lines)))
+            shuffle_rng.shuffle(order)
+            for index in order:
+                ops.append(f"1 0 0 1 40 {800 - 11 * index} Tm ({_escape(lines[index])}) Tj")
+            ops.append(f"1 0 0 1 40 {800 - 11 * len(lines)} Tm")
+        else:
+            for line in lines:
+                ops.append(f"({_escape(line)}) Tj T*")
+        ops.append(f"({page_num}) Tj")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("ascii")
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (pages_id, font_id, content_id)
+        ))
+
+    objects[catalog_id - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+    kids = b" ".join(b"%d 0 R" % pid for pid in page_ids)
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog_id, xref_offset
+    )
+    return bytes(out)
@@ -0,0 +1,76 @@
+"""Administração offline das collections: snapshot, importação e compactação.
+
+Use com a API parada: o Chroma não aceita escrita de dois processos no mesmo diretório.
+
+Uso (a partir de services/api):
+    python -m cli export documents -o documents.ragsnap --quantization int8
+    python -m cli import documents.ragsnap --collection documents_copy
+    python -m cli compact documents
+"""
+import argparse
+import json
+import os
+import sys
+
+from libs.providers.numpy_store import StoreInUse
+from libs.providers.snapshot_file import InvalidSnapshot
+from libs.services.snapshot_service import (
+    CollectionAlreadyExists,
+    EmbeddingModelMismatch,
+    compact_collection,
+    export_collection,
+    import_collection,
+)
+from libs.services.vector_service import CollectionNotFound, InvalidCollectionName
+from libs.utils.envs import SnapshotQuantization
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="grava a collection em um snapshot")
+    export.add_argument("collection")
+    export.add_argument("-o", "--output", required=True)
+    export.add_argument(
+        "--quantization",
+        choices=[q.value for q in SnapshotQuantization],
+        default=SnapshotQuantization.NONE.value,
+        help="int8: vetores com 1/4 do tamanho, com pequena perda de precisão",
+    )
+
+    load = commands.add_parser("import", help="cria uma collection a partir de um snapshot")
+    load.add_argument("snapshot")
+    load.add_argument("--collection", help="default: o nome da collection exportada")
+
+    compact = commands.add_parser("compact", help="devolve ao disco o espaço de chunks apagados")
+    compact.add_argument("collection")
+
+    args = parser.parse_args()
+    try:
+        if args.command == "export":
+            result = _export(args.collection, args.output, args.quantization)
+        elif args.command == "import":
+            with open(args.snapshot, "rb") as file:
+                result = import_collection(file, args.collection)
+        else:
+            result = compact_collection(args.collection)
+    except (CollectionNotFound, CollectionAlreadyExists) as e:
+        parser.exit(1, f"{type(e).__name__}: {e}\n")
+    except (InvalidCollectionName, InvalidSnapshot, EmbeddingModelMismatch, StoreInUse) as e:
+        parser.exit(1, f"{e}\n")
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+def _export(collection: str, output: str, quantization: str) -> dict:
+    try:
+        with open(output, "wb") as file:
+            return export_collection(file, collection, quantization)
+    except Exception:
+        os.remove(output)
+        raise
+
+
+if __name__ == "__main__":
+    main()
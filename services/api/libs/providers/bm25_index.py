@@ -0,0 +1,191 @@
+import heapq
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+
+_TOKEN_RE = re.compile(r"\w+")
+# limite de variáveis por statement do SQLite
+_SQL_BATCH = 500
+# alterações mantidas no log; um processo mais atrasado que isso recarrega o índice inteiro
+_CHANGES_KEPT = 100000
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class BM25Index:
+    """Índice invertido BM25 em memória, persistido em SQLite (frequências por chunk).
+
+    Os ids são os mesmos dos chunks no Chroma, para que os resultados das duas buscas
+    possam ser combinados. O arquivo pode ser gravado por vários workers do uvicorn: cada
+    gravação entra também num log de alterações, e antes de buscar ou gravar o processo
+    aplica as alterações que os outros fizeram desde a última vez.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._lengths: Dict[str, int] = {}
+        self._total_length = 0
+        # última alteração do log já aplicada na memória
+        self._seq = 0
+        self._data_version = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS chunks (id TEXT PRIMARY KEY, terms TEXT NOT NULL)")
+        # terms: os termos que o chunk tinha antes da alteração, para os outros processos o tirarem do índice
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL, terms TEXT)"
+        )
+        self._conn.commit()
+        with self._lock:
+            self._refresh()
+        logger.info(f"Índice BM25 carregado de {path} ({len(self._lengths)} chunks)")
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, ids: List[str], texts: Iterable[str]):
+        rows = []
+        changes = []
+        with self._lock, self._write():
+            for chunk_id, text in zip(ids, texts):
+                terms = dict(Counter(tokenize(text)))
+                changes.append((chunk_id, self._unindex(chunk_id)))
+                self._index(chunk_id, terms)
+                rows.append((chunk_id, json.dumps(terms)))
+            self._conn.executemany("INSERT OR REPLACE INTO chunks VALUES (?, ?)", rows)
+            self._log(changes)
+
+    def delete(self, ids: List[str]):
+        with self._lock, self._write():
+            self._log([(chunk_id, terms) for chunk_id in ids if (terms := self._unindex(chunk_id)) is not None])
+            self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(chunk_id,) for chunk_id in ids])
+
+    def vacuum(self):
+        """Devolve ao disco o espaço de chunks apagados."""
+        with self._lock:
+            self._conn.execute("VACUUM")
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        with self._lock:
+            self._refresh()
+            n = len(self._lengths)
+            if not n:
+                return []
+            avg_length = self._total_length / n
+            scores: Dict[str, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / avg_length)
+                    scores[chunk_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def _index(self, chunk_id: str, terms: Dict[str, int]):
+        for term, tf in terms.items():
+            self._postings[term][chunk_id] = tf
+        length = sum(terms.values())
+        self._lengths[chunk_id] = length
+        self._total_length += length
+
+    def _unindex(self, chunk_id: str) -> Optional[str]:
+        """Tira o chunk da memória; devolve os termos (JSON) que ele tinha, ou None se não estava indexado."""
+        if chunk_id not in self._lengths:
+            return None
+        row = self._conn.execute("SELECT terms FROM chunks WHERE id = ?", (chunk_id,)).fetchone()
+        self._remove(chunk_id, json.loads(row[0]) if row else {})
+        return row[0] if row else None
+
+    def _remove(self, chunk_id: str, terms: Iterable[str]):
+        length = self._lengths.pop(chunk_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(chunk_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    @contextmanager
+    def _write(self):
+        # o lock de escrita vem antes de aplicar as alterações dos outros: ninguém grava entre as duas coisas
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._refresh()
+            yield
+        except BaseException:
+            self._conn.rollback()
+            # a memória pode ter ficado à frente do disco: a próxima leitura recarrega tudo
+            self._data_version = None
+            raise
+        self._conn.commit()
+
+    def _log(self, changes: List[Tuple[str, Optional[str]]]):
+        self._conn.executemany("INSERT INTO changes (id, terms) VALUES (?, ?)", changes)
+        self._seq = self._conn.execute("SELECT MAX(seq) FROM changes").fetchone()[0] or 0
+        self._conn.execute("DELETE FROM changes WHERE seq <= ?", (self._seq - _CHANGES_KEPT,))
+
+    def _refresh(self):
+        """Aplica na memória as alterações gravadas por outras conexões desde a última vez."""
+        # data_version só muda com commits de outras conexões (de outros processos, inclusive)
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        started = not self._conn.in_transaction
+        if started:
+            # leituras numa transação só: log e chunks do mesmo instante
+            self._conn.execute("BEGIN")
+        try:
+            first = self._conn.execute("SELECT MIN(seq) FROM changes").fetchone()[0]
+            if self._data_version is None or (first is not None and first > self._seq + 1):
+                self._reload()
+            else:
+                self._apply(self._conn.execute(
+                    "SELECT seq, id, terms FROM changes WHERE seq > ? ORDER BY seq", (self._seq,)
+                ).fetchall())
+        finally:
+            if started:
+                self._conn.commit()
+        self._data_version = version
+
+    def _reload(self):
+        self._postings.clear()
+        self._lengths.clear()
+        self._total_length = 0
+        for chunk_id, terms in self._conn.execute("SELECT id, terms FROM chunks"):
+            self._index(chunk_id, json.loads(terms))
+        self._seq = self._conn.execute("SELECT MAX(seq) FROM changes").fetchone()[0] or 0
+
+    def _apply(self, changes: List[Tuple[int, str, Optional[str]]]):
+        if not changes:
+            return
+        # em ordem: os termos antigos de cada alteração são os que estão na memória naquele ponto
+        for _, chunk_id, terms in changes:
+            self._remove(chunk_id, json.loads(terms) if terms else {})
+        ids = list(dict.fromkeys(chunk_id for _, chunk_id, _ in changes))
+        for start in range(0, len(ids), _SQL_BATCH):
+            batch = ids[start:start + _SQL_BATCH]
+            for chunk_id, terms in self._conn.execute(
+                f"SELECT id, terms FROM chunks WHERE id IN ({','.join('?' * len(batch))})", batch
+            ):
+                self._index(chunk_id, json.loads(terms))
+        self._seq = changes[-1][0]
@@ -0,0 +1,33 @@
+"""Manutenção dos arquivos do Chroma, feita em um processo separado do cliente.
+
+O cliente do Chroma traz a própria cópia do SQLite. Se este processo abrir o mesmo arquivo
+com o módulo sqlite3, fechar essa conexão derruba os locks da outra cópia (locks POSIX são
+por processo), e o banco se corrompe sob buscas e gravações concorrentes. Em outro processo
+o protocolo de locks do SQLite volta a valer.
+"""
+import os
+import shutil
+import sqlite3
+from uuid import UUID
+
+
+def vacuum_chroma(persist_dir: str):
+    """VACUUM do chroma.sqlite3 e remoção dos índices HNSW de collections apagadas."""
+    conn = sqlite3.connect(os.path.join(persist_dir, "chroma.sqlite3"), timeout=60)
+    try:
+        segments = {segment_id for segment_id, in conn.execute("SELECT id FROM segments")}
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    # o Chroma deixa no disco o índice HNSW (um diretório por segmento) de collections apagadas
+    for entry in os.scandir(persist_dir):
+        if entry.is_dir() and _is_uuid(entry.name) and entry.name not in segments:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def _is_uuid(value: str) -> bool:
+    try:
+        UUID(value)
+    except ValueError:
+        return False
+    return True
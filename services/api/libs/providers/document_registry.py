@@ -0,0 +1,117 @@
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+from loguru import logger
+
+
+_COLUMNS = (
+    "collection", "id", "source", "content_hash", "content_type", "size_bytes", "page_count",
+    "total_chunks", "embedding_model", "extraction_seconds", "ingest_seconds", "uploaded_at",
+)
+
+
+class DocumentRegistry:
+    """Inventário dos documentos indexados (SQLite): metadados, estatísticas e ids dos chunks.
+
+    Listar, consultar e apagar um documento são consultas pela chave primária ou por índice,
+    sem varrer a metadata do Chroma. Há no máximo um documento por (collection, source): uma
+    nova versão do arquivo substitui a anterior, como acontece com os chunks.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " collection TEXT NOT NULL, id TEXT NOT NULL, source TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL, content_type TEXT, size_bytes INTEGER, page_count INTEGER,"
+            " total_chunks INTEGER NOT NULL, embedding_model TEXT, extraction_seconds REAL,"
+            " ingest_seconds REAL, uploaded_at TEXT NOT NULL,"
+            " PRIMARY KEY (collection, id), UNIQUE (collection, source))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS documents_hash ON documents (collection, content_hash)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " collection TEXT NOT NULL, document_id TEXT NOT NULL, chunk_index INTEGER NOT NULL,"
+            " chunk_id TEXT NOT NULL,"
+            " PRIMARY KEY (collection, document_id, chunk_index),"
+            " FOREIGN KEY (collection, document_id) REFERENCES documents (collection, id) ON DELETE CASCADE)"
+        )
+        count = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        logger.info(f"Registro de documentos em {path} ({count} documentos)")
+
+    def register(self, document: dict, chunk_ids: List[str]):
+        """Grava o documento e os ids dos seus chunks numa única transação, substituindo a versão anterior."""
+        row = tuple(document.get(column) for column in _COLUMNS)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM documents WHERE collection = ? AND (source = ? OR id = ?)",
+                (document["collection"], document["source"], document["id"]),
+            )
+            self._conn.execute(
+                f"INSERT INTO documents ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})", row
+            )
+            self._conn.executemany(
+                "INSERT INTO chunks VALUES (?, ?, ?, ?)",
+                [(document["collection"], document["id"], index, chunk_id) for index, chunk_id in enumerate(chunk_ids)],
+            )
+
+    def get(self, collection: str, document_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM documents WHERE collection = ? AND id = ?",
+                (collection, document_id),
+            ).fetchone()
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    def find_by_hash(self, collection: str, content_hash: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM documents WHERE collection = ? AND content_hash = ? LIMIT 1",
+                (collection, content_hash),
+            ).fetchone()
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    def chunk_ids(self, collection: str, document_id: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_id FROM chunks WHERE collection = ? AND document_id = ? ORDER BY chunk_index",
+                (collection, document_id),
+            ).fetchall()
+        return [chunk_id for chunk_id, in rows]
+
+    def list(self, collection: str, limit: int, offset: int = 0) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM documents WHERE collection = ?"
+                " ORDER BY source LIMIT ? OFFSET ?",
+                (collection, limit, offset),
+            ).fetchall()
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def count(self, collection: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents WHERE collection = ?", (collection,)).fetchone()[0]
+
+    def delete(self, collection: str, document_id: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM documents WHERE collection = ? AND id = ?", (collection, document_id))
+        return cursor.rowcount > 0
+
+    def move_collection(self, source: str, target: str):
+        """Passa os documentos de `source` para `target`, substituindo os que `target` tinha."""
+        with self._lock, self._conn:
+            # a chave dos chunks muda junto com a dos documentos; a FK só é conferida no commit
+            self._conn.execute("PRAGMA defer_foreign_keys=ON")
+            self._conn.execute("DELETE FROM documents WHERE collection = ?", (target,))
+            self._conn.execute("UPDATE documents SET collection = ? WHERE collection = ?", (target, source))
+            self._conn.execute("UPDATE chunks SET collection = ? WHERE collection = ?", (target, source))
+
+    def drop_collection(self, collection: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM documents WHERE collection = ?", (collection,))
@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from loguru import logger
+
+from libs.utils.metrics import EMBEDDED_TEXTS
+
+
+# limite de variáveis por statement do SQLite
+_SQL_BATCH = 500
+# os hits só marcam o last_used na memória; o disco recebe as marcas em lote
+_TOUCH_FLUSH_ENTRIES = 1000
+_TOUCH_FLUSH_SECONDS = 60
+
+
+class CachedEmbeddings(Embeddings):
+    """Cache persistente (SQLite, vetores em float32) na frente de outro `Embeddings`.
+
+    A chave é o hash de provider + modelo + texto; o despejo é LRU limitado a `max_entries`.
+    O arquivo pode ser compartilhado pelos workers do uvicorn: o limite é conferido com a
+    contagem da tabela, não com um contador do processo.
+    """
+
+    def __init__(self, backend: Embeddings, provider: str, model: str, path: str, max_entries: int):
+        self.backend = backend
+        self.provider = provider
+        self.model = model
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key BLOB PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        # last_used dos hits ainda não gravado
+        self._touched: Dict[bytes, float] = {}
+        self._flushed_at = time.monotonic()
+        logger.info(f"Cache de embeddings em {path} ({self._count()} entradas)")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        found = self._lookup(keys)
+        missing = self._missing(keys, texts, found)
+        if missing:
+            computed = dict(zip(missing.keys(), self.backend.embed_documents(list(missing.values()))))
+            EMBEDDED_TEXTS.inc(len(missing))
+            self._store(computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        found = self._lookup([key])
+        if self._missing([key], [text], found):
+            found[key] = self.backend.embed_query(text)
+            EMBEDDED_TEXTS.inc()
+            self._store(found)
+        return found[key]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        found = await asyncio.to_thread(self._lookup, keys)
+        missing = self._missing(keys, texts, found)
+        if missing:
+            vectors = await self.backend.aembed_documents(list(missing.values()))
+            EMBEDDED_TEXTS.inc(len(missing))
+            computed = dict(zip(missing.keys(), vectors))
+            await asyncio.to_thread(self._store, computed)
+            found.update(computed)
+        return [found[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        found = await asyncio.to_thread(self._lookup, [key])
+        if self._missing([key], [text], found):
+            found[key] = await self.backend.aembed_query(text)
+            EMBEDDED_TEXTS.inc()
+            await asyncio.to_thread(self._store, found)
+        return found[key]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        with self._lock:
+            entries = self._count()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.provider}\x00{self.model}\x00{text}".encode("utf-8")).digest()
+
+    def _missing(self, keys: List[bytes], texts: List[str], found: Dict[bytes, List[float]]) -> Dict[bytes, str]:
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        hits = sum(1 for key in keys if key in found)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return missing
+
+    def _lookup(self, keys: List[bytes]) -> Dict[bytes, List[float]]:
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            for start in range(0, len(unique), _SQL_BATCH):
+                batch = unique[start:start + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+            if found:
+                now = time.time()
+                self._touched.update(dict.fromkeys(found, now))
+                if len(self._touched) >= _TOUCH_FLUSH_ENTRIES or time.monotonic() - self._flushed_at >= _TOUCH_FLUSH_SECONDS:
+                    self._flush_touched()
+                    self._conn.commit()
+        return found
+
+    def _store(self, vectors: Dict[bytes, List[float]]):
+        now = time.time()
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in vectors.items()]
+        with self._lock:
+            # as marcas pendentes entram antes do despejo, para ele ver a ordem de uso real
+            self._flush_touched()
+            self._conn.executemany("INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?)", rows)
+            # contagem dentro da transação de escrita: os outros workers também gravam no arquivo
+            overflow = self._count() - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                )
+                logger.debug(f"Cache de embeddings: {overflow} entradas despejadas (LRU)")
+            self._conn.commit()
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()],
+            )
+            self._touched.clear()
+        self._flushed_at = time.monotonic()
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
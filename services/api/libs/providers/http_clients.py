@@ -0,0 +1,178 @@
+"""Clientes HTTP compartilhados pelos providers de LLM e embeddings.
+
+Um pool de conexões por provider (e por modo, sync/async), reaproveitado pelos clientes
+LangChain e pelo SDK da OpenAI, para que cada chamada não pague de novo TCP + TLS.
+`httpx` só é importado no primeiro uso, junto com os clientes.
+"""
+import importlib.util
+import threading
+from typing import Dict, Tuple
+
+from loguru import logger
+
+from libs.utils.envs import (
+    OPENAI_API_KEY,
+    PROVIDER_HTTP2,
+    PROVIDER_HTTP_CONNECT_TIMEOUT_SECONDS,
+    PROVIDER_HTTP_KEEPALIVE_SECONDS,
+    PROVIDER_HTTP_MAX_CONNECTIONS,
+    PROVIDER_HTTP_MAX_KEEPALIVE,
+    PROVIDER_HTTP_TIMEOUT_SECONDS,
+    PROVIDER_MAX_RETRIES,
+)
+
+
+OPENAI = "openai"
+OLLAMA = "ollama"
+
+_pools: Dict[Tuple[str, bool], "_Pool"] = {}
+_lock = threading.Lock()
+_openai_client = None
+
+
+class _Pool:
+    """Transport do httpx com contadores de requisições e de conexões abertas.
+
+    Só usa a API pública do httpx: as conexões novas são contadas pela extensão `trace`,
+    que o hook de request põe em cada requisição (inclusive nas dos clientes do Ollama).
+    """
+
+    def __init__(self, provider: str, is_async: bool):
+        import httpx
+
+        self.name = f"{provider}_async" if is_async else provider
+        self.is_async = is_async
+        self.requests = 0
+        self.connections_opened = 0
+        self._lock = threading.Lock()
+
+        transport_class = httpx.AsyncHTTPTransport if is_async else httpx.HTTPTransport
+        self.transport = transport_class(
+            limits=httpx.Limits(
+                max_connections=PROVIDER_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=PROVIDER_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=PROVIDER_HTTP_KEEPALIVE_SECONDS,
+            ),
+            http2=http2_enabled(),
+            # o SDK da OpenAI já refaz chamadas com backoff (429, 5xx, falha de conexão);
+            # para o Ollama o transport refaz só as falhas ao abrir a conexão
+            retries=0 if provider == OPENAI else PROVIDER_MAX_RETRIES,
+        )
+        self.timeout = httpx.Timeout(PROVIDER_HTTP_TIMEOUT_SECONDS, connect=PROVIDER_HTTP_CONNECT_TIMEOUT_SECONDS)
+
+        if is_async:
+            async def trace(event, info):
+                self._trace(event, info)
+
+            async def on_request(request):
+                request.extensions["trace"] = trace
+
+            async def on_response(response):
+                self._count_request()
+        else:
+            def on_request(request):
+                request.extensions["trace"] = self._trace
+
+            def on_response(response):
+                self._count_request()
+        self.event_hooks = {"request": [on_request], "response": [on_response]}
+
+        client_class = httpx.AsyncClient if is_async else httpx.Client
+        self.client = client_class(
+            transport=self.transport,
+            timeout=self.timeout,
+            follow_redirects=True,
+            event_hooks=self.event_hooks,
+        )
+
+    def _trace(self, event: str, info: dict):
+        # "connection.connect_tcp.complete": o pool abriu uma conexão nova para esta requisição
+        if event == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections_opened += 1
+
+    def _count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "connections_opened": self.connections_opened}
+
+
+def http2_enabled() -> bool:
+    return PROVIDER_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _get_pool(provider: str, is_async: bool) -> _Pool:
+    key = (provider, is_async)
+    with _lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = _Pool(provider, is_async)
+            logger.info(
+                f"Pool HTTP {pool.name} criado (máx. {PROVIDER_HTTP_MAX_CONNECTIONS} conexões, "
+                f"{PROVIDER_HTTP_MAX_KEEPALIVE} em keep-alive, HTTP/2 {'ligado' if http2_enabled() else 'desligado'})"
+            )
+        return pool
+
+
+def openai_client_kwargs() -> dict:
+    """Argumentos para `ChatOpenAI` / `OpenAIEmbeddings` usarem os pools compartilhados."""
+    sync_pool, async_pool = _get_pool(OPENAI, False), _get_pool(OPENAI, True)
+    return {
+        "http_client": sync_pool.client,
+        "http_async_client": async_pool.client,
+        "max_retries": PROVIDER_MAX_RETRIES,
+        "timeout": sync_pool.timeout,
+    }
+
+
+def ollama_client_kwargs() -> dict:
+    """Argumentos para `ChatOllama` / `OllamaEmbeddings`; o cliente do Ollama recebe só o transport."""
+    sync_pool, async_pool = _get_pool(OLLAMA, False), _get_pool(OLLAMA, True)
+    return {
+        "sync_client_kwargs": {
+            "transport": sync_pool.transport,
+            "timeout": sync_pool.timeout,
+            "event_hooks": sync_pool.event_hooks,
+        },
+        "async_client_kwargs": {
+            "transport": async_pool.transport,
+            "timeout": async_pool.timeout,
+            "event_hooks": async_pool.event_hooks,
+        },
+    }
+
+
+def get_openai_client():
+    """Cliente do SDK da OpenAI sobre o pool compartilhado."""
+    global _openai_client
+    if _openai_client is None:
+        from openai import OpenAI
+
+        pool = _get_pool(OPENAI, False)
+        _openai_client = OpenAI(
+            api_key=OPENAI_API_KEY,
+            http_client=pool.client,
+            max_retries=PROVIDER_MAX_RETRIES,
+            timeout=pool.timeout,
+        )
+    return _openai_client
+
+
+def get_pool_stats() -> dict:
+    with _lock:
+        pools = list(_pools.values())
+    return {"http2": http2_enabled(), "pools": {pool.name: pool.stats() for pool in pools}}
+
+
+async def aclose_pools():
+    """Fecha os clientes e as conexões abertas no shutdown; depois disso os pools não são mais usáveis."""
+    with _lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        if pool.is_async:
+            await pool.client.aclose()
+        else:
+            pool.client.close()
@@ -1,9 +1,7 @@
-import os
 from typing import List
-from openai import OpenAI
 from loguru import logger
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+from libs.providers.http_clients import get_openai_client
 
 
 def generate_answer(question: str, context_chunks: List[str]) -> str:
@@ -49,8 +47,8 @@ def generate_answer(question: str, context_chunks: List[str]) -> str:
 
 
 def _generate_with_openai(prompt: str) -> str:
-    """Chama a API da OpenAI."""
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    """Chama a API da OpenAI pelo cliente compartilhado (conexões reaproveitadas entre chamadas)."""
+    client = get_openai_client()
     
     logger.info("Modelo: gpt-4o-mini")
     
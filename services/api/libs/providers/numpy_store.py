@@ -0,0 +1,389 @@
+import fcntl
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import uuid4
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from loguru import logger
+
+
+_VECTORS_FILE = "vectors.npy"
+_CHUNKS_FILE = "chunks.sqlite3"
+_INITIAL_CAPACITY = 1024
+# limite de variáveis por statement do SQLite
+_SQL_BATCH = 500
+# linhas copiadas por vez na compactação
+_COMPACT_BATCH = 65536
+_LOCK_FILE = ".writer.lock"
+# diretórios já travados por este processo: o descritor fica aberto até o fim do processo
+_claimed: Dict[str, int] = {}
+_claimed_lock = threading.Lock()
+
+
+class StoreInUse(RuntimeError):
+    pass
+
+
+class NumpyVectorStore(VectorStore):
+    """Busca exata (força bruta) sobre embeddings normalizados em um `.npy` mapeado em memória.
+
+    Cada linha da matriz float32 é um chunk; id, texto e metadata ficam em uma tabela SQLite
+    ao lado. A busca é um único produto matriz-vetor seguido de `argpartition`, o que para
+    coleções pequenas e médias sai mais barato que o cliente do Chroma. Linhas apagadas são
+    reaproveitadas pelas próximas inserções.
+
+    As linhas livres e o tamanho da matriz só existem na memória do processo: um único
+    processo pode abrir os índices de um diretório (ver `claim_store_dir`).
+    """
+
+    def __init__(self, path: str, embedding_function: Optional[Embeddings] = None):
+        self.path = path
+        self._embedding = embedding_function
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._row_of: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._valid = np.zeros(0, dtype=bool)
+        self._free: List[int] = []
+        self._size = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(path, _CHUNKS_FILE), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " id TEXT PRIMARY KEY, row INTEGER NOT NULL UNIQUE, document TEXT, metadata TEXT)"
+        )
+
+        vectors_path = os.path.join(path, _VECTORS_FILE)
+        if os.path.exists(vectors_path):
+            self._matrix = np.load(vectors_path, mmap_mode="r+")
+            capacity = len(self._matrix)
+            self._ids = [None] * capacity
+            self._valid = np.zeros(capacity, dtype=bool)
+            for chunk_id, row in self._conn.execute("SELECT id, row FROM chunks"):
+                self._row_of[chunk_id] = row
+                self._ids[row] = chunk_id
+                self._valid[row] = True
+            self._size = max(self._row_of.values(), default=-1) + 1
+            self._free = [row for row in range(self._size) if not self._valid[row]]
+        logger.info(f"Índice NumPy carregado de {path} ({len(self._row_of)} chunks)")
+
+    @property
+    def embeddings(self) -> Optional[Embeddings]:
+        return self._embedding
+
+    @property
+    def _collection(self) -> "NumpyVectorStore":
+        # o vector_service usa a collection crua do Chroma (upsert/update/get/count); aqui é o próprio store
+        return self
+
+    def count(self) -> int:
+        return len(self._row_of)
+
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Optional[dict]]] = None,
+    ):
+        if not ids:
+            return
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+        documents = documents or [None] * len(ids)
+        metadatas = metadatas or [None] * len(ids)
+
+        with self._lock:
+            if self._matrix is None:
+                self._create(vectors.shape[1], max(_INITIAL_CAPACITY, len(ids)))
+            rows = []
+            for chunk_id in ids:
+                row = self._row_of.get(chunk_id)
+                if row is None:
+                    row = self._allocate()
+                    self._row_of[chunk_id] = row
+                    self._ids[row] = chunk_id
+                rows.append(row)
+            self._matrix[rows] = vectors
+            self._matrix.flush()
+            self._valid[rows] = True
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?)",
+                [
+                    (chunk_id, row, text, json.dumps(metadata) if metadata else None)
+                    for chunk_id, row, text, metadata in zip(ids, rows, documents, metadatas)
+                ],
+            )
+            self._conn.commit()
+
+    def update(self, ids: List[str], metadatas: List[Optional[dict]]):
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE chunks SET metadata = ? WHERE id = ?",
+                [(json.dumps(metadata) if metadata else None, chunk_id) for chunk_id, metadata in zip(ids, metadatas)],
+            )
+            self._conn.commit()
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        with self._lock:
+            for chunk_id in ids or []:
+                row = self._row_of.pop(chunk_id, None)
+                if row is None:
+                    continue
+                self._valid[row] = False
+                self._ids[row] = None
+                self._free.append(row)
+            self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(chunk_id,) for chunk_id in ids or []])
+            self._conn.commit()
+        return True
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[dict] = None,
+        include: Iterable[str] = ("documents", "metadatas"),
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> dict:
+        """Mesmo formato do `get` do Chroma; `where` aceita igualdade de chaves da metadata.
+
+        Sem `ids`, `limit`/`offset` paginam os chunks na ordem das linhas da matriz.
+        """
+        include = set(include)
+        rows = []
+        with self._lock:
+            if ids is not None:
+                for start in range(0, len(ids), _SQL_BATCH):
+                    batch = ids[start:start + _SQL_BATCH]
+                    rows.extend(self._conn.execute(
+                        f"SELECT id, row, document, metadata FROM chunks WHERE id IN ({','.join('?' * len(batch))})",
+                        batch,
+                    ))
+            else:
+                clauses = [f"json_extract(metadata, '$.{key}') = ?" for key in (where or {})]
+                sql = "SELECT id, row, document, metadata FROM chunks"
+                if clauses:
+                    sql += " WHERE " + " AND ".join(clauses)
+                params = list((where or {}).values())
+                if limit is not None:
+                    sql += " ORDER BY row LIMIT ? OFFSET ?"
+                    params += [limit, offset]
+                rows = self._conn.execute(sql, params).fetchall()
+            matrix = self._matrix
+
+        result = {"ids": [chunk_id for chunk_id, _, _, _ in rows]}
+        if "documents" in include:
+            result["documents"] = [text for _, _, text, _ in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [json.loads(metadata) if metadata else None for _, _, _, metadata in rows]
+        if "embeddings" in include:
+            result["embeddings"] = list(matrix[[row for _, row, _, _ in rows]]) if rows else []
+        return result
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        ids = ids or [str(uuid4()) for _ in texts]
+        self.upsert(ids, self._embedding.embed_documents(texts), texts, metadatas)
+        return ids
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        *,
+        path: str,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        store = cls(path, embedding)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self._embedding.embed_query(query), k=k)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vectors([embedding], k=k)[0]
+
+    def similarity_search_by_vectors(self, embeddings: Sequence[Sequence[float]], k: int = 4) -> List[List[Document]]:
+        return [[doc for doc, _ in row] for row in self.similarity_search_by_vectors_with_scores(embeddings, k)]
+
+    def similarity_search_by_vectors_with_scores(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        k: int = 4,
+    ) -> List[List[Tuple[Document, float]]]:
+        """Várias consultas em um único produto matriz-matriz; o score é a similaridade de cosseno."""
+        queries = _normalize(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+        with self._lock:
+            matrix, size = self._matrix, self._size
+            valid = self._valid[:size].copy()
+        if matrix is None or not valid.any() or k <= 0:
+            return [[] for _ in queries]
+
+        scores = queries @ matrix[:size].T
+        scores[:, ~valid] = -np.inf
+        k = min(k, int(valid.sum()))
+        if k < size:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(size), (len(queries), size))
+        order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(scores, top, axis=1).tolist()
+
+        with self._lock:
+            # uma linha apagada (ou reaproveitada) durante a busca fica de fora
+            ranked = [
+                [(self._ids[row], score) for row, score in zip(rows, row_scores) if self._valid[row]]
+                for rows, row_scores in zip(top.tolist(), top_scores)
+            ]
+        data = self.get(ids=list({chunk_id for hits in ranked for chunk_id, _ in hits}))
+        rows_by_id = {
+            chunk_id: (text or "", metadata or {})
+            for chunk_id, text, metadata in zip(data["ids"], data["documents"], data["metadatas"])
+        }
+        # um Document por consulta: quem chama pode anotar a metadata sem afetar as outras
+        return [
+            [
+                (Document(id=chunk_id, page_content=rows_by_id[chunk_id][0], metadata=dict(rows_by_id[chunk_id][1])), score)
+                for chunk_id, score in hits
+                if chunk_id in rows_by_id
+            ]
+            for hits in ranked
+        ]
+
+    def compact(self) -> int:
+        """Reescreve a matriz só com as linhas em uso (na mesma ordem) e faz VACUUM no SQLite.
+
+        Devolve quantas linhas (apagadas ou de capacidade sobrando) foram liberadas.
+        """
+        with self._lock:
+            freed = 0
+            if self._matrix is not None:
+                rows = sorted(self._row_of.values())
+                ids = [self._ids[row] for row in rows]
+                capacity = max(_INITIAL_CAPACITY, len(rows))
+                path = os.path.join(self.path, _VECTORS_FILE)
+                tmp = f"{path}.tmp"
+                matrix = np.lib.format.open_memmap(
+                    tmp, mode="w+", dtype=np.float32, shape=(capacity, self._matrix.shape[1])
+                )
+                for start in range(0, len(rows), _COMPACT_BATCH):
+                    batch = rows[start:start + _COMPACT_BATCH]
+                    matrix[start:start + len(batch)] = self._matrix[batch]
+                matrix.flush()
+                with self._conn:
+                    # row é UNIQUE: as linhas antigas saem do caminho antes de receber as novas
+                    self._conn.execute("UPDATE chunks SET row = -1 - row")
+                    self._conn.executemany(
+                        "UPDATE chunks SET row = ? WHERE id = ?", [(row, chunk_id) for row, chunk_id in enumerate(ids)]
+                    )
+                os.replace(tmp, path)
+                freed = len(self._matrix) - capacity
+                self._matrix = matrix
+                self._ids = ids + [None] * (capacity - len(ids))
+                self._valid = np.zeros(capacity, dtype=bool)
+                self._valid[:len(ids)] = True
+                self._row_of = {chunk_id: row for row, chunk_id in enumerate(ids)}
+                self._free = []
+                self._size = len(ids)
+            self._conn.execute("VACUUM")
+            # em WAL o VACUUM só chega ao arquivo principal no checkpoint
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        logger.info(f"Índice NumPy em {self.path} compactado ({freed} linhas liberadas)")
+        return freed
+
+    def _select_relevance_score_fn(self):
+        # os scores já são similaridade de cosseno
+        return lambda score: score
+
+    def _create(self, dim: int, capacity: int):
+        self._matrix = np.lib.format.open_memmap(
+            os.path.join(self.path, _VECTORS_FILE), mode="w+", dtype=np.float32, shape=(capacity, dim)
+        )
+        self._ids = [None] * capacity
+        self._valid = np.zeros(capacity, dtype=bool)
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if self._size == len(self._matrix):
+            self._grow(2 * len(self._matrix))
+        self._size += 1
+        return self._size - 1
+
+    def _grow(self, capacity: int):
+        # novo arquivo com o dobro de linhas; buscas em andamento seguem no mapeamento antigo
+        path = os.path.join(self.path, _VECTORS_FILE)
+        tmp = f"{path}.tmp"
+        matrix = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(capacity, self._matrix.shape[1]))
+        matrix[:self._size] = self._matrix[:self._size]
+        matrix.flush()
+        os.replace(tmp, path)
+        self._matrix = matrix
+        self._ids.extend([None] * (capacity - len(self._ids)))
+        self._valid = np.concatenate([self._valid, np.zeros(capacity - len(self._valid), dtype=bool)])
+
+
+def claim_store_dir(root: str):
+    """Trava `root` para este processo; levanta StoreInUse se outro processo já o tiver aberto.
+
+    Dois processos gravando no mesmo índice escolheriam as mesmas linhas livres, e o
+    `INSERT OR REPLACE` de um apagaria os chunks do outro. O lock cai quando o processo termina.
+    """
+    root = os.path.abspath(root)
+    with _claimed_lock:
+        if root in _claimed:
+            return
+        os.makedirs(root, exist_ok=True)
+        fd = os.open(os.path.join(root, _LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise StoreInUse(
+                f"{root} is in use by another process: VECTOR_BACKEND=numpy supports a single API process "
+                "(run uvicorn with one worker and stop the API before using the CLI)"
+            ) from None
+        _claimed[root] = fd
+
+
+def list_stores(root: str) -> List[str]:
+    if not os.path.isdir(root):
+        return []
+    return [name for name in os.listdir(root) if os.path.exists(os.path.join(root, name, _CHUNKS_FILE))]
+
+
+def stored_count(path: str) -> int:
+    conn = sqlite3.connect(os.path.join(path, _CHUNKS_FILE))
+    try:
+        return conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def delete_store(path: str):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
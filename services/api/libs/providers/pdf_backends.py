@@ -0,0 +1,108 @@
+"""Backends de extração de texto de PDF.
+
+O `pdfium` lê a camada de texto direto do PDFium (C++), dezenas de vezes mais rápido que a
+análise de layout em Python do `pdfplumber`. No modo `auto` toda página passa primeiro pelo
+pdfium e só é extraída de novo pelo pdfplumber quando o texto parece ruim: muitos glifos
+sem mapeamento para Unicode, ou linhas desenhadas fora da ordem de leitura, que o pdfium
+devolve na ordem do arquivo e o pdfplumber reordena pela posição na página.
+"""
+import re
+import threading
+from typing import BinaryIO, List, Tuple, Union
+
+from libs.utils.envs import PDF_EXTRACTION_BACKEND, PdfBackend
+
+
+# fração do texto em glifos sem Unicode (U+FFFD, uso privado, controle) que manda a página para o pdfplumber
+_GARBAGE_RATIO = 0.1
+# fração dos trechos que sobem na página em relação ao anterior, na mesma coluna
+_OUT_OF_ORDER_RATIO = 0.2
+_GARBAGE_RE = re.compile(r'[\ufffd\ue000-\uf8ff\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# o PDFium não é thread-safe: uploads processados em threads diferentes se revezam nele
+_pdfium_lock = threading.Lock()
+
+
+class PdfTextReader:
+    """Texto bruto de cada página de um PDF e o backend que o extraiu."""
+
+    def __init__(self, source: Union[str, BinaryIO], backend: str = PDF_EXTRACTION_BACKEND):
+        self.backend = PdfBackend(backend)
+        self._source = source
+        self._pdfium = None
+        self._plumber = None
+
+        if self.backend == PdfBackend.PDFPLUMBER:
+            self.page_count = len(self._get_plumber().pages)
+        else:
+            import pypdfium2
+
+            with _pdfium_lock:
+                self._pdfium = pypdfium2.PdfDocument(source)
+                self.page_count = len(self._pdfium)
+
+    def __enter__(self) -> "PdfTextReader":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def extract(self, index: int) -> Tuple[str, str]:
+        """(texto bruto, backend usado) da página `index`, contada a partir de 0."""
+        if self.backend != PdfBackend.PDFPLUMBER:
+            text, rects = self._extract_pdfium(index)
+            if self.backend == PdfBackend.PDFIUM or not _needs_fallback(text, rects):
+                return text, PdfBackend.PDFIUM.value
+
+        page = self._get_plumber().pages[index]
+        try:
+            return page.extract_text() or "", PdfBackend.PDFPLUMBER.value
+        finally:
+            page.close()
+
+    def close(self):
+        if self._pdfium is not None:
+            with _pdfium_lock:
+                self._pdfium.close()
+            self._pdfium = None
+        if self._plumber is not None:
+            self._plumber.close()
+            self._plumber = None
+
+    def _extract_pdfium(self, index: int) -> Tuple[str, List[Tuple[float, float, float, float]]]:
+        with _pdfium_lock:
+            page = self._pdfium[index]
+            textpage = page.get_textpage()
+            try:
+                text = textpage.get_text_range()
+                rects = []
+                if self.backend == PdfBackend.AUTO:
+                    rects = [textpage.get_rect(i) for i in range(textpage.count_rects())]
+            finally:
+                textpage.close()
+                page.close()
+        # U+FFFE marca o hífen de fim de linha; o pdfplumber devolve "-"
+        return text.replace("\ufffe", "-"), rects
+
+    def _get_plumber(self):
+        # no modo auto só abre o pdfplumber se alguma página precisar dele
+        if self._plumber is None:
+            import pdfplumber
+
+            self._plumber = pdfplumber.open(self._source)
+        return self._plumber
+
+
+def _needs_fallback(text: str, rects: List[Tuple[float, float, float, float]]) -> bool:
+    if text and len(_GARBAGE_RE.findall(text)) > _GARBAGE_RATIO * len(text):
+        return True
+    if len(rects) < 2:
+        return False
+    # (left, bottom, right, top): subir mais de uma linha sem passar para a direita do trecho
+    # anterior (o que seria uma nova coluna) indica texto fora da ordem de leitura
+    upward = sum(
+        1
+        for previous, current in zip(rects, rects[1:])
+        if current[3] > previous[3] + (previous[3] - previous[1]) and current[0] < previous[2]
+    )
+    return upward > _OUT_OF_ORDER_RATIO * (len(rects) - 1)
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from loguru import logger
+
+from libs.utils.metrics import RETRIEVAL_CACHE
+
+
+def normalize_query(text: str) -> str:
+    """Mesma chave para perguntas que só diferem em caixa, espaços ou forma Unicode."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class RetrievalCache:
+    """Resultados de busca (ids e scores dos chunks) por pergunta normalizada, top_k, modo e geração.
+
+    O primeiro nível é um LRU em memória. O segundo, opcional, é um SQLite compartilhado pelos
+    workers do uvicorn, que guarda também a geração de cada collection: uma gravação feita em
+    um worker invalida o cache de todos, inclusive o nível em memória dos outros.
+    """
+
+    def __init__(self, max_entries: int, path: Optional[str] = None, disk_max_entries: int = 0):
+        self.max_entries = max_entries
+        self.disk_max_entries = disk_max_entries
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, List[Tuple[str, float]]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS generations (collection TEXT PRIMARY KEY, generation INTEGER NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key BLOB PRIMARY KEY, collection TEXT NOT NULL, hits TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_collection ON results (collection)")
+            self._conn.commit()
+            logger.info(f"Cache de buscas em {path} ({self._count_disk()} entradas)")
+
+    def generation(self, collection: str, local: int) -> int:
+        """Geração compartilhada da collection se houver nível em disco; senão a do processo (`local`)."""
+        if self._conn is None:
+            return local
+        with self._lock:
+            row = self._conn.execute("SELECT generation FROM generations WHERE collection = ?", (collection,)).fetchone()
+        return row[0] if row else 0
+
+    def lookup(self, collection: str, generation: int, mode: str, top_k: int, query: str) -> Optional[List[Tuple[str, float]]]:
+        key = (collection, generation, mode, top_k, normalize_query(query))
+        with self._lock:
+            hits = self._entries.get(key)
+            if hits is not None:
+                self._entries.move_to_end(key)
+                self.hits["memory"] += 1
+                RETRIEVAL_CACHE.inc(result="hit_memory")
+                return hits
+            if self._conn is not None:
+                disk_key = _disk_key(key)
+                row = self._conn.execute("SELECT hits FROM results WHERE key = ?", (disk_key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), disk_key))
+                    self._conn.commit()
+                    hits = [tuple(hit) for hit in json.loads(row[0])]
+                    self._remember(key, hits)
+                    self.hits["disk"] += 1
+                    RETRIEVAL_CACHE.inc(result="hit_disk")
+                    return hits
+            self.misses += 1
+        RETRIEVAL_CACHE.inc(result="miss")
+        return None
+
+    def store(self, collection: str, generation: int, mode: str, top_k: int, query: str, hits: List[Tuple[str, float]]):
+        key = (collection, generation, mode, top_k, normalize_query(query))
+        with self._lock:
+            self._remember(key, hits)
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                (_disk_key(key), collection, json.dumps(hits), time.time()),
+            )
+            # contagem real da tabela: os outros workers também gravam no mesmo arquivo
+            overflow = self._count_disk() - self.disk_max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                )
+            self._conn.commit()
+
+    def invalidate(self, collection: str):
+        """Chamado a cada alteração da collection: descarta os resultados dela e avança a geração compartilhada."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == collection]:
+                del self._entries[key]
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT INTO generations VALUES (?, 1)"
+                " ON CONFLICT (collection) DO UPDATE SET generation = generation + 1",
+                (collection,),
+            )
+            self._conn.execute("DELETE FROM results WHERE collection = ?", (collection,))
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.hits["memory"] + self.hits["disk"]
+            total = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.hits["memory"],
+                "disk_hits": self.hits["disk"],
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_entries": self._count_disk() if self._conn is not None else None,
+            }
+
+    def _count_disk(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _remember(self, key: Tuple, hits: List[Tuple[str, float]]):
+        self._entries[key] = hits
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def _disk_key(key: Tuple) -> bytes:
+    return hashlib.sha256("\x00".join(map(str, key)).encode("utf-8")).digest()
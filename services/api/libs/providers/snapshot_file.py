@@ -0,0 +1,151 @@
+"""Formato colunar de snapshot de uma collection (`.ragsnap`).
+
+O arquivo é uma sequência de grupos de linhas seguida de um rodapé JSON:
+
+    MAGIC | grupo 0 | grupo 1 | ... | rodapé (JSON) | tamanho do rodapé (uint64) | MAGIC
+
+Cada grupo guarda as colunas de até `batch_size` chunks em blocos contíguos: os vetores
+em float32 (ou int8 com uma escala float32 por linha) crus, e ids, textos e metadata como
+listas JSON comprimidas com zlib. O rodapé tem a posição de cada bloco, a dimensão, o
+modelo de embeddings e os documentos do registro, então a leitura e a escrita são
+em streaming, um grupo por vez.
+"""
+import json
+import struct
+import zlib
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from libs.utils.envs import SnapshotQuantization
+
+
+MAGIC = b"RAGSNAP1"
+FORMAT_VERSION = 1
+_TRAILER = struct.Struct("<Q")
+_STRING_COLUMNS = ("ids", "documents", "metadatas")
+# compressão rápida: o texto cai para menos da metade e o gargalo continua sendo o store
+_ZLIB_LEVEL = 1
+
+
+class InvalidSnapshot(ValueError):
+    pass
+
+
+class SnapshotWriter:
+    """Grava grupos de chunks (ids, vetores, textos, metadata) em um arquivo de snapshot."""
+
+    def __init__(self, file: BinaryIO, quantization: str = SnapshotQuantization.NONE):
+        self.quantization = SnapshotQuantization(quantization)
+        self.count = 0
+        self.dim: Optional[int] = None
+        self._file = file
+        self._groups: List[dict] = []
+        self._file.write(MAGIC)
+
+    def write(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        documents: List[Optional[str]],
+        metadatas: List[Optional[dict]],
+    ):
+        if not ids:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise InvalidSnapshot(f"vector dimension {vectors.shape[1]} does not match the snapshot ({self.dim})")
+
+        columns = {}
+        if self.quantization == SnapshotQuantization.INT8:
+            quantized, scales = quantize_int8(vectors)
+            columns["vectors"] = self._write_block(quantized.tobytes())
+            columns["scales"] = self._write_block(scales.tobytes())
+        else:
+            columns["vectors"] = self._write_block(vectors.tobytes())
+        for name, values in zip(_STRING_COLUMNS, (ids, documents, metadatas)):
+            encoded = json.dumps(values, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            columns[name] = self._write_block(zlib.compress(encoded, _ZLIB_LEVEL))
+        self._groups.append({"rows": len(ids), "columns": columns})
+        self.count += len(ids)
+
+    def close(self, **header: Any):
+        """Grava o rodapé; `header` vai junto (collection, modelo de embeddings, documentos...)."""
+        footer = json.dumps({
+            **header,
+            "version": FORMAT_VERSION,
+            "count": self.count,
+            "dim": self.dim,
+            "quantization": self.quantization.value,
+            "groups": self._groups,
+        }, ensure_ascii=False).encode("utf-8")
+        self._file.write(footer)
+        self._file.write(_TRAILER.pack(len(footer)))
+        self._file.write(MAGIC)
+        self._file.flush()
+
+    def _write_block(self, data: bytes) -> Tuple[int, int]:
+        offset = self._file.tell()
+        self._file.write(data)
+        return offset, len(data)
+
+
+class SnapshotReader:
+    """Lê o rodapé de um snapshot e devolve os chunks grupo a grupo, com vetores em float32."""
+
+    def __init__(self, file: BinaryIO):
+        self._file = file
+        file.seek(0)
+        if file.read(len(MAGIC)) != MAGIC:
+            raise InvalidSnapshot("not a collection snapshot")
+        if file.seek(0, 2) < 2 * len(MAGIC) + _TRAILER.size:
+            raise InvalidSnapshot("incomplete file, footer not found")
+        file.seek(-(_TRAILER.size + len(MAGIC)), 2)
+        (footer_size,) = _TRAILER.unpack(file.read(_TRAILER.size))
+        if file.read(len(MAGIC)) != MAGIC:
+            raise InvalidSnapshot("incomplete file, footer not found")
+        try:
+            file.seek(-(footer_size + _TRAILER.size + len(MAGIC)), 2)
+            self.header = json.loads(file.read(footer_size))
+        except (OSError, OverflowError, ValueError) as e:
+            raise InvalidSnapshot(f"unreadable footer: {e}")
+        if self.header.get("version") != FORMAT_VERSION:
+            raise InvalidSnapshot(f"unsupported version {self.header.get('version')}")
+        self.count: int = self.header["count"]
+        self.dim: Optional[int] = self.header["dim"]
+        self.quantization = SnapshotQuantization(self.header["quantization"])
+
+    def __iter__(self) -> Iterator[Tuple[List[str], np.ndarray, List[Optional[str]], List[Optional[dict]]]]:
+        for group in self.header["groups"]:
+            columns = group["columns"]
+            if self.quantization == SnapshotQuantization.INT8:
+                quantized = np.frombuffer(self._read(columns["vectors"]), dtype=np.int8).reshape(-1, self.dim)
+                vectors = dequantize_int8(quantized, np.frombuffer(self._read(columns["scales"]), dtype=np.float32))
+            else:
+                vectors = np.frombuffer(self._read(columns["vectors"]), dtype=np.float32).reshape(-1, self.dim)
+            ids, documents, metadatas = (
+                json.loads(zlib.decompress(self._read(columns[name]))) for name in _STRING_COLUMNS
+            )
+            yield ids, vectors, documents, metadatas
+
+    def _read(self, block: List[int]) -> bytes:
+        offset, size = block
+        self._file.seek(offset)
+        data = self._file.read(size)
+        if len(data) != size:
+            raise InvalidSnapshot("truncated file")
+        return data
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantização simétrica por linha: cada vetor vira int8 e uma escala (máximo absoluto / 127)."""
+    scales = np.abs(vectors).max(axis=1) / 127
+    scales[scales == 0] = 1.0
+    quantized = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+def dequantize_int8(quantized: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    return quantized.astype(np.float32) * scales[:, None]
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from libs.utils.envs import (
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_TTL_SECONDS,
+    COLLECTION_NAME,
+    MAX_OPEN_COLLECTIONS,
+)
+
+
+class SemanticAnswerCache:
+    """Respostas anteriores indexadas pelo embedding (normalizado) da pergunta.
+
+    Uma pergunta nova é atendida do cache quando a similaridade de cosseno com uma
+    pergunta já respondida passa de `threshold`, na mesma geração da collection.
+    """
+
+    def __init__(self, threshold: float, ttl_seconds: int, max_entries: int):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._latency = {"hit": [0.0, 0], "miss": [0.0, 0]}
+
+        self._lock = threading.Lock()
+        self._generation: Optional[int] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._answers: List[Optional[Tuple[str, List[dict]]]] = [None] * max_entries
+        self._created_at = np.zeros(max_entries)
+        self._last_used = np.zeros(max_entries)
+        self._used = np.zeros(max_entries, dtype=bool)
+
+    def lookup(self, embedding: List[float], generation: int) -> Optional[Tuple[str, List[dict]]]:
+        query = _normalize(embedding)
+        with self._lock:
+            self._check_generation(generation)
+            self._expire()
+            if self._vectors is None or not self._used.any():
+                self.misses += 1
+                return None
+
+            scores = self._vectors @ query
+            scores[~self._used] = -1.0
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._last_used[best] = time.time()
+            answer, references = self._answers[best]
+            return answer, list(references)
+
+    def store(self, embedding: List[float], generation: int, answer: str, references: List[dict]):
+        vector = _normalize(embedding)
+        with self._lock:
+            self._check_generation(generation)
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+            free = np.flatnonzero(~self._used)
+            slot = int(free[0]) if free.size else int(np.argmin(self._last_used))
+            now = time.time()
+            self._vectors[slot] = vector
+            self._answers[slot] = (answer, list(references))
+            self._created_at[slot] = now
+            self._last_used[slot] = now
+            self._used[slot] = True
+
+    def observe(self, hit: bool, seconds: float):
+        with self._lock:
+            bucket = self._latency["hit" if hit else "miss"]
+            bucket[0] += seconds
+            bucket[1] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": int(self._used.sum()),
+                "max_entries": self.max_entries,
+                "avg_hit_ms": _avg_ms(*self._latency["hit"]),
+                "avg_miss_ms": _avg_ms(*self._latency["miss"]),
+            }
+
+    def _check_generation(self, generation: int):
+        if self._generation != generation:
+            if self._used.any():
+                logger.info("Collection alterada, cache de respostas invalidado")
+            self._clear()
+            self._generation = generation
+
+    def _expire(self):
+        expired = self._used & (self._created_at < time.time() - self.ttl_seconds)
+        self._used &= ~expired
+
+    def _clear(self):
+        self._used[:] = False
+        self._answers = [None] * self.max_entries
+
+
+def _normalize(embedding: List[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _avg_ms(total: float, count: int) -> float:
+    return round(total / count * 1000, 2) if count else 0.0
+
+
+# um cache por collection, em LRU com o mesmo limite do pool de collections abertas
+_answer_caches: "OrderedDict[str, SemanticAnswerCache]" = OrderedDict()
+_answer_caches_lock = threading.Lock()
+
+
+def get_answer_cache(collection: Optional[str] = None) -> Optional[SemanticAnswerCache]:
+    if not ANSWER_CACHE_ENABLED:
+        return None
+    name = collection or COLLECTION_NAME
+    with _answer_caches_lock:
+        cache = _answer_caches.get(name)
+        if cache is None:
+            cache = _answer_caches[name] = SemanticAnswerCache(
+                threshold=ANSWER_CACHE_THRESHOLD,
+                ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+                max_entries=ANSWER_CACHE_MAX_ENTRIES,
+            )
+        _answer_caches.move_to_end(name)
+        while len(_answer_caches) > MAX_OPEN_COLLECTIONS:
+            _answer_caches.popitem(last=False)
+    return cache
@@ -0,0 +1,102 @@
+import re
+from typing import Callable, List, Tuple
+
+from langchain_core.documents import Document
+from loguru import logger
+
+from libs.utils.envs import (
+    CONTEXT_DEDUP_THRESHOLD,
+    CONTEXT_TOKEN_BUDGET,
+    LLM_PROVIDER,
+    LLMProvider,
+    OPENAI_LLM_MODEL,
+)
+
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_WORD_RE = re.compile(r"\w+")
+# abaixo disso não vale a pena incluir um pedaço truncado de chunk
+_MIN_TRUNCATED_TOKENS = 32
+
+_count_tokens: Callable[[str], int] | None = None
+
+
+def count_tokens(text: str) -> int:
+    global _count_tokens
+    if _count_tokens is None:
+        _count_tokens = _load_token_counter()
+    return _count_tokens(text)
+
+
+def _load_token_counter() -> Callable[[str], int]:
+    try:
+        import tiktoken
+
+        model = OPENAI_LLM_MODEL if LLM_PROVIDER != LLMProvider.OLLAMA else "gpt-4o-mini"
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        logger.info(f"Contagem de tokens com tiktoken ({encoding.name})")
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception as e:
+        # sem os arquivos BPE (ex.: container sem rede) usa a aproximação de ~4 caracteres por token
+        logger.warning(f"tiktoken indisponível, estimando tokens por caracteres: {e}")
+        return lambda text: (len(text) + 3) // 4
+
+
+def pack_context(docs: List[Document], budget: int = CONTEXT_TOKEN_BUDGET) -> Tuple[List[Document], int, int]:
+    """Seleciona chunks (já em ordem de relevância) até o orçamento de tokens.
+
+    Descarta quase-duplicatas e trunca em fim de frase o chunk que não cabe inteiro; com
+    `budget` 0 os chunks passam sem alteração. Retorna (chunks selecionados, tokens usados,
+    tokens economizados).
+    """
+    total = sum(count_tokens(doc.page_content) for doc in docs)
+    if budget <= 0:
+        return list(docs), total, 0
+    packed: List[Document] = []
+    seen: List[set] = []
+    used = 0
+
+    for doc in docs:
+        words = set(_WORD_RE.findall(doc.page_content.lower()))
+        if any(_jaccard(words, other) >= CONTEXT_DEDUP_THRESHOLD for other in seen):
+            continue
+
+        tokens = count_tokens(doc.page_content)
+        remaining = budget - used if budget > 0 else tokens
+        if tokens <= remaining:
+            packed.append(doc)
+            seen.append(words)
+            used += tokens
+            continue
+
+        if remaining >= _MIN_TRUNCATED_TOKENS:
+            text, tokens = _truncate_sentences(doc.page_content, remaining)
+            if text:
+                packed.append(Document(id=doc.id, page_content=text, metadata=doc.metadata))
+                used += tokens
+        break
+
+    if len(packed) < len(docs):
+        logger.info(f"Contexto: {len(packed)}/{len(docs)} chunks, {used} tokens ({total - used} economizados)")
+    return packed, used, total - used
+
+
+def _truncate_sentences(text: str, budget: int) -> Tuple[str, int]:
+    sentences = []
+    used = 0
+    for sentence in _SENTENCE_RE.split(text):
+        tokens = count_tokens(sentence + " ")
+        if used + tokens > budget:
+            break
+        sentences.append(sentence)
+        used += tokens
+    return " ".join(sentences), used
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
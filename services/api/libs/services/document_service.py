@@ -1,48 +1,173 @@
-from typing import List
+import hashlib
+import time
+from collections import Counter
+from typing import Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
 from fastapi import UploadFile
 from loguru import logger
 
 from langchain_core.documents import Document
 
-from libs.services.pdf_service import extract_text_from_pdf
-from libs.services.vector_service import get_text_splitter, add_documents
-from libs.structures.documents import Document as DocModel, DocumentMetadata
+from libs.services.pdf_service import iter_pdf_pages
+from libs.services.vector_service import (
+    delete_chunks,
+    document_lock,
+    get_chunk_ids,
+    get_document_registry,
+    get_embedding_model,
+    iter_split_pages,
+    resolve_collection,
+    sync_document_chunks,
+)
+from libs.structures.documents import Document as DocModel, DocumentDetail, DocumentMetadata, DocumentRecord
+from libs.utils.envs import EMBEDDING_PROVIDER
 
 
-def process_documents(files: List[UploadFile]) -> dict:
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def process_documents(files: List[UploadFile], collection: Optional[str] = None) -> dict:
+    collection = resolve_collection(collection)
     documents = []
     total_chunks = 0
-    splitter = get_text_splitter()
+    reused = added = removed = 0
 
     for file in files:
-        metadata = DocumentMetadata(
-            filename=file.filename,
-            content_type=file.content_type,
-            size_bytes=None,
-        )
-        doc_model = DocModel(metadata=metadata)
-
-        text = extract_text_from_pdf(file)
-        if not text or len(text.strip()) < 50:
-            logger.warning(f"Documento {file.filename} vazio ou muito curto, ignorando")
+        doc_model = process_document(file, collection)
+        if doc_model is None:
             continue
-
-        lc_doc = Document(
-            page_content=text,
-            metadata={
-                "document_id": str(doc_model.id),
-                "source": file.filename or "unknown",
-            },
-        )
-        chunks = splitter.split_documents([lc_doc])
-        doc_model.total_chunks = len(chunks)
-
-        stored = add_documents(chunks)
-        total_chunks += stored
+        total_chunks += doc_model.total_chunks
+        reused += doc_model.chunks_reused
+        added += doc_model.chunks_added
+        removed += doc_model.chunks_removed
         documents.append(doc_model)
 
     return {
         "message": "Documents processed successfully",
+        "collection": collection,
         "documents_indexed": len(documents),
         "total_chunks": total_chunks,
+        "chunks_reused": reused,
+        "chunks_added": added,
+        "chunks_removed": removed,
     }
+
+
+def process_document(file: UploadFile, collection: Optional[str] = None) -> Optional[DocModel]:
+    started = time.perf_counter()
+    collection = resolve_collection(collection)
+    content_hash, size_bytes = _hash_file(file)
+    metadata = DocumentMetadata(
+        filename=file.filename,
+        content_type=file.content_type,
+        size_bytes=size_bytes,
+    )
+    doc_model = DocModel(
+        id=UUID(hex=content_hash[:32]),
+        metadata=metadata,
+        content_hash=content_hash,
+    )
+
+    registry = get_document_registry()
+    registered = registry.find_by_hash(collection, content_hash)
+    # documentos indexados antes do registro só são encontrados pela metadata do Chroma
+    existing = registered["total_chunks"] if registered else len(get_chunk_ids({"content_hash": content_hash}, collection))
+    if existing:
+        logger.info(f"Documento {file.filename} já indexado, reaproveitando {existing} chunks")
+        doc_model.total_chunks = doc_model.chunks_reused = existing
+        return doc_model
+
+    # páginas, chunks e embeddings fluem em sequência: só o trecho em processamento fica em memória
+    source = file.filename or "unknown"
+    pdf_stats = {}
+    chunks = iter_split_pages(
+        iter_pdf_pages(file, pdf_stats),
+        metadata={
+            "document_id": str(doc_model.id),
+            "content_hash": content_hash,
+            "source": source,
+        },
+    )
+
+    def register(chunk_ids: List[str]):
+        registry.register(
+            {
+                "collection": collection,
+                "id": str(doc_model.id),
+                "source": source,
+                "content_hash": content_hash,
+                "content_type": metadata.content_type,
+                "size_bytes": size_bytes,
+                "page_count": pdf_stats["page_count"],
+                "total_chunks": len(chunk_ids),
+                "embedding_model": f"{EMBEDDING_PROVIDER}:{get_embedding_model()}",
+                "extraction_seconds": round(pdf_stats["extraction_seconds"], 3),
+                "ingest_seconds": round(time.perf_counter() - started, 3),
+                "uploaded_at": metadata.uploaded_at.isoformat(),
+            },
+            chunk_ids,
+        )
+
+    result = sync_document_chunks(source, _with_ids(source, chunks), collection, on_synced=register)
+    if result is None:
+        logger.warning(f"Documento {file.filename} vazio ou muito curto, ignorando")
+        return None
+
+    doc_model.chunks_reused, doc_model.chunks_added, doc_model.chunks_removed, doc_model.total_chunks = result
+    return doc_model
+
+
+def list_documents(collection: Optional[str] = None, limit: int = 100, offset: int = 0) -> List[DocumentRecord]:
+    collection = resolve_collection(collection)
+    return [DocumentRecord(**record) for record in get_document_registry().list(collection, limit, offset)]
+
+
+def get_document(document_id: UUID, collection: Optional[str] = None) -> Optional[DocumentDetail]:
+    collection = resolve_collection(collection)
+    registry = get_document_registry()
+    record = registry.get(collection, str(document_id))
+    if record is None:
+        return None
+    return DocumentDetail(**record, chunk_ids=registry.chunk_ids(collection, str(document_id)))
+
+
+def delete_document(document_id: UUID, collection: Optional[str] = None) -> bool:
+    """Remove o documento e os seus chunks pelos ids do registro. Retorna False se ele não estiver registrado."""
+    collection = resolve_collection(collection)
+    registry = get_document_registry()
+    record = registry.get(collection, str(document_id))
+    if record is None:
+        return False
+
+    with document_lock(collection, record["source"]):
+        # uma nova versão do arquivo pode ter substituído o registro enquanto o lock era esperado
+        if registry.get(collection, str(document_id)) is None:
+            return False
+        chunk_ids = registry.chunk_ids(collection, str(document_id))
+        delete_chunks(chunk_ids, collection)
+        registry.delete(collection, str(document_id))
+    logger.info(f"✓ Documento {record['source']} removido de {collection} ({len(chunk_ids)} chunks)")
+    return True
+
+
+def _hash_file(file: UploadFile) -> Tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    file.file.seek(0)
+    while block := file.file.read(_HASH_BLOCK_SIZE):
+        digest.update(block)
+        size += len(block)
+    file.file.seek(0)
+    return digest.hexdigest(), size
+
+
+def _with_ids(source: str, chunks: Iterable[Document]) -> Iterator[Tuple[Document, str]]:
+    # a posição é a ocorrência do texto dentro do documento, e não o índice do chunk:
+    # assim um trecho editado no meio do PDF não muda o id dos chunks seguintes
+    occurrences = Counter()
+    for index, chunk in enumerate(chunks):
+        text_hash = hashlib.sha256(chunk.page_content.encode("utf-8")).digest()
+        key = f"{source}\x00{occurrences[text_hash]}\x00{chunk.page_content}"
+        occurrences[text_hash] += 1
+        chunk.metadata["chunk_index"] = index
+        yield chunk, str(UUID(hex=hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]))
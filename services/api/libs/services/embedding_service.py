@@ -0,0 +1,112 @@
+import itertools
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, List, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from loguru import logger
+
+from libs.providers.embedding_cache import CachedEmbeddings
+from libs.services.context_service import count_tokens
+from libs.utils.envs import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_BATCH_TOKENS,
+    EMBEDDING_CONCURRENCY,
+    EMBEDDING_MAX_RETRIES,
+    EMBEDDING_RETRY_BASE_DELAY,
+    EMBEDDING_RETRY_MAX_DELAY,
+)
+from libs.utils.metrics import EMBEDDED_TEXTS, EMBEDDING_SECONDS, ERRORS
+
+
+Batch = Tuple[List[str], List[Document]]
+
+# compartilhado por todas as ingestões, para que o limite de concorrência seja global
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=EMBEDDING_CONCURRENCY,
+            thread_name_prefix="embedding",
+        )
+    return _executor
+
+
+def embed_in_batches(
+    embeddings: Embeddings, ids: List[str], documents: List[Document]
+) -> Iterator[Tuple[List[str], List[Document], List[List[float]]]]:
+    """Gera (ids, documentos, vetores) por batch, na ordem em que os batches terminam.
+
+    No máximo EMBEDDING_CONCURRENCY batches ficam em andamento por chamada, então a
+    memória ocupada por vetores ainda não gravados não cresce com o tamanho da entrada.
+    """
+    batches = _make_batches(ids, documents)
+    executor = _get_executor()
+    pending = {}
+
+    for batch in itertools.islice(batches, EMBEDDING_CONCURRENCY):
+        pending[executor.submit(_embed_with_retry, embeddings, batch[1])] = batch
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            batch_ids, batch_docs = pending.pop(future)
+            vectors = future.result()
+            for batch in itertools.islice(batches, 1):
+                pending[executor.submit(_embed_with_retry, embeddings, batch[1])] = batch
+            yield batch_ids, batch_docs, vectors
+
+
+def _make_batches(ids: List[str], documents: List[Document]) -> Iterator[Batch]:
+    batch_ids: List[str] = []
+    batch_docs: List[Document] = []
+    batch_tokens = 0
+    for chunk_id, doc in zip(ids, documents):
+        tokens = count_tokens(doc.page_content)
+        if batch_ids and (len(batch_ids) >= EMBEDDING_BATCH_SIZE or batch_tokens + tokens > EMBEDDING_BATCH_TOKENS):
+            yield batch_ids, batch_docs
+            batch_ids, batch_docs, batch_tokens = [], [], 0
+        batch_ids.append(chunk_id)
+        batch_docs.append(doc)
+        batch_tokens += tokens
+    if batch_ids:
+        yield batch_ids, batch_docs
+
+
+def _embed_with_retry(embeddings: Embeddings, documents: List[Document]) -> List[List[float]]:
+    texts = [doc.page_content for doc in documents]
+    for attempt in range(EMBEDDING_MAX_RETRIES + 1):
+        try:
+            with EMBEDDING_SECONDS.time(kind="documents"):
+                vectors = embeddings.embed_documents(texts)
+            count_sent_texts(embeddings, len(texts))
+            return vectors
+        except Exception as e:
+            ERRORS.inc(stage="embedding")
+            if attempt == EMBEDDING_MAX_RETRIES or not _is_retryable(e):
+                raise
+            delay = min(EMBEDDING_RETRY_MAX_DELAY, EMBEDDING_RETRY_BASE_DELAY * 2 ** attempt)
+            delay *= 0.5 + random.random() / 2
+            logger.warning(f"Erro ao gerar embeddings ({e}), nova tentativa em {delay:.1f}s")
+            time.sleep(delay)
+
+
+def count_sent_texts(embeddings: Embeddings, count: int):
+    """Conta os textos enviados ao provider; com cache quem conta é o CachedEmbeddings, só os misses."""
+    if not isinstance(embeddings, CachedEmbeddings):
+        EMBEDDED_TEXTS.inc(count)
+
+
+def _is_retryable(error: Exception) -> bool:
+    import httpx
+    import openai
+
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    return isinstance(error, (openai.APIConnectionError, httpx.TransportError, ConnectionError, TimeoutError))
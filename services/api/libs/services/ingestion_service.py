@@ -0,0 +1,160 @@
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import UploadFile
+from loguru import logger
+from starlette.datastructures import Headers
+
+from libs.services.document_service import process_document
+from libs.services.vector_service import resolve_collection
+from libs.structures.documents import FileProgress, FileStatus, IngestionJob, JobStatus
+from libs.utils.envs import (
+    INGESTION_JOB_HISTORY,
+    INGESTION_MAX_QUEUED_JOBS,
+    INGESTION_SPOOL_DIR,
+    INGESTION_WORKERS,
+)
+from libs.utils.metrics import ERRORS
+
+
+class IngestionQueueFull(Exception):
+    pass
+
+
+_executor: ThreadPoolExecutor | None = None
+_jobs: "OrderedDict[UUID, IngestionJob]" = OrderedDict()
+_jobs_lock = threading.Lock()
+# vagas para jobs na fila ou em execução; sem vaga o upload é recusado (backpressure)
+_job_slots = threading.BoundedSemaphore(INGESTION_MAX_QUEUED_JOBS)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=INGESTION_WORKERS,
+            thread_name_prefix="ingestion",
+        )
+        logger.info(f"Fila de ingestão inicializada com {INGESTION_WORKERS} workers")
+    return _executor
+
+
+def submit_job(files: List[UploadFile], collection: Optional[str] = None) -> IngestionJob:
+    collection = resolve_collection(collection)
+    if not _job_slots.acquire(blocking=False):
+        raise IngestionQueueFull(f"Limite de {INGESTION_MAX_QUEUED_JOBS} jobs de ingestão atingido")
+
+    job = IngestionJob(collection=collection, files=[FileProgress(filename=f.filename or "unknown") for f in files])
+    job_dir = os.path.join(INGESTION_SPOOL_DIR, str(job.id))
+    try:
+        paths = _spool_files(files, job_dir)
+    except Exception:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        _job_slots.release()
+        raise
+
+    with _jobs_lock:
+        _jobs[job.id] = job
+        _trim_history()
+
+    _get_executor().submit(_run_job, job.id, job_dir, paths, [f.content_type for f in files])
+    logger.info(f"Job de ingestão {job.id} enfileirado com {len(files)} arquivos")
+    return get_job(job.id)
+
+
+def get_job(job_id: UUID) -> Optional[IngestionJob]:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return job.model_copy(deep=True) if job else None
+
+
+def list_jobs() -> List[IngestionJob]:
+    with _jobs_lock:
+        return [job.model_copy(deep=True) for job in reversed(_jobs.values())]
+
+
+def _spool_files(files: List[UploadFile], job_dir: str) -> List[str]:
+    os.makedirs(job_dir, exist_ok=True)
+    paths = []
+    for index, file in enumerate(files):
+        path = os.path.join(job_dir, f"{index:04d}.pdf")
+        file.file.seek(0)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(file.file, out)
+        paths.append(path)
+    return paths
+
+
+def _run_job(job_id: UUID, job_dir: str, paths: List[str], content_types: List[Optional[str]]):
+    with _jobs_lock:
+        job = _jobs[job_id]
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.utcnow()
+
+    try:
+        for progress, path, content_type in zip(job.files, paths, content_types):
+            _run_file(job, progress, path, content_type)
+
+        with _jobs_lock:
+            failed = all(f.status == FileStatus.FAILED for f in job.files)
+            job.status = JobStatus.FAILED if failed else JobStatus.COMPLETED
+            job.finished_at = datetime.utcnow()
+        logger.info(f"Job de ingestão {job_id} finalizado: {job.status.value}, {job.total_chunks} chunks")
+
+    except Exception as e:
+        logger.error(f"Erro inesperado no job de ingestão {job_id}: {e}")
+        with _jobs_lock:
+            job.status = JobStatus.FAILED
+            job.finished_at = datetime.utcnow()
+
+    finally:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        _job_slots.release()
+
+
+def _run_file(job: IngestionJob, progress: FileProgress, path: str, content_type: Optional[str]):
+    with _jobs_lock:
+        progress.status = FileStatus.PROCESSING
+
+    try:
+        with open(path, "rb") as fp:
+            upload = UploadFile(
+                file=fp,
+                filename=progress.filename,
+                headers=Headers({"content-type": content_type or "application/pdf"}),
+            )
+            doc_model = process_document(upload, job.collection)
+    except Exception as e:
+        ERRORS.inc(stage="ingestion")
+        logger.error(f"Erro ao processar {progress.filename} no job {job.id}: {e}")
+        with _jobs_lock:
+            progress.status = FileStatus.FAILED
+            progress.error = str(e)
+        return
+
+    with _jobs_lock:
+        if doc_model is None:
+            progress.status = FileStatus.SKIPPED
+        else:
+            unchanged = not doc_model.chunks_added and not doc_model.chunks_removed
+            progress.status = FileStatus.UNCHANGED if unchanged else FileStatus.INDEXED
+            progress.chunks = doc_model.total_chunks or 0
+            progress.chunks_reused = doc_model.chunks_reused
+            progress.chunks_added = doc_model.chunks_added
+            progress.chunks_removed = doc_model.chunks_removed
+            job.total_chunks += progress.chunks
+
+
+def _trim_history():
+    finished = [
+        job_id for job_id, job in _jobs.items()
+        if job.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+    ]
+    for job_id in finished[:max(0, len(_jobs) - INGESTION_JOB_HISTORY)]:
+        del _jobs[job_id]
@@ -1,72 +1,183 @@
-import pdfplumber
+import itertools
+import math
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
 from fastapi import UploadFile
 from loguru import logger
-import re
+
+from libs.providers.pdf_backends import PdfTextReader
+from libs.utils.envs import PDF_EXTRACTION_WORKERS, PDF_PARALLEL_MIN_PAGES
+from libs.utils.metrics import ERRORS, PDF_PAGE_SECONDS, PDF_PAGES
+
+
+# batches por worker: mais de um para equilibrar páginas de custo desigual
+_BATCHES_PER_WORKER = 4
+_MAX_PAGES_PER_BATCH = 16
+
+_process_pool: ProcessPoolExecutor | None = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=PDF_EXTRACTION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info(f"Pool de extração de PDF inicializado com {PDF_EXTRACTION_WORKERS} workers")
+    return _process_pool
 
 
 def extract_text_from_pdf(file: UploadFile) -> str:
-    text = ""
-    
+    text = "\n\n".join(page_text for _, page_text, _ in iter_pdf_pages(file))
+    logger.info(f"Texto extraído: {len(text)} caracteres de {file.filename}")
+    return text
+
+
+def iter_pdf_pages(file: UploadFile, stats: Optional[dict] = None) -> Iterator[Tuple[int, str, dict]]:
+    """Gera (número da página, texto limpo, metadata da página) na ordem do documento, sem páginas vazias.
+
+    A metadata registra o backend que extraiu a página e o tempo gasto nela. As páginas são
+    extraídas sob demanda: só as que estão em processamento ficam em memória. Se `stats`
+    for passado, recebe `page_count` e `extraction_seconds` (soma do tempo das páginas).
+    """
+    stats = {} if stats is None else stats
+    stats.update(page_count=0, extraction_seconds=0.0)
+    for page in _iter_pdf_pages(file, stats):
+        stats["extraction_seconds"] += page[2]["extraction_ms"] / 1000
+        yield page
+
+
+def _iter_pdf_pages(file: UploadFile, stats: dict) -> Iterator[Tuple[int, str, dict]]:
     try:
-        with pdfplumber.open(file.file) as pdf:
-            logger.info(f"Extraindo texto de {file.filename} ({len(pdf.pages)} páginas)")
-            
-            for page_num, page in enumerate(pdf.pages, 1):
-                try:
-                    page_text = page.extract_text()
-                    
+        file.file.seek(0)
+        with PdfTextReader(file.file) as reader:
+            total_pages = stats["page_count"] = reader.page_count
+            logger.info(f"Extraindo texto de {file.filename} ({total_pages} páginas, backend {reader.backend.value})")
+
+            if PDF_EXTRACTION_WORKERS <= 1 or total_pages < PDF_PARALLEL_MIN_PAGES:
+                for index in range(total_pages):
+                    page_text, page_metadata, elapsed = _extract_page(reader, index)
+                    PDF_PAGE_SECONDS.observe(elapsed)
+                    PDF_PAGES.inc()
                     if page_text:
-                        cleaned_page = _clean_extracted_text(page_text)
-                        
-                        if cleaned_page:
-                            text += cleaned_page + "\n\n"
-                            
-                except Exception as e:
-                    logger.warning(f"Erro ao extrair página {page_num}: {e}")
-                    continue
-            
-            logger.info(f"Texto extraído: {len(text)} caracteres de {file.filename}")
-            
+                        yield index + 1, page_text, page_metadata
+                return
+
+        path = _spool_to_disk(file)
+        try:
+            yield from _iter_pages_parallel(path, total_pages, _get_process_pool(), PDF_EXTRACTION_WORKERS)
+        finally:
+            os.unlink(path)
+
     except Exception as e:
+        ERRORS.inc(stage="pdf")
         logger.error(f"Erro ao processar PDF {file.filename}: {e}")
         raise
-    
-    return text.strip()
+
+
+def _spool_to_disk(file: UploadFile) -> str:
+    file.file.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        shutil.copyfileobj(file.file, tmp)
+    return tmp.name
+
+
+def _iter_pages_parallel(path: str, total_pages: int, executor: Executor, workers: int) -> Iterator[Tuple[int, str, dict]]:
+    batch_size = max(1, min(_MAX_PAGES_PER_BATCH, math.ceil(total_pages / (workers * _BATCHES_PER_WORKER))))
+    ranges = ((start, min(start + batch_size, total_pages)) for start in range(0, total_pages, batch_size))
+
+    # janela limitada de batches em andamento, consumidos na ordem das páginas
+    pending = deque(
+        (executor.submit(_extract_page_range, path, start, end), end - start)
+        for start, end in itertools.islice(ranges, workers * 2)
+    )
+    try:
+        while pending:
+            future, count = pending.popleft()
+            pages, elapsed = future.result()
+            for start, end in itertools.islice(ranges, 1):
+                pending.append((executor.submit(_extract_page_range, path, start, end), end - start))
+            # os workers não enxergam as métricas do processo da API: o tempo volta com o resultado
+            for _ in range(count):
+                PDF_PAGE_SECONDS.observe(elapsed / count)
+            PDF_PAGES.inc(count)
+            yield from pages
+    finally:
+        for future, _ in pending:
+            future.cancel()
+
+
+def _extract_page_range(path: str, start: int, end: int) -> Tuple[List[Tuple[int, str, dict]], float]:
+    # executado nos processos do pool: reabre o PDF e processa apenas [start, end)
+    started = time.perf_counter()
+    pages = []
+    with PdfTextReader(path) as reader:
+        for index in range(start, end):
+            page_text, page_metadata, _ = _extract_page(reader, index)
+            if page_text:
+                pages.append((index + 1, page_text, page_metadata))
+    return pages, time.perf_counter() - started
+
+
+def _extract_page(reader: PdfTextReader, index: int) -> Tuple[str, dict, float]:
+    started = time.perf_counter()
+    page_text, backend = "", reader.backend.value
+    try:
+        raw_text, backend = reader.extract(index)
+        page_text = _clean_extracted_text(raw_text)
+    except Exception as e:
+        logger.warning(f"Erro ao extrair página {index + 1}: {e}")
+    elapsed = time.perf_counter() - started
+    return page_text, {"extraction_backend": backend, "extraction_ms": round(elapsed * 1000, 2)}, elapsed
+
+
+# mesmos caracteres de controle da classe [\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]
+_CONTROL_CHARS = dict.fromkeys([*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), *range(0x7f, 0xa0)])
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]')
+_CID_RE = re.compile(r'\(cid:\d+\)')
+# mesmo que [•]{3,} e [\.]{4,}, mas com prefixo literal o sre procura a sequência
+# inteira de uma vez em vez de testar a classe em cada posição (~10x mais rápido)
+_BULLETS_RE = re.compile(r'•••+')
+_DOTS_RE = re.compile(r'\.\.\.\.+')
+_WORD_RE = re.compile(r'\w')
 
 
 def _clean_extracted_text(text: str) -> str:
+    """Remove ruído da extração e devolve o texto da página numa linha só.
+
+    Descarta linhas vazias, só com números, com menos de 3 caracteres ou sem nenhuma letra
+    ou dígito, e colapsa todo espaço em branco (inclusive as quebras de linha) em um espaço.
+    """
     if not text:
         return ""
-    
-    text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]', '', text)
-    
-    text = re.sub(r'\(cid:\d+\)', '', text)  
-    text = re.sub(r'[•]{3,}', '', text)  
-    text = re.sub(r'[\.]{4,}', '...', text)  
-    
-    lines = text.split('\n')
-    cleaned_lines = []
-    
-    for line in lines:
-        line = line.strip()
-        
-        if not line:
-            continue
-        
-        if line.isdigit():
-            continue
-        
-        if len(line) < 3:
-            continue
-        
-        if re.match(r'^[\s\W]+$', line):
-            continue
-        
-        cleaned_lines.append(line)
-    
-    text = '\n'.join(cleaned_lines)
-    
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-    
-    return text.strip()
\ No newline at end of file
+
+    # translate é mais rápido que a regex em texto ASCII, mas bem mais lento fora dele
+    if text.isascii():
+        text = text.translate(_CONTROL_CHARS)
+    else:
+        text = _CONTROL_CHARS_RE.sub('', text)
+
+    # a maioria das páginas não tem nenhum desses padrões: o `in` evita a passada da regex
+    if '(cid:' in text:
+        text = _CID_RE.sub('', text)
+    if '•••' in text:
+        text = _BULLETS_RE.sub('', text)
+    if '....' in text:
+        text = _DOTS_RE.sub('...', text)
+
+    has_word = _WORD_RE.search
+    lines = [
+        line
+        for raw in text.split('\n')
+        if len(line := raw.strip()) >= 3 and not line.isdigit() and has_word(line)
+    ]
+    return ' '.join(' '.join(lines).split())
@@ -1,19 +1,46 @@
-from typing import List, Tuple
+import asyncio
+import time
+from typing import AsyncIterator, List, Optional, Tuple
 from loguru import logger
 
-from langchain_openai import ChatOpenAI
-from langchain_ollama import ChatOllama
+from langchain_core.documents import Document
 
-from libs.services.vector_service import get_retriever
+from libs.providers.http_clients import ollama_client_kwargs, openai_client_kwargs
+from libs.services.answer_cache_service import get_answer_cache
+from libs.services.context_service import count_tokens, pack_context
+from libs.services.rerank_service import arerank, rerank
+from libs.services.vector_service import (
+    aembed_queries,
+    aembed_query,
+    aretrieve,
+    aretrieve_many,
+    embed_query,
+    get_collection_generation,
+    resolve_collection,
+    retrieve,
+)
 from libs.utils.envs import (
+    BATCH_LLM_CONCURRENCY,
     LLM_PROVIDER,
     LLMProvider,
     OLLAMA_BASE_URL,
     OLLAMA_LLM_MODEL,
     OPENAI_API_KEY,
     OPENAI_LLM_MODEL,
+    REFERENCE_SNIPPET_CHARS,
+    RERANK_CANDIDATES,
+    RERANK_TOP_N,
+    RERANKER,
+    Reranker,
     TOP_K,
 )
+from libs.utils.metrics import (
+    ERRORS,
+    LLM_FIRST_TOKEN_SECONDS,
+    LLM_SECONDS,
+    PROMPT_TOKENS,
+    PROMPT_TOKENS_SAVED,
+)
 
 
 SYSTEM = (
@@ -22,40 +49,342 @@ SYSTEM = (
     "When possible, reference which document (source) your answer comes from."
 )
 
+NO_ANSWER = "No relevant information found in the documents."
+_NO_USAGE = {"prompt_tokens": 0, "prompt_tokens_saved": 0}
+
 _llm = None
+# limita as chamadas ao LLM de todos os lotes juntos, para não disputar com as perguntas interativas
+_batch_slots: asyncio.Semaphore | None = None
 
 
 def _get_llm():
     global _llm
     if _llm is None:
         if LLM_PROVIDER == LLMProvider.OLLAMA:
+            from langchain_ollama import ChatOllama
+
             logger.info(f"Usando Ollama LLM: {OLLAMA_LLM_MODEL}")
             _llm = ChatOllama(
                 model=OLLAMA_LLM_MODEL,
                 base_url=OLLAMA_BASE_URL,
                 temperature=0.3,
+                **ollama_client_kwargs(),
             )
         else:  
+            from langchain_openai import ChatOpenAI
+
             logger.info(f"Usando OpenAI LLM: {OPENAI_LLM_MODEL}")
             _llm = ChatOpenAI(
                 model=OPENAI_LLM_MODEL,
                 temperature=0.3,
                 max_tokens=1000,
                 openai_api_key=OPENAI_API_KEY,
+                **openai_client_kwargs(),
             )
     return _llm
 
 
-def process_question(question: str) -> Tuple[str, List[str]]:
-    logger.info(f"Processando pergunta: {question}")
+def warm_up():
+    _get_llm()
+    count_tokens(SYSTEM)
+
+
+def process_question(question: str, collection: Optional[str] = None) -> Tuple[str, List[dict], dict]:
+    collection = resolve_collection(collection)
+    logger.info(f"Processando pergunta em {collection}: {question}")
+    start = time.perf_counter()
+
+    embedding, generation, cached = _lookup_cache(question, collection)
+    if cached is not None:
+        get_answer_cache(collection).observe(True, time.perf_counter() - start)
+        return (*cached, dict(_NO_USAGE))
+
+    docs = _retrieve(question, embedding, collection)
+    if not docs:
+        logger.warning("Nenhum chunk relevante encontrado")
+        answer, references, usage = NO_ANSWER, [], dict(_NO_USAGE)
+    else:
+        messages, docs, usage = _prepare(question, docs)
+        llm = _get_llm()
+        try:
+            with LLM_SECONDS.time(mode="invoke"):
+                response = llm.invoke(messages)
+            answer = (response.content or "").strip()
+        except Exception as e:
+            ERRORS.inc(stage="llm")
+            logger.error(f"Erro ao chamar LLM: {e}")
+            raise
+        answer = answer or NO_ANSWER
+        references = _references(docs)
+        logger.info(f"Encontrados {len(references)} chunks relevantes")
+
+    _store_cache(embedding, collection, generation, answer, references, time.perf_counter() - start)
+    return answer, references, usage
+
+
+async def aprocess_question(question: str, collection: Optional[str] = None) -> Tuple[str, List[dict], dict]:
+    collection = resolve_collection(collection)
+    logger.info(f"Processando pergunta em {collection}: {question}")
+    start = time.perf_counter()
+
+    embedding = await _aembed_for_cache(question, collection)
+    generation, cached = await _alookup_cache_by_vector(embedding, collection)
+    if cached is not None:
+        get_answer_cache(collection).observe(True, time.perf_counter() - start)
+        return (*cached, dict(_NO_USAGE))
+
+    docs = await _aretrieve(question, embedding, collection)
+    if not docs:
+        logger.warning("Nenhum chunk relevante encontrado")
+        answer, references, usage = NO_ANSWER, [], dict(_NO_USAGE)
+    else:
+        # contagem de tokens (tiktoken) fora do event loop
+        messages, docs, usage = await asyncio.to_thread(_prepare, question, docs)
+        llm = _get_llm()
+        try:
+            with LLM_SECONDS.time(mode="invoke"):
+                response = await llm.ainvoke(messages)
+            answer = (response.content or "").strip()
+        except Exception as e:
+            ERRORS.inc(stage="llm")
+            logger.error(f"Erro ao chamar LLM: {e}")
+            raise
+        answer = answer or NO_ANSWER
+        references = _references(docs)
+        logger.info(f"Encontrados {len(references)} chunks relevantes")
+
+    _store_cache(embedding, collection, generation, answer, references, time.perf_counter() - start)
+    return answer, references, usage
+
 
-    retriever = get_retriever(top_k=TOP_K)
-    docs = retriever.invoke(question)
+async def astream_question(question: str, collection: Optional[str] = None) -> AsyncIterator[Tuple[str, dict]]:
+    """Gera eventos (nome, dados): `references`, depois `token` a cada trecho do LLM e `done`."""
+    collection = resolve_collection(collection)
+    logger.info(f"Processando pergunta em {collection} (streaming): {question}")
+    start = time.perf_counter()
 
+    embedding = await _aembed_for_cache(question, collection)
+    generation, cached = await _alookup_cache_by_vector(embedding, collection)
+    if cached is not None:
+        answer, references = cached
+        yield "references", {"references": references}
+        yield "token", {"content": answer}
+        elapsed = time.perf_counter() - start
+        get_answer_cache(collection).observe(True, elapsed)
+        yield "done", _done_event(answer, elapsed, elapsed, _NO_USAGE, cached=True)
+        return
+
+    docs = await _aretrieve(question, embedding, collection)
     if not docs:
         logger.warning("Nenhum chunk relevante encontrado")
-        return "No relevant information found in the documents.", []
+        yield "references", {"references": []}
+        yield "token", {"content": NO_ANSWER}
+        elapsed = time.perf_counter() - start
+        yield "done", _done_event(NO_ANSWER, elapsed, elapsed, _NO_USAGE)
+        return
+
+    messages, docs, usage = await asyncio.to_thread(_prepare, question, docs)
+    references = _references(docs)
+    yield "references", {"references": references}
+
+    parts = []
+    first_token = None
+    llm_start = time.perf_counter()
+    try:
+        async for chunk in _get_llm().astream(messages):
+            content = chunk.content or ""
+            if not content:
+                continue
+            if first_token is None:
+                first_token = time.perf_counter() - start
+                LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - llm_start)
+                logger.info(f"Time-to-first-token: {first_token * 1000:.0f}ms")
+            parts.append(content)
+            yield "token", {"content": content}
+    except Exception as e:
+        ERRORS.inc(stage="llm")
+        logger.error(f"Erro ao chamar LLM: {e}")
+        raise
+    LLM_SECONDS.observe(time.perf_counter() - llm_start, mode="stream")
+
+    answer = "".join(parts).strip() or NO_ANSWER
+    elapsed = time.perf_counter() - start
+    _store_cache(embedding, collection, generation, answer, references, elapsed)
+    yield "done", _done_event(answer, first_token if first_token is not None else elapsed, elapsed, usage)
+
+
+async def astream_questions(questions: List[str], collection: Optional[str] = None) -> AsyncIterator[Tuple[str, dict]]:
+    """Responde um lote de perguntas, gerando um evento `answer` (ou `error`) por pergunta e `done`.
+
+    As perguntas são embedadas em uma única chamada e buscadas em uma única consulta
+    multi-query; as chamadas ao LLM rodam em paralelo, até BATCH_LLM_CONCURRENCY, e as
+    respostas saem na ordem em que ficam prontas (cada uma traz o `index` da pergunta).
+    """
+    collection = resolve_collection(collection)
+    logger.info(f"Processando lote de {len(questions)} perguntas em {collection}")
+    start = time.perf_counter()
+
+    embeddings = await aembed_queries(questions)
+    cache = get_answer_cache(collection)
+    # com o cache de buscas em disco a geração vem do SQLite: leitura fora do event loop
+    generation = await asyncio.to_thread(get_collection_generation, collection) if cache is not None else 0
+    # perguntas repetidas no mesmo lote compartilham a busca e a chamada ao LLM
+    pending = {}
+    cached_count = 0
+    for index, (question, embedding) in enumerate(zip(questions, embeddings)):
+        cached = cache.lookup(embedding, generation) if cache is not None else None
+        if cached is None:
+            pending.setdefault(question, []).append(index)
+            continue
+        cached_count += 1
+        cache.observe(True, time.perf_counter() - start)
+        yield "answer", _batch_answer(index, question, *cached, _NO_USAGE, cached=True)
+
+    groups = list(pending.values())
+    docs_per_question = await _aretrieve_many(
+        [questions[indexes[0]] for indexes in groups],
+        [embeddings[indexes[0]] for indexes in groups],
+        collection,
+    )
+
+    async def answer(indexes: List[int], docs: List[Document]) -> List[Tuple[str, dict]]:
+        question = questions[indexes[0]]
+        try:
+            if not docs:
+                return [("answer", _batch_answer(i, question, NO_ANSWER, [], _NO_USAGE)) for i in indexes]
+            # contagem de tokens fora do event loop: são centenas de perguntas de uma vez
+            messages, docs, usage = await asyncio.to_thread(_prepare, question, docs)
+            async with _get_batch_slots():
+                with LLM_SECONDS.time(mode="batch"):
+                    response = await _get_llm().ainvoke(messages)
+        except Exception as e:
+            ERRORS.inc(stage="llm")
+            logger.error(f"Erro ao chamar LLM para a pergunta {indexes[0]} do lote: {e}")
+            detail = f"Error processing question: {e}"
+            return [("error", {"index": i, "question": question, "detail": detail}) for i in indexes]
+        answer = (response.content or "").strip() or NO_ANSWER
+        references = _references(docs)
+        _store_cache(embeddings[indexes[0]], collection, generation, answer, references, time.perf_counter() - start)
+        return [("answer", _batch_answer(i, question, answer, references, usage)) for i in indexes]
 
+    tasks = [asyncio.ensure_future(answer(indexes, docs)) for indexes, docs in zip(groups, docs_per_question)]
+    errors = 0
+    try:
+        for future in asyncio.as_completed(tasks):
+            for event, data in await future:
+                errors += event == "error"
+                yield event, data
+    finally:
+        # cliente desconectado: as chamadas que ainda não terminaram são canceladas
+        for task in tasks:
+            task.cancel()
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Lote de {len(questions)} perguntas respondido em {elapsed * 1000:.0f}ms")
+    yield "done", {
+        "questions": len(questions),
+        "cached": cached_count,
+        "errors": errors,
+        "total_ms": round(elapsed * 1000),
+    }
+
+
+def _get_batch_slots() -> asyncio.Semaphore:
+    global _batch_slots
+    if _batch_slots is None:
+        _batch_slots = asyncio.Semaphore(BATCH_LLM_CONCURRENCY)
+    return _batch_slots
+
+
+def _batch_answer(
+    index: int,
+    question: str,
+    answer: str,
+    references: List[dict],
+    usage: dict,
+    cached: bool = False,
+) -> dict:
+    return {"index": index, "question": question, "answer": answer, "references": references, "cached": cached, **usage}
+
+
+def _retrieve(question: str, embedding: Optional[List[float]], collection: str) -> List[Document]:
+    if RERANKER == Reranker.NONE:
+        return retrieve(question, embedding, top_k=TOP_K, collection=collection)
+    # busca mais candidatos que o necessário e deixa o reranker escolher os melhores
+    docs = retrieve(question, embedding, top_k=max(RERANK_CANDIDATES, RERANK_TOP_N), collection=collection)
+    return rerank(question, docs, collection=collection)
+
+
+async def _aretrieve(question: str, embedding: Optional[List[float]], collection: str) -> List[Document]:
+    if RERANKER == Reranker.NONE:
+        return await aretrieve(question, embedding, top_k=TOP_K, collection=collection)
+    docs = await aretrieve(question, embedding, top_k=max(RERANK_CANDIDATES, RERANK_TOP_N), collection=collection)
+    return await arerank(question, docs, collection=collection)
+
+
+async def _aretrieve_many(questions: List[str], embeddings: List[List[float]], collection: str) -> List[List[Document]]:
+    if RERANKER == Reranker.NONE:
+        return await aretrieve_many(questions, embeddings, top_k=TOP_K, collection=collection)
+    candidates = await aretrieve_many(questions, embeddings, top_k=max(RERANK_CANDIDATES, RERANK_TOP_N), collection=collection)
+    return await asyncio.gather(*(
+        arerank(question, docs, collection=collection) for question, docs in zip(questions, candidates)
+    ))
+
+
+def _lookup_cache(question: str, collection: str) -> Tuple[Optional[List[float]], int, Optional[Tuple[str, List[dict]]]]:
+    # sem cache de respostas o embedding fica para a busca, que só o calcula se não estiver em cache
+    embedding = embed_query(question) if get_answer_cache(collection) is not None else None
+    generation, cached = _lookup_cache_by_vector(embedding, collection)
+    return embedding, generation, cached
+
+
+async def _aembed_for_cache(question: str, collection: str) -> Optional[List[float]]:
+    return await aembed_query(question) if get_answer_cache(collection) is not None else None
+
+
+async def _alookup_cache_by_vector(embedding: Optional[List[float]], collection: str) -> Tuple[int, Optional[Tuple[str, List[dict]]]]:
+    # a geração pode vir do SQLite do cache de buscas: a consulta roda fora do event loop
+    if get_answer_cache(collection) is None:
+        return 0, None
+    return await asyncio.to_thread(_lookup_cache_by_vector, embedding, collection)
+
+
+def _lookup_cache_by_vector(embedding: Optional[List[float]], collection: str) -> Tuple[int, Optional[Tuple[str, List[dict]]]]:
+    generation = get_collection_generation(collection)
+    cache = get_answer_cache(collection)
+    cached = cache.lookup(embedding, generation) if cache is not None else None
+    if cached is not None:
+        logger.info("Resposta servida do cache semântico")
+    return generation, cached
+
+
+def _store_cache(
+    embedding: Optional[List[float]],
+    collection: str,
+    generation: int,
+    answer: str,
+    references: List[dict],
+    elapsed: float,
+):
+    cache = get_answer_cache(collection)
+    if cache is not None:
+        cache.store(embedding, generation, answer, references)
+        cache.observe(False, elapsed)
+
+
+def _prepare(question: str, docs: List[Document]) -> Tuple[List[dict], List[Document], dict]:
+    docs, _, saved = pack_context(docs)
+    messages = _build_messages(question, docs)
+    usage = {
+        "prompt_tokens": sum(count_tokens(message["content"]) for message in messages),
+        "prompt_tokens_saved": saved,
+    }
+    PROMPT_TOKENS.inc(usage["prompt_tokens"])
+    PROMPT_TOKENS_SAVED.inc(saved)
+    return messages, docs, usage
+
+
+def _build_messages(question: str, docs: List[Document]) -> List[dict]:
     context_parts = []
     for doc in docs:
         content = getattr(doc, "page_content", "") or ""
@@ -70,25 +399,43 @@ def process_question(question: str) -> Tuple[str, List[str]]:
         Pergunta: {question}
         Responda com base nos documentos acima:"""
 
-    llm = _get_llm()
-    try:
-        response = llm.invoke([
-            {"role": "system", "content": SYSTEM},
-            {"role": "user", "content": prompt},
-        ])
-        answer = (response.content or "").strip()
-    except Exception as e:
-        logger.error(f"Erro ao chamar LLM: {e}")
-        raise
+    return [
+        {"role": "system", "content": SYSTEM},
+        {"role": "user", "content": prompt},
+    ]
 
-    if not answer:
-        answer = "No relevant information found in the documents."
 
-    references = [
-        getattr(doc, "page_content", "") or ""
+def _references(docs: List[Document]) -> List[dict]:
+    # só o trecho inicial de cada chunk; o texto completo fica em GET /chunks/{chunk_id}
+    return [
+        {
+            "chunk_id": doc.id,
+            "source": doc.metadata.get("source"),
+            "page_start": doc.metadata.get("page_start"),
+            "page_end": doc.metadata.get("page_end"),
+            "score": round(doc.metadata["score"], 4) if doc.metadata.get("score") is not None else None,
+            "snippet": _snippet(doc.page_content),
+        }
         for doc in docs
-        if getattr(doc, "page_content", None)
+        if doc.page_content
     ]
 
-    logger.info(f"Encontrados {len(references)} chunks relevantes")
-    return answer, references
\ No newline at end of file
+
+def _snippet(text: str) -> str:
+    # o splitter deixa o separador ". " no começo do chunk seguinte
+    text = text.lstrip(". ")
+    if len(text) <= REFERENCE_SNIPPET_CHARS:
+        return text
+    cut = text[:REFERENCE_SNIPPET_CHARS]
+    # corta no último espaço para não partir uma palavra no meio
+    return (cut.rsplit(" ", 1)[0] if " " in cut else cut) + "…"
+
+
+def _done_event(answer: str, first_token: float, elapsed: float, usage: dict, cached: bool = False) -> dict:
+    return {
+        "answer": answer,
+        "cached": cached,
+        **usage,
+        "time_to_first_token_ms": round(first_token * 1000),
+        "total_ms": round(elapsed * 1000),
+    }
@@ -0,0 +1,120 @@
+import asyncio
+import math
+from collections import Counter
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from loguru import logger
+
+from libs.providers.bm25_index import tokenize
+from libs.services.vector_service import get_chunk_embeddings
+from libs.utils.envs import (
+    RERANK_MMR_LAMBDA,
+    RERANK_MODEL,
+    RERANK_TOP_N,
+    RERANKER,
+    Reranker,
+)
+from libs.utils.metrics import RERANK_SECONDS
+
+
+_cross_encoder = None
+
+
+def _get_cross_encoder():
+    global _cross_encoder
+    if _cross_encoder is None:
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError:
+            # dependência opcional (puxa o torch): sem ela o rerank cai no scorer léxico
+            logger.warning("sentence-transformers não instalado, usando reranker léxico")
+            _cross_encoder = False
+        else:
+            logger.info(f"Carregando cross-encoder: {RERANK_MODEL}")
+            _cross_encoder = CrossEncoder(RERANK_MODEL, device="cpu")
+    return _cross_encoder
+
+
+def rerank(
+    question: str,
+    docs: List[Document],
+    top_n: int = RERANK_TOP_N,
+    method: Optional[str] = None,
+    collection: Optional[str] = None,
+) -> List[Document]:
+    """Reordena os candidatos da busca e devolve os `top_n` melhores."""
+    method = method or RERANKER
+    if method == Reranker.NONE or len(docs) <= 1:
+        return docs[:top_n]
+
+    with RERANK_SECONDS.time(method=method):
+        if method == Reranker.MMR:
+            return _mmr(docs, top_n, collection)
+
+        if method == Reranker.CROSS_ENCODER and _get_cross_encoder():
+            scores = _get_cross_encoder().predict([(question, doc.page_content) for doc in docs])
+        else:
+            scores = _lexical_scores(question, docs)
+
+        # sort estável: em empate vale a ordem original da busca
+        order = sorted(range(len(docs)), key=lambda i: scores[i], reverse=True)
+        return [docs[i] for i in order[:top_n]]
+
+
+async def arerank(
+    question: str,
+    docs: List[Document],
+    top_n: int = RERANK_TOP_N,
+    collection: Optional[str] = None,
+) -> List[Document]:
+    # o cross-encoder ocupa a CPU: roda fora do event loop
+    return await asyncio.to_thread(rerank, question, docs, top_n, None, collection)
+
+
+def _lexical_scores(question: str, docs: List[Document]) -> List[float]:
+    # cobertura dos termos da pergunta, ponderada pelo idf calculado entre os próprios candidatos
+    terms = set(tokenize(question))
+    doc_terms = [Counter(tokenize(doc.page_content)) for doc in docs]
+    n = len(docs)
+    idf = {}
+    for term in terms:
+        df = sum(1 for counts in doc_terms if term in counts)
+        idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5)) if df else 0.0
+
+    scores = []
+    for counts in doc_terms:
+        length = sum(counts.values()) or 1
+        score = sum(idf[term] * (1 + math.log(counts[term])) for term in terms if term in counts)
+        scores.append(score / math.sqrt(math.log(1 + length)))
+    return scores
+
+
+def _mmr(docs: List[Document], top_n: int, collection: Optional[str] = None) -> List[Document]:
+    # maximal marginal relevance: troca chunks redundantes por outros que ainda sejam relevantes
+    vectors_by_id = get_chunk_embeddings([doc.id for doc in docs], collection)
+    candidates = [doc for doc in docs if doc.id in vectors_by_id]
+    if not candidates:
+        return docs[:top_n]
+
+    matrix = _normalize(np.array([vectors_by_id[doc.id] for doc in candidates], dtype=np.float32))
+    # a relevância vem da posição na busca (vetorial ou RRF), e não da similaridade com a
+    # pergunta, para não descartar os acertos que só o BM25 encontrou
+    relevance = 1 - np.arange(len(candidates), dtype=np.float32) / len(candidates)
+
+    selected: List[int] = []
+    redundancy = np.zeros(len(candidates), dtype=np.float32)
+    remaining = set(range(len(candidates)))
+    while remaining and len(selected) < top_n:
+        best = max(remaining, key=lambda i: RERANK_MMR_LAMBDA * relevance[i] - (1 - RERANK_MMR_LAMBDA) * redundancy[i])
+        selected.append(best)
+        remaining.discard(best)
+        redundancy = np.maximum(redundancy, matrix @ matrix[best])
+    return [candidates[i] for i in selected]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
@@ -0,0 +1,202 @@
+import os
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from uuid import uuid4
+from typing import BinaryIO, Optional
+
+import numpy as np
+from loguru import logger
+
+from libs.providers.snapshot_file import SnapshotReader, SnapshotWriter
+from libs.services.vector_service import (
+    CollectionNotFound,
+    collection_exists,
+    compact_store,
+    drop_collection,
+    exclusive_writes,
+    get_collection_stats,
+    get_document_registry,
+    get_embedding_model,
+    iter_collection_chunks,
+    replace_collection,
+    resolve_collection,
+    upsert_chunks,
+)
+from libs.utils.envs import (
+    CHROMA_PERSIST_DIR,
+    EMBEDDING_PROVIDER,
+    NUMPY_STORE_DIR,
+    SNAPSHOT_BATCH_SIZE,
+    SNAPSHOT_SPOOL_DIR,
+    SnapshotQuantization,
+    VECTOR_BACKEND,
+    VectorBackend,
+)
+
+
+class CollectionAlreadyExists(Exception):
+    pass
+
+
+class EmbeddingModelMismatch(ValueError):
+    pass
+
+
+def export_collection(
+    file: BinaryIO,
+    collection: Optional[str] = None,
+    quantization: str = SnapshotQuantization.NONE,
+) -> dict:
+    """Grava a collection (vetores, textos, metadata e documentos do registro) em um snapshot."""
+    started = time.perf_counter()
+    name = resolve_collection(collection)
+    if not collection_exists(name):
+        raise CollectionNotFound(name)
+
+    writer = SnapshotWriter(file, quantization)
+    for ids, embeddings, documents, metadatas in iter_collection_chunks(SNAPSHOT_BATCH_SIZE, name):
+        writer.write(ids, np.asarray(embeddings, dtype=np.float32), documents, metadatas)
+    documents = get_document_registry().list(name, -1)
+    writer.close(
+        collection=name,
+        embedding_model=_embedding_model(),
+        created_at=datetime.utcnow().isoformat(),
+        documents=[{key: value for key, value in document.items() if key != "collection"} for document in documents],
+    )
+    elapsed = time.perf_counter() - started
+    logger.info(f"✓ Collection {name} exportada: {writer.count} chunks em {elapsed:.1f}s ({writer.quantization.value})")
+    return _result(name, writer.count, len(documents), elapsed)
+
+
+def export_collection_file(collection: Optional[str] = None, quantization: str = SnapshotQuantization.NONE) -> str:
+    """Exporta para um arquivo em SNAPSHOT_SPOOL_DIR e devolve o caminho; apagá-lo fica com quem chamou."""
+    path = _spool_path(resolve_collection(collection))
+    try:
+        with open(path, "wb") as file:
+            export_collection(file, collection, quantization)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def import_collection(file: BinaryIO, collection: Optional[str] = None) -> dict:
+    """Cria a collection a partir de um snapshot, gravando os chunks em lotes sem recalcular embeddings.
+
+    O nome padrão é o da collection exportada; a collection de destino não pode existir.
+    """
+    started = time.perf_counter()
+    reader = SnapshotReader(file)
+    name = resolve_collection(collection or reader.header.get("collection"))
+    model = _embedding_model()
+    if reader.header.get("embedding_model") != model:
+        raise EmbeddingModelMismatch(
+            f"Snapshot embedded with {reader.header.get('embedding_model')!r}, but this service uses {model!r}"
+        )
+    if collection_exists(name):
+        raise CollectionAlreadyExists(name)
+
+    # ids dos chunks de cada documento, pela posição no documento, para refazer o registro
+    document_chunks = defaultdict(dict)
+    count = 0
+    try:
+        for ids, vectors, documents, metadatas in reader:
+            for start in range(0, len(ids), SNAPSHOT_BATCH_SIZE):
+                batch = slice(start, start + SNAPSHOT_BATCH_SIZE)
+                count += upsert_chunks(ids[batch], vectors[batch], documents[batch], metadatas[batch], name)
+            for chunk_id, metadata in zip(ids, metadatas):
+                if metadata and "document_id" in metadata:
+                    document_chunks[metadata["document_id"]][metadata.get("chunk_index", 0)] = chunk_id
+    except Exception:
+        # nada de collection pela metade: quem chamou pode importar de novo com o mesmo nome
+        drop_collection(name)
+        raise
+
+    registry = get_document_registry()
+    registered = 0
+    for document in reader.header.get("documents", []):
+        chunks = document_chunks.get(document["id"])
+        if chunks:
+            registry.register({**document, "collection": name}, [chunks[index] for index in sorted(chunks)])
+            registered += 1
+    elapsed = time.perf_counter() - started
+    logger.info(f"✓ Collection {name} importada: {count} chunks e {registered} documentos em {elapsed:.1f}s")
+    return _result(name, count, registered, elapsed)
+
+
+def compact_collection(collection: Optional[str] = None) -> dict:
+    """Devolve ao disco o espaço de chunks apagados.
+
+    O índice NumPy é reescrito no lugar. No Chroma a collection é reconstruída (exportada para
+    um snapshot temporário, importada numa collection nova e trocada pela antiga), o que refaz
+    o índice HNSW sem os chunks removidos, e o SQLite passa por VACUUM. As escritas na
+    collection esperam o fim da compactação; as buscas continuam no conteúdo antigo até a troca.
+    """
+    started = time.perf_counter()
+    name = resolve_collection(collection)
+    if not collection_exists(name):
+        raise CollectionNotFound(name)
+    path = os.path.join(NUMPY_STORE_DIR, name) if VECTOR_BACKEND == VectorBackend.NUMPY else CHROMA_PERSIST_DIR
+    bytes_before = _disk_usage(path)
+
+    with exclusive_writes(name):
+        if VECTOR_BACKEND == VectorBackend.CHROMA:
+            _rebuild(name)
+        compact_store(name)
+
+    stats = get_collection_stats(name)
+    result = {
+        "collection_name": name,
+        "total_chunks": stats["total_chunks"],
+        "bytes_before": bytes_before,
+        "bytes_after": _disk_usage(path),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info(f"✓ Collection {name} compactada: {result['bytes_before']} -> {result['bytes_after']} bytes")
+    return result
+
+
+def _rebuild(name: str):
+    # a collection atual só sai quando a nova está completa; uma falha antes disso não a altera
+    staging = f"{name[:40]}-rebuild-{uuid4().hex[:8]}"
+    path = _spool_path(name)
+    try:
+        with open(path, "w+b") as file:
+            export_collection(file, name)
+            import_collection(file, staging)
+        replace_collection(name, staging)
+    except Exception:
+        drop_collection(staging)
+        raise
+    finally:
+        os.remove(path)
+
+
+def _spool_path(name: str) -> str:
+    os.makedirs(SNAPSHOT_SPOOL_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix=f"{name}-", suffix=".ragsnap", dir=SNAPSHOT_SPOOL_DIR)
+    os.close(fd)
+    return path
+
+
+def _embedding_model() -> str:
+    return f"{EMBEDDING_PROVIDER}:{get_embedding_model()}"
+
+
+def _disk_usage(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, filename))
+        for root, _, filenames in os.walk(path)
+        for filename in filenames
+    )
+
+
+def _result(name: str, chunks: int, documents: int, elapsed: float) -> dict:
+    return {
+        "collection_name": name,
+        "total_chunks": chunks,
+        "total_documents": documents,
+        "seconds": round(elapsed, 3),
+    }
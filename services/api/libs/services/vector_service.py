@@ -1,12 +1,32 @@
-from typing import List
+import asyncio
+import bisect
+import fcntl
+import itertools
+import multiprocessing
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import uuid4
 from loguru import logger
 
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
-from langchain_openai import OpenAIEmbeddings
-from langchain_ollama import OllamaEmbeddings
-from langchain_chroma import Chroma
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from libs.providers.bm25_index import BM25Index
+from libs.providers.chroma_maintenance import vacuum_chroma
+from libs.providers.document_registry import DocumentRegistry
+from libs.providers.embedding_cache import CachedEmbeddings
+from libs.providers.http_clients import ollama_client_kwargs, openai_client_kwargs
+from libs.providers.numpy_store import NumpyVectorStore, claim_store_dir, delete_store, list_stores, stored_count
+from libs.providers.retrieval_cache import RetrievalCache
+from libs.services.embedding_service import count_sent_texts, embed_in_batches
 
 from libs.utils.envs import (
     EMBEDDING_PROVIDER,
@@ -19,35 +39,229 @@ from libs.utils.envs import (
     COLLECTION_NAME,
     CHUNK_SIZE,
     CHUNK_OVERLAP,
+    DOCUMENT_REGISTRY_PATH,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CONCURRENCY,
+    BM25_INDEX_PATH,
+    HYBRID_CANDIDATES,
+    MAX_OPEN_COLLECTIONS,
+    NUMPY_STORE_DIR,
+    RETRIEVAL_CACHE_DISK_MAX_ENTRIES,
+    RETRIEVAL_CACHE_ENABLED,
+    RETRIEVAL_CACHE_MAX_ENTRIES,
+    RETRIEVAL_CACHE_PATH,
+    RETRIEVAL_MODE,
+    RRF_K,
+    RetrievalMode,
+    VECTOR_BACKEND,
+    VectorBackend,
 )
+from libs.utils.metrics import CHROMA_ADD_SECONDS, CHROMA_QUERY_SECONDS, CHUNKS, EMBEDDING_SECONDS, SPLIT_SECONDS
+
+# clientes do Chroma e dos providers só são importados no primeiro uso (ou no warm-up),
+# para que a API suba sem pagar segundos de import
+if TYPE_CHECKING:
+    from langchain_core.vectorstores import VectorStore
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+
+# mesmas regras de nome de collection do Chroma
+_COLLECTION_NAME_RE = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9_-]{1,61}[a-zA-Z0-9]$")
+
+
+class InvalidCollectionName(ValueError):
+    pass
+
+
+class CollectionNotFound(LookupError):
+    pass
+
+
+class _WriteGate:
+    """Controle das escritas de uma collection: as comuns entram juntas, uma reconstrução entra sozinha.
+
+    `shared` é reentrante na mesma thread (sync_document_chunks chama add_documents) e também
+    passa para a thread que tem o acesso exclusivo; um `exclusive` à espera barra novos `shared`.
+    Com `path`, vale também entre processos (workers do uvicorn, CLI): cada entrada leva um
+    `flock` compartilhado ou exclusivo no arquivo.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._cond = threading.Condition()
+        self._writers = 0
+        self._owner: Optional[int] = None
+        self._local = threading.local()
+
+    @contextmanager
+    def shared(self):
+        depth = getattr(self._local, "depth", 0)
+        counted = depth == 0 and self._owner != threading.get_ident()
+        if counted:
+            with self._cond:
+                while self._owner is not None:
+                    self._cond.wait()
+                self._writers += 1
+        self._local.depth = depth + 1
+        try:
+            if counted:
+                with _file_lock(self.path, fcntl.LOCK_SH):
+                    yield
+            else:
+                yield
+        finally:
+            self._local.depth = depth
+            if counted:
+                with self._cond:
+                    self._writers -= 1
+                    self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._cond:
+            while self._owner is not None:
+                self._cond.wait()
+            self._owner = threading.get_ident()
+            while self._writers:
+                self._cond.wait()
+        try:
+            with _file_lock(self.path, fcntl.LOCK_EX):
+                yield
+        finally:
+            with self._cond:
+                self._owner = None
+                self._cond.notify_all()
+
+
+class _Lock:
+    """`threading.Lock` que aceita weakref: num WeakValueDictionary, sai dele quando ninguém mais o usa."""
+
+    __slots__ = ("_lock", "__weakref__")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+
+@contextmanager
+def _file_lock(path: Optional[str], operation: int):
+    if path is None:
+        yield
+        return
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, operation)
+        yield
+    finally:
+        # fechar o descritor solta o lock
+        os.close(fd)
 
 
 _embeddings: Embeddings | None = None
-_vector_store: Chroma | None = None
-_text_splitter: RecursiveCharacterTextSplitter | None = None
+_client = None
+_registry: DocumentRegistry | None = None
+_registry_lock = threading.Lock()
+_retrieval_cache: RetrievalCache | None = None
+_retrieval_cache_lock = threading.Lock()
+_text_splitter: "RecursiveCharacterTextSplitter | None" = None
+# handles (store, BM25) por collection, do menos para o mais recentemente usado
+_collections: "OrderedDict[str, Tuple[VectorStore, BM25Index]]" = OrderedDict()
+_collections_lock = threading.Lock()
+# mtime do arquivo de lock da collection quando o handle foi aberto (ver `_swap_stamp`)
+_handle_stamps: dict = {}
+# serializa a abertura (e o drop) de uma mesma collection sem travar as demais
+_open_locks: "weakref.WeakValueDictionary[str, _Lock]" = weakref.WeakValueDictionary()
+# serializa o diff de chunks de um mesmo documento entre workers de ingestão e uploads síncronos
+# (fracas: quem espera ou segura o lock o mantém vivo; os de documentos já processados somem sozinhos)
+_sync_locks: "weakref.WeakValueDictionary[Tuple[str, str], _Lock]" = weakref.WeakValueDictionary()
+_sync_locks_guard = threading.Lock()
+# escritas por collection; a reconstrução no compact as bloqueia enquanto copia e troca a collection
+_write_gates: "weakref.WeakValueDictionary[str, _WriteGate]" = weakref.WeakValueDictionary()
+# o splitter incremental divide quando o buffer passa deste múltiplo de CHUNK_SIZE
+_SPLIT_BUFFER_CHUNKS = 4
+_MIN_DOCUMENT_CHARS = 50
+# trocada a cada alteração de uma collection; caches derivados dela a usam para invalidação.
+# Os valores vêm de um contador único e nunca se repetem: a entrada de uma collection apagada
+# sai do dicionário, e quem não está nele fica com `_base_generation`, que avança a cada drop.
+_generations: dict = {}
+_generation_ids = itertools.count(1)
+_base_generation = 0
 
 
 def _get_embeddings() -> Embeddings:
     global _embeddings
     if _embeddings is None:
         if EMBEDDING_PROVIDER == EmbeddingProvider.OLLAMA:
+            from langchain_ollama import OllamaEmbeddings
+
             logger.info(f"Usando Ollama embeddings: {OLLAMA_EMBEDDING_MODEL}")
             _embeddings = OllamaEmbeddings(
                 model=OLLAMA_EMBEDDING_MODEL,
                 base_url=OLLAMA_BASE_URL,
+                **ollama_client_kwargs(),
             )
         else:  
+            from langchain_openai import OpenAIEmbeddings
+
             logger.info(f"Usando OpenAI embeddings: {OPENAI_EMBEDDING_MODEL}")
             _embeddings = OpenAIEmbeddings(
                 model=OPENAI_EMBEDDING_MODEL,
                 openai_api_key=OPENAI_API_KEY,
+                **openai_client_kwargs(),
+            )
+        if EMBEDDING_CACHE_ENABLED:
+            _embeddings = CachedEmbeddings(
+                _embeddings,
+                provider=EMBEDDING_PROVIDER,
+                model=get_embedding_model(),
+                path=EMBEDDING_CACHE_PATH,
+                max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
             )
     return _embeddings
 
 
-def get_text_splitter() -> RecursiveCharacterTextSplitter:
+def get_embedding_model() -> str:
+    return OLLAMA_EMBEDDING_MODEL if EMBEDDING_PROVIDER == EmbeddingProvider.OLLAMA else OPENAI_EMBEDDING_MODEL
+
+
+def get_embedding_cache_stats() -> dict | None:
+    embeddings = _get_embeddings()
+    return embeddings.stats() if isinstance(embeddings, CachedEmbeddings) else None
+
+
+def _get_retrieval_cache() -> RetrievalCache | None:
+    global _retrieval_cache
+    if not RETRIEVAL_CACHE_ENABLED:
+        return None
+    with _retrieval_cache_lock:
+        if _retrieval_cache is None:
+            _retrieval_cache = RetrievalCache(
+                max_entries=RETRIEVAL_CACHE_MAX_ENTRIES,
+                path=RETRIEVAL_CACHE_PATH or None,
+                disk_max_entries=RETRIEVAL_CACHE_DISK_MAX_ENTRIES,
+            )
+    return _retrieval_cache
+
+
+def get_retrieval_cache_stats() -> dict | None:
+    cache = _get_retrieval_cache()
+    return cache.stats() if cache is not None else None
+
+
+def get_text_splitter() -> "RecursiveCharacterTextSplitter":
     global _text_splitter
     if _text_splitter is None:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
         _text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=CHUNK_SIZE,
             chunk_overlap=CHUNK_OVERLAP,
@@ -57,50 +271,860 @@ def get_text_splitter() -> RecursiveCharacterTextSplitter:
     return _text_splitter
 
 
-def _get_vector_store() -> Chroma:
-    global _vector_store
-    if _vector_store is None:
-        _vector_store = Chroma(
-            collection_name=COLLECTION_NAME,
+def resolve_collection(collection: Optional[str] = None) -> str:
+    name = collection or COLLECTION_NAME
+    if not _COLLECTION_NAME_RE.match(name):
+        raise InvalidCollectionName(
+            f"Invalid collection name {name!r}: use 3-63 letters, digits, '_' or '-', "
+            "starting and ending with a letter or digit"
+        )
+    return name
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        import chromadb
+
+        _client = chromadb.PersistentClient(path=CHROMA_PERSIST_DIR)
+    return _client
+
+
+def get_document_registry() -> DocumentRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = DocumentRegistry(DOCUMENT_REGISTRY_PATH)
+    return _registry
+
+
+def _bm25_path(name: str) -> str:
+    if VECTOR_BACKEND == VectorBackend.NUMPY:
+        return os.path.join(_numpy_path(name), "bm25.sqlite3")
+    if name == COLLECTION_NAME:
+        return BM25_INDEX_PATH
+    return os.path.join(f"{CHROMA_PERSIST_DIR.rstrip('/')}_bm25", f"{name}.sqlite3")
+
+
+def _numpy_path(name: str) -> str:
+    return os.path.join(NUMPY_STORE_DIR, name)
+
+
+def _lock_path(name: str) -> Optional[str]:
+    # o backend numpy só aceita um processo (claim_vector_store): os locks em memória bastam
+    if VECTOR_BACKEND == VectorBackend.NUMPY:
+        return None
+    return os.path.join(f"{CHROMA_PERSIST_DIR.rstrip('/')}_locks", f"{name}.lock")
+
+
+def _swap_stamp(name: str) -> int:
+    """Muda quando algum processo troca (compact) ou apaga a collection; 0 sem arquivo de lock."""
+    path = _lock_path(name)
+    try:
+        return os.stat(path).st_mtime_ns if path else 0
+    except FileNotFoundError:
+        return 0
+
+
+def _mark_swapped(name: str):
+    # os outros processos veem o mtime novo e reabrem os seus handles, que apontam para a collection antiga
+    path = _lock_path(name)
+    if path:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a"):
+            pass
+        os.utime(path)
+
+
+def _open_lock(name: str) -> _Lock:
+    # chamado com _collections_lock
+    lock = _open_locks.get(name)
+    if lock is None:
+        lock = _open_locks[name] = _Lock()
+    return lock
+
+
+def _get_handle(collection: Optional[str] = None, create: bool = True) -> "Tuple[VectorStore, BM25Index]":
+    """Devolve (store, BM25) da collection, abrindo e guardando no pool LRU se preciso.
+
+    Com `create=False` uma collection inexistente levanta CollectionNotFound em vez de ser
+    criada vazia; a collection padrão é sempre criada, como antes.
+    """
+    name = resolve_collection(collection)
+    stamp = _swap_stamp(name)
+    with _collections_lock:
+        handle = _collections.get(name)
+        if handle is not None and _handle_stamps.get(name) == stamp:
+            _collections.move_to_end(name)
+            return handle
+        open_lock = _open_lock(name)
+
+    with open_lock:
+        with _collections_lock:
+            handle = _collections.get(name)
+            if handle is not None and _handle_stamps.get(name) != stamp:
+                logger.info(f"Collection {name} trocada ou removida por outro processo, reabrindo")
+                handle = None
+        if handle is None:
+            if not create and name != COLLECTION_NAME and not collection_exists(name):
+                raise CollectionNotFound(name)
+            handle = _open_collection(name)
+        with _collections_lock:
+            _collections[name] = handle
+            _handle_stamps[name] = stamp
+            _collections.move_to_end(name)
+            while len(_collections) > MAX_OPEN_COLLECTIONS:
+                # só a referência do pool é descartada; buscas em andamento seguem com a sua
+                evicted, _ = _collections.popitem(last=False)
+                _handle_stamps.pop(evicted, None)
+                logger.info(f"Collection {evicted} fechada (limite de {MAX_OPEN_COLLECTIONS} abertas)")
+    return handle
+
+
+def claim_vector_store():
+    """O backend `numpy` só aceita um processo: trava o diretório dele ou levanta StoreInUse."""
+    if VECTOR_BACKEND == VectorBackend.NUMPY:
+        claim_store_dir(NUMPY_STORE_DIR)
+
+
+def _open_collection(name: str) -> "Tuple[VectorStore, BM25Index]":
+    if VECTOR_BACKEND == VectorBackend.NUMPY:
+        claim_vector_store()
+        store = NumpyVectorStore(_numpy_path(name), _get_embeddings())
+    else:
+        from langchain_chroma import Chroma
+
+        store = Chroma(
+            client=_get_client(),
+            collection_name=name,
             embedding_function=_get_embeddings(),
-            persist_directory=CHROMA_PERSIST_DIR,
         )
-        logger.info(f"Vector store LangChain Chroma inicializado: {COLLECTION_NAME}")
-    return _vector_store
+    bm25_index = BM25Index(_bm25_path(name))
+    if not len(bm25_index) and store._collection.count():
+        logger.info(f"Índice BM25 de {name} vazio, reconstruindo a partir do Chroma")
+        data = store.get(include=["documents"])
+        bm25_index.add(data["ids"], data["documents"])
+    logger.info(f"Vector store {VECTOR_BACKEND} inicializado: {name}")
+    return store, bm25_index
+
 
+def _get_vector_store(collection: Optional[str] = None, create: bool = True) -> "VectorStore":
+    return _get_handle(collection, create)[0]
 
-def add_documents(documents: List[Document]) -> int:
+
+def _get_bm25_index(collection: Optional[str] = None, create: bool = True) -> BM25Index:
+    return _get_handle(collection, create)[1]
+
+
+def _collection_names() -> List[str]:
+    if VECTOR_BACKEND == VectorBackend.NUMPY:
+        return list_stores(NUMPY_STORE_DIR)
+    return [c.name for c in _get_client().list_collections()]
+
+
+def collection_exists(collection: str) -> bool:
+    return collection in _collection_names()
+
+
+def list_collections() -> List[dict]:
+    return [get_collection_stats(name) for name in sorted(_collection_names())]
+
+
+def drop_collection(collection: str) -> bool:
+    """Apaga a collection do Chroma e o seu índice BM25. Retorna False se ela não existir."""
+    name = resolve_collection(collection)
+    claim_vector_store()
+    with _collections_lock:
+        open_lock = _open_lock(name)
+
+    with _write_gate(name).shared(), open_lock:
+        if not collection_exists(name):
+            return False
+        with _collections_lock:
+            _collections.pop(name, None)
+            _handle_stamps.pop(name, None)
+        path = _bm25_path(name)
+        if VECTOR_BACKEND == VectorBackend.NUMPY:
+            delete_store(_numpy_path(name))
+        else:
+            _get_client().delete_collection(name)
+        if os.path.exists(path):
+            os.remove(path)
+        get_document_registry().drop_collection(name)
+        _mark_swapped(name)
+        _bump_generation(name)
+        _forget_generation(name)
+    logger.info(f"✓ Collection {name} removida")
+    return True
+
+
+def replace_collection(collection: str, staging: str):
+    """Põe o conteúdo de `staging` (store, BM25 e registro) no lugar de `collection`; `staging` deixa de existir.
+
+    Feito para ser chamado dentro de `exclusive_writes(collection)`. As buscas seguem no conteúdo
+    antigo até a troca e os handles abertos dele continuam válidos até o fim da troca.
+    """
+    name = resolve_collection(collection)
+    with _collections_lock:
+        locks = _open_lock(name), _open_lock(staging)
+    with locks[0], locks[1]:
+        if VECTOR_BACKEND == VectorBackend.NUMPY:
+            retired = f"{_numpy_path(name)}.retired-{uuid4().hex[:8]}"
+            os.rename(_numpy_path(name), retired)
+            os.rename(_numpy_path(staging), _numpy_path(name))
+        else:
+            # nomes de collection no Chroma são únicos: a antiga sai do caminho antes de a nova entrar
+            client = _get_client()
+            retired = f"{name[:40]}-retired-{uuid4().hex[:8]}"
+            client.get_collection(name).modify(name=retired)
+            try:
+                client.get_collection(staging).modify(name=name)
+            except Exception:
+                client.get_collection(retired).modify(name=name)
+                raise
+            os.replace(_bm25_path(staging), _bm25_path(name))
+        get_document_registry().move_collection(staging, name)
+        with _collections_lock:
+            _collections.pop(name, None)
+            _collections.pop(staging, None)
+            _handle_stamps.pop(name, None)
+            _handle_stamps.pop(staging, None)
+        _mark_swapped(name)
+        if VECTOR_BACKEND == VectorBackend.NUMPY:
+            delete_store(retired)
+        else:
+            client.delete_collection(retired)
+            # só quem fez a reconstrução gravou na staging: ninguém mais espera no lock dela
+            if os.path.exists(_lock_path(staging)):
+                os.remove(_lock_path(staging))
+        _bump_generation(name)
+        _forget_generation(staging)
+    logger.info(f"✓ Collection {name} substituída por {staging}")
+
+
+def warm_up():
+    # abre Chroma e BM25 e faz um embedding direto no provider (sem cache) para abrir conexões
+    _get_bm25_index()
+    get_text_splitter()
+    embeddings = _get_embeddings()
+    backend = embeddings.backend if isinstance(embeddings, CachedEmbeddings) else embeddings
+    backend.embed_query("warm-up")
+
+
+def add_documents(
+    documents: List[Document],
+    ids: Optional[List[str]] = None,
+    collection: Optional[str] = None,
+) -> int:
     if not documents:
         logger.warning("Nenhum documento para adicionar")
         return 0
-    store = _get_vector_store()
-    ids = store.add_documents(documents)
-    n = len(ids) if ids else len(documents)
-    logger.info(f"✓ {n} chunks armazenados no Chroma (LangChain)")
+    if ids is None:
+        ids = [str(uuid4()) for _ in documents]
+
+    n = 0
+    with _write_gate(collection).shared():
+        store, bm25_index = _get_handle(collection)
+        try:
+            # cada batch é gravado assim que seus embeddings ficam prontos
+            for batch_ids, batch_docs, vectors in embed_in_batches(_get_embeddings(), ids, documents):
+                texts = [doc.page_content for doc in batch_docs]
+                with CHROMA_ADD_SECONDS.time():
+                    store._collection.upsert(
+                        ids=batch_ids,
+                        embeddings=vectors,
+                        documents=texts,
+                        metadatas=[doc.metadata or None for doc in batch_docs],
+                    )
+                bm25_index.add(batch_ids, texts)
+                n += len(batch_ids)
+        finally:
+            if n:
+                _bump_generation(collection)
+    logger.info(f"✓ {n} chunks armazenados no Chroma")
     return n
 
 
-def get_retriever(top_k: int = 10):
-    store = _get_vector_store()
-    return store.as_retriever(
-        search_type="similarity",
-        search_kwargs={"k": top_k},
+def upsert_chunks(
+    ids: List[str],
+    embeddings: Sequence[Sequence[float]],
+    documents: List[Optional[str]],
+    metadatas: List[Optional[dict]],
+    collection: Optional[str] = None,
+) -> int:
+    """Grava chunks com embeddings já calculados (ex.: de um snapshot), no store e no BM25."""
+    if not ids:
+        return 0
+    with _write_gate(collection).shared():
+        store, bm25_index = _get_handle(collection)
+        with CHROMA_ADD_SECONDS.time():
+            store._collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+        bm25_index.add(ids, [text or "" for text in documents])
+        _bump_generation(collection)
+    return len(ids)
+
+
+def iter_collection_chunks(
+    batch_size: int,
+    collection: Optional[str] = None,
+) -> Iterator[Tuple[List[str], Sequence[Sequence[float]], List[Optional[str]], List[Optional[dict]]]]:
+    """Todos os chunks da collection, `batch_size` por vez: (ids, embeddings, textos, metadatas)."""
+    store = _get_vector_store(collection, create=False)
+    total = store._collection.count()
+    for offset in range(0, total, batch_size):
+        data = store._collection.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=batch_size,
+            offset=offset,
+        )
+        if not data["ids"]:
+            break
+        yield data["ids"], data["embeddings"], data["documents"], data["metadatas"]
+
+
+def compact_store(collection: Optional[str] = None):
+    """Devolve ao disco o espaço livre dos arquivos da collection: índice NumPy ou SQLite do Chroma, e BM25.
+
+    No Chroma o VACUUM é do banco inteiro (todas as collections) e o índice HNSW da collection
+    não muda; ele só encolhe quando ela é reconstruída.
+    """
+    store, bm25_index = _get_handle(collection, create=False)
+    if VECTOR_BACKEND == VectorBackend.NUMPY:
+        store.compact()
+    else:
+        _vacuum_chroma()
+    bm25_index.vacuum()
+
+
+def _vacuum_chroma():
+    # nunca neste processo: o sqlite3 daqui desfaria os locks do SQLite do cliente do Chroma
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        try:
+            executor.submit(vacuum_chroma, CHROMA_PERSIST_DIR).result()
+        except sqlite3.OperationalError as e:
+            # ex.: gravações longas em outras collections; a reconstrução já foi feita
+            logger.warning(f"VACUUM do Chroma não concluído: {e}")
+
+
+def get_chunk_ids(where: dict, collection: Optional[str] = None) -> List[str]:
+    store = _get_vector_store(collection)
+    return store.get(where=where, include=[])["ids"]
+
+
+def get_chunk_embeddings(ids: List[str], collection: Optional[str] = None) -> dict:
+    if not ids:
+        return {}
+    data = _get_vector_store(collection, create=False)._collection.get(ids=ids, include=["embeddings"])
+    return dict(zip(data["ids"], data["embeddings"]))
+
+
+def get_chunk(chunk_id: str, collection: Optional[str] = None) -> Optional[Document]:
+    """Texto completo e metadata de um chunk, ou None se ele não existir na collection."""
+    data = _get_vector_store(collection, create=False)._collection.get(
+        ids=[chunk_id],
+        include=["documents", "metadatas"],
     )
+    if not data["ids"]:
+        return None
+    return Document(id=data["ids"][0], page_content=data["documents"][0] or "", metadata=data["metadatas"][0] or {})
+
+
+def iter_split_pages(pages: Iterable[Tuple[int, str, dict]], metadata: dict) -> Iterator[Document]:
+    """Divide o texto página a página, emitindo chunks conforme o buffer enche.
+
+    O último chunk de cada rodada volta para o buffer, então o overlap entre chunks se
+    mantém nas quebras de página e a memória não cresce com o tamanho do documento.
+    `pages` gera (número da página, texto, metadata da página); cada chunk leva em
+    `page_start`/`page_end` as páginas que o seu texto cobre, junto com a metadata delas
+    (ver `_merge_page_metadata`).
+    """
+    splitter = get_text_splitter()
+    buffer = ""
+    # (offset no buffer, número da página, metadata da página) de cada página presente no buffer
+    page_offsets: List[Tuple[int, int, dict]] = []
+    emitted = False
+    elapsed = 0.0
+
+    for page_num, text, page_metadata in pages:
+        if buffer:
+            buffer += "\n\n"
+        page_offsets.append((len(buffer), page_num, page_metadata))
+        buffer += text
+        if len(buffer) < _SPLIT_BUFFER_CHUNKS * CHUNK_SIZE:
+            continue
+        start = time.perf_counter()
+        chunks = splitter.split_text(buffer)
+        elapsed += time.perf_counter() - start
+        offsets = _chunk_offsets(buffer, chunks)
+        for chunk, offset in zip(chunks[:-1], offsets):
+            yield _page_chunk(chunk, offset, page_offsets, metadata)
+            emitted = True
+        offset = offsets[-1]
+        if offset >= 0:
+            buffer = buffer[offset:]
+            page_offsets = _trim_page_offsets(page_offsets, offset)
+        else:
+            buffer = chunks[-1]
+            page_offsets = [(0, *page_offsets[-1][1:])]
+
+    if not emitted and len(buffer.strip()) < _MIN_DOCUMENT_CHARS:
+        return
+    start = time.perf_counter()
+    chunks = splitter.split_text(buffer)
+    SPLIT_SECONDS.observe(elapsed + time.perf_counter() - start)
+    for chunk, offset in zip(chunks, _chunk_offsets(buffer, chunks)):
+        yield _page_chunk(chunk, offset, page_offsets, metadata)
+
+
+def _chunk_offsets(text: str, chunks: List[str]) -> List[int]:
+    # o splitter não devolve posições: cada chunk é procurado a partir do fim do anterior
+    # menos o overlap, como no add_start_index do LangChain; -1 se não for encontrado
+    offsets = []
+    index = previous = 0
+    for chunk in chunks:
+        offset = text.find(chunk, max(0, index + previous - CHUNK_OVERLAP))
+        offsets.append(offset)
+        if offset >= 0:
+            index, previous = offset, len(chunk)
+    return offsets
+
+
+def _page_chunk(chunk: str, offset: int, page_offsets: List[Tuple[int, int, dict]], metadata: dict) -> Document:
+    metadata = dict(metadata)
+    if offset >= 0 and page_offsets:
+        starts = [start for start, _, _ in page_offsets]
+        first = max(0, bisect.bisect_right(starts, offset) - 1)
+        last = max(0, bisect.bisect_right(starts, offset + len(chunk) - 1) - 1)
+        metadata.update(_merge_page_metadata([page_metadata for _, _, page_metadata in page_offsets[first:last + 1]]))
+        metadata["page_start"] = page_offsets[first][1]
+        metadata["page_end"] = page_offsets[last][1]
+    return Document(page_content=chunk, metadata=metadata)
+
+
+def _merge_page_metadata(pages: List[dict]) -> dict:
+    # chunk que cobre várias páginas: textos distintos unidos por vírgula, números pelo maior valor
+    merged = {}
+    for key in dict.fromkeys(key for page in pages for key in page):
+        values = [page[key] for page in pages if key in page]
+        if all(isinstance(value, (int, float)) for value in values):
+            merged[key] = max(values)
+        else:
+            merged[key] = ",".join(dict.fromkeys(str(value) for value in values))
+    return merged
+
+
+def _trim_page_offsets(page_offsets: List[Tuple[int, int, dict]], offset: int) -> List[Tuple[int, int, dict]]:
+    # o buffer passa a começar em `offset`: a página que o contém vira a primeira, em 0
+    first = max(0, bisect.bisect_right([start for start, _, _ in page_offsets], offset) - 1)
+    return [(max(0, start - offset), *page) for start, *page in page_offsets[first:]]
+
+
+def sync_document_chunks(
+    source: str,
+    chunks: Iterable[Tuple[Document, str]],
+    collection: Optional[str] = None,
+    on_synced: Optional[Callable[[List[str]], None]] = None,
+) -> Optional[Tuple[int, int, int, int]]:
+    """Indexa só os chunks novos de `source` e remove os que não existem mais.
+
+    Os chunks são consumidos em grupos, à medida que são gerados. Retorna
+    (reaproveitados, adicionados, removidos, total), ou None se não houver nenhum chunk;
+    nesse caso o que já estava indexado é mantido. `on_synced` recebe os ids dos chunks,
+    na ordem do documento, ainda com o lock do documento.
+    """
+    collection = resolve_collection(collection)
+    with document_lock(collection, source), _write_gate(collection).shared():
+        existing = set(get_chunk_ids({"source": source}, collection))
+        # dict como conjunto ordenado: os ids ficam na ordem do documento
+        seen = {}
+        reused = added = 0
+        store = _get_vector_store(collection)
+
+        group_size = EMBEDDING_BATCH_SIZE * EMBEDDING_CONCURRENCY
+        chunks = iter(chunks)
+        while group := list(itertools.islice(chunks, group_size)):
+            seen.update(dict.fromkeys(chunk_id for _, chunk_id in group))
+            old = [(chunk, chunk_id) for chunk, chunk_id in group if chunk_id in existing]
+            new = [(chunk, chunk_id) for chunk, chunk_id in group if chunk_id not in existing]
+            if old:
+                # só a metadata muda (hash do documento, posição); o embedding é mantido
+                store._collection.update(
+                    ids=[chunk_id for _, chunk_id in old],
+                    metadatas=[chunk.metadata for chunk, _ in old],
+                )
+                reused += len(old)
+            if new:
+                added += add_documents(
+                    [chunk for chunk, _ in new],
+                    ids=[chunk_id for _, chunk_id in new],
+                    collection=collection,
+                )
+
+        if not seen:
+            return None
+
+        stale = list(existing.difference(seen))
+        if stale:
+            delete_chunks(stale, collection)
+            logger.info(f"✓ {len(stale)} chunks obsoletos de {source} removidos do Chroma")
+        if on_synced is not None:
+            on_synced(list(seen))
+
+    CHUNKS.inc(reused, result="reused")
+    CHUNKS.inc(added, result="added")
+    CHUNKS.inc(len(stale), result="removed")
+    logger.info(f"{source}: {reused} chunks reaproveitados, {added} adicionados, {len(stale)} removidos")
+    return reused, added, len(stale), reused + added
+
+
+def delete_chunks(ids: List[str], collection: Optional[str] = None):
+    """Remove chunks por id, do vector store e do BM25, numa chamada só para cada um."""
+    if not ids:
+        return
+    with _write_gate(collection).shared():
+        store, bm25_index = _get_handle(collection, create=False)
+        store.delete(ids=ids)
+        bm25_index.delete(ids)
+        _bump_generation(collection)
+
+
+def _write_gate(collection: Optional[str] = None) -> _WriteGate:
+    name = resolve_collection(collection)
+    with _collections_lock:
+        gate = _write_gates.get(name)
+        if gate is None:
+            path = _lock_path(name)
+            if path:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            gate = _write_gates[name] = _WriteGate(path)
+        return gate
+
+
+@contextmanager
+def exclusive_writes(collection: Optional[str] = None):
+    """Bloqueia as escritas na collection (uploads, ingestão, remoções, drop) enquanto durar o bloco.
+
+    Vale para todos os processos que usam o mesmo CHROMA_PERSIST_DIR. As escritas que já estão
+    em andamento terminam antes; as buscas continuam normalmente.
+    """
+    with _write_gate(collection).exclusive():
+        yield
+
+
+def document_lock(collection: str, source: str) -> _Lock:
+    """Lock que serializa as alterações nos chunks de um documento."""
+    with _sync_locks_guard:
+        lock = _sync_locks.get((collection, source))
+        if lock is None:
+            lock = _sync_locks[(collection, source)] = _Lock()
+        return lock
+
+
+def get_collection_generation(collection: Optional[str] = None) -> int:
+    """Geração da collection; com o cache de buscas em disco, a compartilhada pelos workers do uvicorn."""
+    name = resolve_collection(collection)
+    cache = _get_retrieval_cache()
+    return cache.generation(name, _local_generation(name)) if cache is not None else _local_generation(name)
+
+
+def _local_generation(name: str) -> int:
+    return _generations.get(name, _base_generation)
+
+
+def _forget_generation(name: str):
+    global _base_generation
+    # uma collection recriada com o mesmo nome começa numa geração que nenhum cache viu
+    _base_generation = next(_generation_ids)
+    _generations.pop(name, None)
+
+
+def _bump_generation(collection: Optional[str] = None):
+    name = resolve_collection(collection)
+    _generations[name] = next(_generation_ids)
+    cache = _get_retrieval_cache()
+    if cache is not None:
+        cache.invalidate(name)
+
+
+def embed_query(text: str) -> List[float]:
+    embeddings = _get_embeddings()
+    with EMBEDDING_SECONDS.time(kind="query"):
+        vector = embeddings.embed_query(text)
+    count_sent_texts(embeddings, 1)
+    return vector
+
+
+def search_by_vector(embedding: List[float], top_k: int = 10, collection: Optional[str] = None) -> List[Document]:
+    store = _get_vector_store(collection, create=False)
+    return store.similarity_search_by_vector(embedding, k=top_k)
+
+
+def search_by_vectors(
+    embeddings: List[List[float]],
+    top_k: int = 10,
+    collection: Optional[str] = None,
+) -> List[List[Document]]:
+    """Várias buscas vetoriais em uma única chamada ao store."""
+    if not embeddings:
+        return []
+    return _search_many(_get_vector_store(collection, create=False), embeddings, top_k)
+
+
+def _search_many(store: "VectorStore", embeddings: List[List[float]], k: int) -> List[List[Document]]:
+    """Busca vetorial multi-query; cada Document é novo e leva o score de relevância em `metadata["score"]`."""
+    if isinstance(store, NumpyVectorStore):
+        rows = store.similarity_search_by_vectors_with_scores(embeddings, k=k)
+    else:
+        result = store._collection.query(
+            query_embeddings=embeddings,
+            n_results=k,
+            include=["documents", "metadatas", "distances"],
+        )
+        # mesma conversão de distância em relevância do similarity_search_with_relevance_scores
+        relevance = store._select_relevance_score_fn()
+        rows = [
+            [
+                (Document(id=chunk_id, page_content=text, metadata=metadata or {}), relevance(distance))
+                for chunk_id, text, metadata, distance in zip(*row)
+            ]
+            for row in zip(result["ids"], result["documents"], result["metadatas"], result["distances"])
+        ]
+    for row in rows:
+        for doc, score in row:
+            doc.metadata["score"] = float(score)
+    return [[doc for doc, _ in row] for row in rows]
+
+
+async def aembed_query(text: str) -> List[float]:
+    embeddings = _get_embeddings()
+    with EMBEDDING_SECONDS.time(kind="query"):
+        vector = await embeddings.aembed_query(text)
+    count_sent_texts(embeddings, 1)
+    return vector
+
+
+async def aembed_queries(texts: List[str]) -> List[List[float]]:
+    embeddings = _get_embeddings()
+    # uma única requisição ao provider para todas as perguntas de um lote
+    with EMBEDDING_SECONDS.time(kind="query_batch"):
+        vectors = await embeddings.aembed_documents(texts)
+    count_sent_texts(embeddings, len(texts))
+    return vectors
+
+
+def retrieve(
+    query: str,
+    embedding: Optional[List[float]] = None,
+    top_k: int = 10,
+    mode: Optional[str] = None,
+    collection: Optional[str] = None,
+) -> List[Document]:
+    """Chunks mais relevantes para a pergunta; sem `embedding`, ele só é calculado se a busca não estiver em cache."""
+    # o valor, não o membro do enum: str(RetrievalMode.VECTOR) criaria outra série na métrica
+    mode = RetrievalMode(mode or RETRIEVAL_MODE).value
+    with CHROMA_QUERY_SECONDS.time(mode=mode):
+        return _retrieve([query], [embedding], top_k, mode, collection)[0]
+
+
+def lookup_retrieval_cache(
+    query: str,
+    top_k: int = 10,
+    mode: Optional[str] = None,
+    collection: Optional[str] = None,
+) -> Optional[List[Document]]:
+    """Resultado de `retrieve` se a busca estiver em cache; None num miss ou com o cache desligado."""
+    cache = _get_retrieval_cache()
+    if cache is None:
+        return None
+    name = resolve_collection(collection)
+    store = _get_vector_store(name, create=False)
+    generation = cache.generation(name, _local_generation(name))
+    return _lookup_cached(cache, store, name, generation, RetrievalMode(mode or RETRIEVAL_MODE).value, top_k, [query])[0]
+
+
+def retrieve_many(
+    queries: List[str],
+    embeddings: List[Optional[List[float]]],
+    top_k: int = 10,
+    mode: Optional[str] = None,
+    collection: Optional[str] = None,
+) -> List[List[Document]]:
+    """Mesmo resultado de `retrieve` para cada pergunta, com uma única consulta vetorial multi-query."""
+    if not queries:
+        return []
+    mode = RetrievalMode(mode or RETRIEVAL_MODE).value
+    with CHROMA_QUERY_SECONDS.time(mode=f"{mode}_batch"):
+        return _retrieve(queries, embeddings, top_k, mode, collection)
+
+
+def _retrieve(
+    queries: List[str],
+    embeddings: List[Optional[List[float]]],
+    top_k: int,
+    mode: str,
+    collection: Optional[str],
+    lookup: bool = True,
+) -> List[List[Document]]:
+    name = resolve_collection(collection)
+    # cada tenant só busca no próprio índice (HNSW do Chroma e BM25 separados por collection)
+    store, bm25_index = _get_handle(name, create=False)
+    cache = _get_retrieval_cache()
+    if cache is None:
+        return _search(store, bm25_index, queries, _embed_missing(queries, embeddings), top_k, mode)
+
+    # geração lida antes da busca: uma gravação concorrente invalida o que for guardado agora
+    generation = cache.generation(name, _local_generation(name))
+    key_mode = RetrievalMode(mode).value
+    # lookup=False: quem chamou acabou de consultar o cache (aretrieve), não conta o miss duas vezes
+    results = _lookup_cached(cache, store, name, generation, key_mode, top_k, queries) if lookup else [None] * len(queries)
+    misses = [i for i, docs in enumerate(results) if docs is None]
+    if misses:
+        found = _search(
+            store,
+            bm25_index,
+            [queries[i] for i in misses],
+            _embed_missing([queries[i] for i in misses], [embeddings[i] for i in misses]),
+            top_k,
+            mode,
+        )
+        for i, docs in zip(misses, found):
+            results[i] = docs
+            cache.store(name, generation, key_mode, top_k, queries[i], [(doc.id, doc.metadata["score"]) for doc in docs])
+    return results
+
+
+def _lookup_cached(
+    cache: RetrievalCache,
+    store: "VectorStore",
+    name: str,
+    generation: int,
+    key_mode: str,
+    top_k: int,
+    queries: List[str],
+) -> List[Optional[List[Document]]]:
+    """Documents dos ids em cache, com o score guardado; um chunk que sumiu do store vira miss."""
+    cached = [cache.lookup(name, generation, key_mode, top_k, query) for query in queries]
+    ids = list({chunk_id for hits in cached if hits for chunk_id, _ in hits})
+    docs_by_id = {}
+    if ids:
+        data = store.get(ids=ids, include=["documents", "metadatas"])
+        docs_by_id = dict(zip(data["ids"], zip(data["documents"], data["metadatas"])))
+    results = []
+    for hits in cached:
+        if hits is None or any(chunk_id not in docs_by_id for chunk_id, _ in hits):
+            results.append(None)
+            continue
+        results.append([
+            Document(
+                id=chunk_id,
+                page_content=docs_by_id[chunk_id][0],
+                metadata={**(docs_by_id[chunk_id][1] or {}), "score": score},
+            )
+            for chunk_id, score in hits
+        ])
+    return results
+
+
+def _embed_missing(queries: List[str], embeddings: List[Optional[List[float]]]) -> List[List[float]]:
+    return [embedding if embedding is not None else embed_query(query) for query, embedding in zip(queries, embeddings)]
+
+
+def _search(
+    store: "VectorStore",
+    bm25_index: BM25Index,
+    queries: List[str],
+    embeddings: List[List[float]],
+    top_k: int,
+    mode: str,
+) -> List[List[Document]]:
+    if mode != RetrievalMode.HYBRID:
+        return _search_many(store, embeddings, top_k)
+
+    candidates = max(top_k, HYBRID_CANDIDATES)
+    vector_results = _search_many(store, embeddings, candidates)
+
+    ranked = []
+    docs_by_id = {}
+    for query, vector_docs in zip(queries, vector_results):
+        lexical = bm25_index.search(query, candidates)
+        # reciprocal rank fusion: só a posição em cada lista importa, não a escala dos scores
+        fused = defaultdict(float)
+        for rank, doc in enumerate(vector_docs, 1):
+            fused[doc.id] += 1 / (RRF_K + rank)
+            docs_by_id[doc.id] = doc
+        for rank, (chunk_id, _) in enumerate(lexical, 1):
+            fused[chunk_id] += 1 / (RRF_K + rank)
+        ranked.append(sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k])
+
+    # os chunks que só o BM25 encontrou são carregados de uma vez, para todas as perguntas
+    missing = list({chunk_id for top in ranked for chunk_id, _ in top if chunk_id not in docs_by_id})
+    if missing:
+        data = store.get(ids=missing, include=["documents", "metadatas"])
+        for chunk_id, text, metadata in zip(data["ids"], data["documents"], data["metadatas"]):
+            docs_by_id[chunk_id] = Document(id=chunk_id, page_content=text, metadata=metadata or {})
+    # o score passa a ser o do RRF; cópia por pergunta, já que um chunk pode aparecer em várias
+    results = []
+    for top in ranked:
+        docs = []
+        for chunk_id, score in top:
+            doc = docs_by_id.get(chunk_id)
+            if doc is not None:
+                docs.append(Document(id=chunk_id, page_content=doc.page_content, metadata={**doc.metadata, "score": score}))
+        results.append(docs)
+    return results
+
+
+async def aretrieve(
+    query: str,
+    embedding: Optional[List[float]] = None,
+    top_k: int = 10,
+    collection: Optional[str] = None,
+) -> List[Document]:
+    # o cliente do Chroma é síncrono: a busca roda fora do event loop
+    if embedding is not None:
+        return await asyncio.to_thread(retrieve, query, embedding, top_k, None, collection)
+    if _get_retrieval_cache() is not None:
+        docs = await asyncio.to_thread(lookup_retrieval_cache, query, top_k, None, collection)
+        if docs is not None:
+            return docs
+    # sem resultado em cache o embedding vem do cliente assíncrono; a thread só faz a busca no store e no BM25
+    embedding = await aembed_query(query)
+    return await asyncio.to_thread(_retrieve_missed, query, embedding, top_k, collection)
+
+
+def _retrieve_missed(query: str, embedding: List[float], top_k: int, collection: Optional[str]) -> List[Document]:
+    with CHROMA_QUERY_SECONDS.time(mode=RETRIEVAL_MODE):
+        return _retrieve([query], [embedding], top_k, RETRIEVAL_MODE, collection, lookup=False)[0]
+
+
+async def aretrieve_many(
+    queries: List[str],
+    embeddings: List[List[float]],
+    top_k: int = 10,
+    collection: Optional[str] = None,
+) -> List[List[Document]]:
+    return await asyncio.to_thread(retrieve_many, queries, embeddings, top_k, None, collection)
 
 
-def search_similar(query: str, top_k: int = 10) -> List[Document]:
-    retriever = get_retriever(top_k=top_k)
-    return retriever.invoke(query)
+def search_similar(query: str, top_k: int = 10, collection: Optional[str] = None) -> List[Document]:
+    return retrieve(query, top_k=top_k, mode=RetrievalMode.VECTOR.value, collection=collection)
 
 
-def get_collection_stats() -> dict:
-    store = _get_vector_store()
+def get_collection_stats(collection: Optional[str] = None) -> dict:
+    name = resolve_collection(collection)
     try:
-        count = store._collection.count()
+        # direto pelo client: consultar stats não abre (nem cria) o handle da collection
+        if not collection_exists(name):
+            count = 0
+        elif VECTOR_BACKEND == VectorBackend.NUMPY:
+            count = stored_count(_numpy_path(name))
+        else:
+            count = _get_client().get_collection(name).count()
     except Exception as e:
         logger.warning(f"Erro ao obter count da collection: {e}")
         count = 0
     return {
         "total_chunks": count,
-        "collection_name": COLLECTION_NAME,
+        "total_documents": get_document_registry().count(name),
+        "collection_name": name,
     }
\ No newline at end of file
@@ -0,0 +1,61 @@
+import threading
+import time
+
+from loguru import logger
+
+from libs.utils.envs import WARMUP_ON_STARTUP
+
+
+_state = {"status": "pending" if WARMUP_ON_STARTUP else "disabled", "seconds": None, "steps": {}}
+_lock = threading.Lock()
+_thread: threading.Thread | None = None
+
+
+def start_warmup() -> threading.Thread:
+    """Dispara o warm-up em uma thread daemon; a API já atende enquanto ele roda."""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=warm_up, name="warmup", daemon=True)
+            _thread.start()
+    return _thread
+
+
+def warm_up():
+    # imports aqui para que o módulo continue leve no boot
+    from libs.services import question_service, vector_service
+
+    steps = (
+        ("vector_store", vector_service.warm_up),
+        ("llm", question_service.warm_up),
+    )
+    _set(status="running")
+    start = time.perf_counter()
+    failed = False
+    for name, step in steps:
+        step_start = time.perf_counter()
+        try:
+            step()
+            result = {"ok": True}
+        except Exception as e:
+            # sem provider acessível o serviço continua subindo; o erro reaparece na primeira requisição
+            logger.warning(f"Warm-up '{name}' falhou: {e}")
+            result = {"ok": False, "error": str(e)}
+            failed = True
+        result["ms"] = round((time.perf_counter() - step_start) * 1000)
+        with _lock:
+            _state["steps"][name] = result
+
+    elapsed = time.perf_counter() - start
+    _set(status="failed" if failed else "done", seconds=round(elapsed, 3))
+    logger.info(f"Warm-up concluído em {elapsed * 1000:.0f}ms")
+
+
+def get_warmup_status() -> dict:
+    with _lock:
+        return {**_state, "steps": dict(_state["steps"])}
+
+
+def _set(**values):
+    with _lock:
+        _state.update(values)
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class ChunkDetail(BaseModel):
+    chunk_id: str
+    collection: str
+    source: Optional[str] = None
+    document_id: Optional[str] = None
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+    chunk_index: Optional[int] = None
+    extraction_backend: Optional[str] = None
+    extraction_ms: Optional[float] = None
+    text: str
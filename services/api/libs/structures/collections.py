@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+
+
+class CollectionStats(BaseModel):
+    collection_name: str
+    total_chunks: int
+    total_documents: int = 0
+
+
+class CollectionSnapshot(BaseModel):
+    collection_name: str
+    total_chunks: int
+    total_documents: int
+    seconds: float
+
+
+class CollectionCompaction(BaseModel):
+    collection_name: str
+    total_chunks: int
+    bytes_before: int
+    bytes_after: int
+    seconds: float
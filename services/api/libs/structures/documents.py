@@ -2,11 +2,16 @@ from pydantic import BaseModel, Field
 from uuid import UUID, uuid4
 from typing import List, Optional
 from datetime import datetime
+from enum import Enum
 
 class DocumentUploadResponse(BaseModel):
     message: str
+    collection: Optional[str] = None
     documents_indexed: int
     total_chunks: int
+    chunks_reused: int = 0
+    chunks_added: int = 0
+    chunks_removed: int = 0
 
 
 class DocumentMetadata(BaseModel):
@@ -21,6 +26,29 @@ class Document(BaseModel):
     metadata: DocumentMetadata
     text: Optional[str] = None  
     total_chunks: Optional[int] = None
+    content_hash: Optional[str] = None
+    chunks_reused: int = 0
+    chunks_added: int = 0
+    chunks_removed: int = 0
+
+
+class DocumentRecord(BaseModel):
+    id: UUID
+    collection: str
+    source: str
+    content_hash: str
+    content_type: Optional[str] = None
+    size_bytes: Optional[int] = None
+    page_count: Optional[int] = None
+    total_chunks: int
+    embedding_model: Optional[str] = None
+    extraction_seconds: Optional[float] = None
+    ingest_seconds: Optional[float] = None
+    uploaded_at: datetime
+
+
+class DocumentDetail(DocumentRecord):
+    chunk_ids: List[str] = []
 
 
 class DocumentChunk(BaseModel):
@@ -28,3 +56,40 @@ class DocumentChunk(BaseModel):
     document_id: UUID
     text: str
     chunk_index: int
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class FileStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    INDEXED = "indexed"
+    UNCHANGED = "unchanged"
+    SKIPPED = "skipped"
+    FAILED = "failed"
+
+
+class FileProgress(BaseModel):
+    filename: str
+    status: FileStatus = FileStatus.PENDING
+    chunks: int = 0
+    chunks_reused: int = 0
+    chunks_added: int = 0
+    chunks_removed: int = 0
+    error: Optional[str] = None
+
+
+class IngestionJob(BaseModel):
+    id: UUID = Field(default_factory=uuid4)
+    status: JobStatus = JobStatus.QUEUED
+    collection: Optional[str] = None
+    files: List[FileProgress] = []
+    total_chunks: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
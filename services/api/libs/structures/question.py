@@ -1,9 +1,24 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class QuestionRequest(BaseModel):
     question: str
+    collection: Optional[str] = None
+
+class BatchQuestionRequest(BaseModel):
+    questions: List[str] = Field(..., min_length=1)
+    collection: Optional[str] = None
+
+class ChunkReference(BaseModel):
+    chunk_id: str
+    source: Optional[str] = None
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+    score: Optional[float] = None
+    snippet: str
 
 class QuestionResponse(BaseModel):
     answer: str
-    references: List[str]
\ No newline at end of file
+    references: List[ChunkReference]
+    prompt_tokens: int = 0
+    prompt_tokens_saved: int = 0
\ No newline at end of file
@@ -9,6 +9,29 @@ class EmbeddingProvider(str, Enum):
     OPENAI = "openai"
     OLLAMA = "ollama"
 
+class RetrievalMode(str, Enum):
+    VECTOR = "vector"
+    HYBRID = "hybrid"
+
+class VectorBackend(str, Enum):
+    CHROMA = "chroma"
+    NUMPY = "numpy"
+
+class PdfBackend(str, Enum):
+    AUTO = "auto"
+    PDFIUM = "pdfium"
+    PDFPLUMBER = "pdfplumber"
+
+class SnapshotQuantization(str, Enum):
+    NONE = "none"
+    INT8 = "int8"
+
+class Reranker(str, Enum):
+    NONE = "none"
+    LEXICAL = "lexical"
+    MMR = "mmr"
+    CROSS_ENCODER = "cross_encoder"
+
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
 EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")
 
@@ -20,6 +43,16 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_LLM_MODEL = os.getenv("OPENAI_LLM_MODEL", "gpt-4o-mini")
 OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
 
+# pool de conexões HTTP compartilhado pelos clientes de LLM e embeddings (um por provider)
+PROVIDER_HTTP_MAX_CONNECTIONS = int(os.getenv("PROVIDER_HTTP_MAX_CONNECTIONS", "32"))
+PROVIDER_HTTP_MAX_KEEPALIVE = int(os.getenv("PROVIDER_HTTP_MAX_KEEPALIVE", "16"))
+PROVIDER_HTTP_KEEPALIVE_SECONDS = float(os.getenv("PROVIDER_HTTP_KEEPALIVE_SECONDS", "60"))
+PROVIDER_HTTP_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_HTTP_TIMEOUT_SECONDS", "120"))
+PROVIDER_HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("PROVIDER_HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+# só tem efeito com o pacote h2 instalado e em conexões HTTPS
+PROVIDER_HTTP2 = os.getenv("PROVIDER_HTTP2", "true").lower() in ("1", "true", "yes")
+PROVIDER_MAX_RETRIES = int(os.getenv("PROVIDER_MAX_RETRIES", "2"))
+
 if EMBEDDING_PROVIDER == EmbeddingProvider.OLLAMA:
     CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", "./data/chroma_ollama")
     COLLECTION_NAME = os.getenv("CHROMA_COLLECTION", "documents")
@@ -27,7 +60,83 @@ else:
     CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", "./data/chroma_openai")
     COLLECTION_NAME = os.getenv("CHROMA_COLLECTION", "documents")
 
+BM25_INDEX_PATH = os.getenv("BM25_INDEX_PATH", f"{CHROMA_PERSIST_DIR.rstrip('/')}_bm25.sqlite3")
+
+# numpy: busca exata sobre um .npy mapeado em memória, mais rápida que o Chroma em coleções pequenas e médias
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+NUMPY_STORE_DIR = os.getenv("NUMPY_STORE_DIR", f"{CHROMA_PERSIST_DIR.rstrip('/')}_numpy")
+
+# inventário dos documentos indexados (todas as collections), com os ids dos chunks de cada um
+DOCUMENT_REGISTRY_PATH = os.getenv("DOCUMENT_REGISTRY_PATH", f"{CHROMA_PERSIST_DIR.rstrip('/')}_documents.sqlite3")
+
+# collections por tenant: máximo de handles (Chroma + BM25) abertos ao mesmo tempo, em LRU
+MAX_OPEN_COLLECTIONS = int(os.getenv("MAX_OPEN_COLLECTIONS", "16"))
+
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./data/embedding_cache.sqlite3")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_BATCH_TOKENS = int(os.getenv("EMBEDDING_BATCH_TOKENS", "8000"))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "5"))
+EMBEDDING_RETRY_BASE_DELAY = float(os.getenv("EMBEDDING_RETRY_BASE_DELAY", "1.0"))
+EMBEDDING_RETRY_MAX_DELAY = float(os.getenv("EMBEDDING_RETRY_MAX_DELAY", "30.0"))
+
 CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
 CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "150"))
 
-TOP_K = int(os.getenv("TOP_K", "10"))
\ No newline at end of file
+TOP_K = int(os.getenv("TOP_K", "10"))
+
+# 0 desliga o limite (e a remoção de quase-duplicatas): os chunks vão inteiros para o prompt
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "0"))
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.85"))
+
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "30"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# com um reranker ativo, RERANK_CANDIDATES são buscados e só RERANK_TOP_N vão para o LLM
+RERANKER = os.getenv("RERANKER", "none")
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "30"))
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "5"))
+RERANK_MMR_LAMBDA = float(os.getenv("RERANK_MMR_LAMBDA", "0.7"))
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+# /question/batch: perguntas por requisição e chamadas simultâneas ao LLM somando todos os lotes
+BATCH_QUESTION_MAX = int(os.getenv("BATCH_QUESTION_MAX", "500"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "8"))
+
+# caracteres do trecho de cada chunk nas referências das respostas
+REFERENCE_SNIPPET_CHARS = int(os.getenv("REFERENCE_SNIPPET_CHARS", "200"))
+
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+
+# cache de buscas: ids e scores dos chunks por pergunta normalizada, top_k, modo e geração da collection
+RETRIEVAL_CACHE_ENABLED = os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RETRIEVAL_CACHE_MAX_ENTRIES = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", "10000"))
+# vazio = só em memória; um caminho liga o nível em SQLite compartilhado pelos workers do uvicorn
+RETRIEVAL_CACHE_PATH = os.getenv("RETRIEVAL_CACHE_PATH", "")
+RETRIEVAL_CACHE_DISK_MAX_ENTRIES = int(os.getenv("RETRIEVAL_CACHE_DISK_MAX_ENTRIES", "100000"))
+
+# 0 = usa todos os núcleos disponíveis; 1 = extração sequencial no processo da API
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", "0")) or (os.cpu_count() or 1)
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+# auto: pdfium em todas as páginas, pdfplumber só nas que o pdfium não extrai bem
+PDF_EXTRACTION_BACKEND = os.getenv("PDF_EXTRACTION_BACKEND", "auto")
+
+# aquece clientes, Chroma e pools de conexão em background logo após o boot
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+INGESTION_SPOOL_DIR = os.getenv("INGESTION_SPOOL_DIR", "./data/uploads")
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "1"))
+INGESTION_MAX_QUEUED_JOBS = int(os.getenv("INGESTION_MAX_QUEUED_JOBS", "8"))
+INGESTION_JOB_HISTORY = int(os.getenv("INGESTION_JOB_HISTORY", "200"))
+
+# snapshots de collection: chunks por grupo do arquivo (e por escrita no store ao importar)
+SNAPSHOT_BATCH_SIZE = int(os.getenv("SNAPSHOT_BATCH_SIZE", "5000"))
+# arquivos temporários do export pela API e da reconstrução de collections do Chroma
+SNAPSHOT_SPOOL_DIR = os.getenv("SNAPSHOT_SPOOL_DIR", "./data/snapshots")
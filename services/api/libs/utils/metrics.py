@@ -0,0 +1,146 @@
+"""Métricas em memória no formato texto do Prometheus, sem dependências externas.
+
+Cada observação é um lock e algumas somas, então os timers podem envolver caminhos
+quentes (páginas, batches de embedding, buscas) sem custo perceptível.
+"""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry: List["_Metric"] = []
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(f"{self.name}{self._labels(key)} {_format(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # por combinação de labels: contagem por bucket (não acumulada), soma e total
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                cumulative = 0
+                for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == math.inf else _format(bound)
+                    labels = self._labels(key, 'le="' + le + '"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{self._labels(key)} {_format(total)}")
+                lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "rag_http_request_duration_seconds", "Duração das requisições HTTP.", ("method", "route", "status")
+)
+PDF_PAGE_SECONDS = Histogram("rag_pdf_extraction_page_seconds", "Tempo de extração e limpeza por página de PDF.")
+SPLIT_SECONDS = Histogram("rag_text_split_seconds", "Tempo de divisão em chunks por documento.")
+EMBEDDING_SECONDS = Histogram(
+    "rag_embedding_request_seconds", "Duração de cada chamada ao provider de embeddings.", ("kind",)
+)
+CHROMA_ADD_SECONDS = Histogram("rag_chroma_add_seconds", "Duração de cada gravação de batch no Chroma.")
+CHROMA_QUERY_SECONDS = Histogram("rag_chroma_query_seconds", "Duração das buscas de chunks.", ("mode",))
+RERANK_SECONDS = Histogram("rag_rerank_seconds", "Duração do reranking dos candidatos.", ("method",))
+LLM_FIRST_TOKEN_SECONDS = Histogram("rag_llm_time_to_first_token_seconds", "Tempo até o primeiro token do LLM.")
+LLM_SECONDS = Histogram("rag_llm_seconds", "Duração total das chamadas ao LLM.", ("mode",))
+
+PDF_PAGES = Counter("rag_pdf_pages_total", "Páginas de PDF extraídas.")
+CHUNKS = Counter("rag_chunks_total", "Chunks processados na ingestão.", ("result",))
+EMBEDDED_TEXTS = Counter("rag_embedded_texts_total", "Textos enviados ao provider de embeddings.")
+PROMPT_TOKENS = Counter("rag_prompt_tokens_total", "Tokens de prompt enviados ao LLM.")
+PROMPT_TOKENS_SAVED = Counter("rag_prompt_tokens_saved_total", "Tokens deixados de fora do prompt pelo orçamento de contexto.")
+RETRIEVAL_CACHE = Counter("rag_retrieval_cache_total", "Consultas ao cache de buscas por resultado.", ("result",))
+ERRORS = Counter("rag_errors_total", "Erros por etapa.", ("stage",))
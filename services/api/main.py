@@ -3,9 +3,27 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import time
 import traceback
+from contextlib import asynccontextmanager
 from routes import get_routers
+from libs.providers.http_clients import aclose_pools
+from libs.services.vector_service import claim_vector_store
+from libs.services.warmup_service import start_warmup
+from libs.utils.envs import WARMUP_ON_STARTUP
+from libs.utils.metrics import HTTP_REQUEST_SECONDS
 
-app = FastAPI(redirect_slashes=True)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # com VECTOR_BACKEND=numpy um segundo worker não sobe: o índice só aceita um processo
+    claim_vector_store()
+    # o boot não espera o warm-up: /health responde enquanto Chroma e clientes são abertos
+    if WARMUP_ON_STARTUP:
+        start_warmup()
+    yield
+    await aclose_pools()
+
+
+app = FastAPI(redirect_slashes=True, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -44,8 +62,23 @@ async def custom_response(request: Request, call_next):
 
     process_time = time.time() - start_time
     resp.headers['X-Process-Time'] = f"{int(process_time * 1000)}ms"
+    HTTP_REQUEST_SECONDS.observe(
+        process_time,
+        method=request.method,
+        route=_route_label(request),
+        status=str(resp.status_code),
+    )
     
     return resp
 
+def _route_label(request: Request) -> str:
+    # caminho com os parâmetros no lugar dos valores, para não criar uma série por id
+    if 'route' not in request.scope:
+        return 'unmatched'
+    path = request.url.path
+    for name, value in request.path_params.items():
+        path = path.replace(f"/{value}", f"/{{{name}}}", 1)
+    return path
+
 for router in get_routers():
     app.include_router(router)
@@ -0,0 +1,33 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+from libs.services.vector_service import CollectionNotFound, InvalidCollectionName, get_chunk, resolve_collection
+from libs.structures.chunks import ChunkDetail
+
+router = APIRouter(tags=["chunks"])
+
+@router.get("/{chunk_id}", response_model=ChunkDetail)
+def get_chunk_detail(chunk_id: str, collection: Optional[str] = None):
+    try:
+        collection = resolve_collection(collection)
+        chunk = get_chunk(chunk_id, collection)
+    except InvalidCollectionName as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CollectionNotFound as e:
+        raise HTTPException(status_code=404, detail=f"Collection not found: {e}")
+    if chunk is None:
+        raise HTTPException(status_code=404, detail="Chunk not found")
+
+    return ChunkDetail(
+        chunk_id=chunk.id,
+        collection=collection,
+        source=chunk.metadata.get("source"),
+        document_id=chunk.metadata.get("document_id"),
+        page_start=chunk.metadata.get("page_start"),
+        page_end=chunk.metadata.get("page_end"),
+        chunk_index=chunk.metadata.get("chunk_index"),
+        extraction_backend=chunk.metadata.get("extraction_backend"),
+        extraction_ms=chunk.metadata.get("extraction_ms"),
+        text=chunk.page_content,
+    )
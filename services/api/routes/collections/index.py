@@ -0,0 +1,86 @@
+import os
+
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+from typing import List
+
+from libs.providers.snapshot_file import InvalidSnapshot
+from libs.services.snapshot_service import (
+    CollectionAlreadyExists,
+    EmbeddingModelMismatch,
+    compact_collection,
+    export_collection_file,
+    import_collection,
+)
+from libs.services.vector_service import (
+    CollectionNotFound,
+    InvalidCollectionName,
+    collection_exists,
+    drop_collection,
+    get_collection_stats,
+    list_collections,
+    resolve_collection,
+)
+from libs.structures.collections import CollectionCompaction, CollectionSnapshot, CollectionStats
+from libs.utils.envs import SnapshotQuantization
+
+router = APIRouter(tags=["collections"])
+
+@router.get("/", response_model=List[CollectionStats])
+def get_collections():
+    return list_collections()
+
+
+@router.get("/{name}", response_model=CollectionStats)
+def get_collection(name: str):
+    if not collection_exists(_resolve(name)):
+        raise HTTPException(status_code=404, detail="Collection not found")
+    return get_collection_stats(name)
+
+
+@router.delete("/{name}", status_code=204)
+def delete_collection(name: str):
+    if not drop_collection(_resolve(name)):
+        raise HTTPException(status_code=404, detail="Collection not found")
+
+
+@router.get("/{name}/export")
+def download_snapshot(name: str, quantization: SnapshotQuantization = Query(SnapshotQuantization.NONE)):
+    try:
+        path = export_collection_file(_resolve(name), quantization)
+    except CollectionNotFound:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    return FileResponse(
+        path,
+        media_type="application/octet-stream",
+        filename=f"{name}.ragsnap",
+        background=BackgroundTask(os.remove, path),
+    )
+
+
+@router.post("/{name}/import", response_model=CollectionSnapshot, status_code=201)
+def upload_snapshot(name: str, file: UploadFile = File(...)):
+    try:
+        return import_collection(file.file, _resolve(name))
+    except InvalidSnapshot as e:
+        raise HTTPException(status_code=400, detail=f"Invalid snapshot: {e}")
+    except EmbeddingModelMismatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except CollectionAlreadyExists:
+        raise HTTPException(status_code=409, detail="Collection already exists")
+
+
+@router.post("/{name}/compact", response_model=CollectionCompaction)
+def compact(name: str):
+    try:
+        return compact_collection(_resolve(name))
+    except CollectionNotFound:
+        raise HTTPException(status_code=404, detail="Collection not found")
+
+
+def _resolve(name: str) -> str:
+    try:
+        return resolve_collection(name)
+    except InvalidCollectionName as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,11 +1,75 @@
-from fastapi import APIRouter, UploadFile, File
-from typing import List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from typing import List, Optional
+from uuid import UUID
 
-from libs.services.document_service import process_documents
-from libs.structures.documents import DocumentUploadResponse
+from libs.services.document_service import delete_document, get_document, list_documents, process_documents
+from libs.services.ingestion_service import IngestionQueueFull, get_job, list_jobs, submit_job
+from libs.services.vector_service import CollectionNotFound, InvalidCollectionName
+from libs.structures.documents import DocumentDetail, DocumentRecord, DocumentUploadResponse, IngestionJob
 
 router = APIRouter(tags=["documents"])
 
 @router.post("/", response_model=DocumentUploadResponse)
-def store(files: List[UploadFile] = File(...)):
-    return process_documents(files)
+def store(files: List[UploadFile] = File(...), collection: Optional[str] = Query(None)):
+    try:
+        return process_documents(files, collection)
+    except InvalidCollectionName as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/jobs", response_model=IngestionJob, status_code=202)
+def submit_ingestion_job(files: List[UploadFile] = File(...), collection: Optional[str] = Query(None)):
+    try:
+        return submit_job(files, collection)
+    except InvalidCollectionName as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except IngestionQueueFull as e:
+        raise HTTPException(status_code=429, detail=f"Ingestion queue is full, try again later: {e}", headers={"Retry-After": "30"})
+
+
+@router.get("/jobs", response_model=List[IngestionJob])
+def get_ingestion_jobs():
+    return list_jobs()
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJob)
+def get_ingestion_job(job_id: UUID):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/", response_model=List[DocumentRecord])
+def get_documents(
+    collection: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+):
+    try:
+        return list_documents(collection, limit, offset)
+    except InvalidCollectionName as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{document_id}", response_model=DocumentDetail)
+def get_document_detail(document_id: UUID, collection: Optional[str] = Query(None)):
+    try:
+        document = get_document(document_id, collection)
+    except InvalidCollectionName as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if document is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return document
+
+
+@router.delete("/{document_id}", status_code=204)
+def delete_document_by_id(document_id: UUID, collection: Optional[str] = Query(None)):
+    try:
+        deleted = delete_document(document_id, collection)
+    except InvalidCollectionName as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CollectionNotFound as e:
+        raise HTTPException(status_code=404, detail=f"Collection not found: {e}")
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Document not found")
@@ -1,9 +1,18 @@
 from fastapi import APIRouter, Security
+from fastapi.responses import JSONResponse
 from uuid import UUID
 from typing import List
 
+from libs.services.warmup_service import get_warmup_status
+
 router = APIRouter(tags=['health'])
 
 @router.get("/")
 def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@router.get("/ready")
+def ready():
+    warmup = get_warmup_status()
+    status_code = 503 if warmup["status"] in ("pending", "running") else 200
+    return JSONResponse(status_code=status_code, content={"warmup": warmup})
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from libs.utils.metrics import render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -1,17 +1,84 @@
+import json
+
 from fastapi import APIRouter, HTTPException
-from libs.services.question_service import process_question
-from libs.structures.question import QuestionRequest, QuestionResponse
+from fastapi.responses import StreamingResponse
+from loguru import logger
+
+from libs.services.question_service import aprocess_question, astream_question, astream_questions
+from libs.services.vector_service import CollectionNotFound, InvalidCollectionName, resolve_collection
+from libs.structures.question import BatchQuestionRequest, QuestionRequest, QuestionResponse
+from libs.utils.envs import BATCH_QUESTION_MAX
 
 router = APIRouter(tags=["question"])
 
 @router.post("/", response_model=QuestionResponse)
-def ask_question(request: QuestionRequest):
+async def ask_question(request: QuestionRequest):
     try:
-        answer, references = process_question(request.question)
+        answer, references, usage = await aprocess_question(request.question, request.collection)
         
         return QuestionResponse(
             answer=answer,
-            references=references
+            references=references,
+            **usage,
         )
+    except InvalidCollectionName as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CollectionNotFound as e:
+        raise HTTPException(status_code=404, detail=f"Collection not found: {e}")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing question: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error processing question: {str(e)}")
+
+
+@router.post("/stream")
+async def ask_question_stream(request: QuestionRequest):
+    # nome inválido é recusado antes de abrir o stream; collection inexistente vira evento de erro
+    try:
+        resolve_collection(request.collection)
+    except InvalidCollectionName as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        try:
+            async for event, data in astream_question(request.question, request.collection):
+                yield _sse(event, data)
+        except CollectionNotFound as e:
+            yield _sse("error", {"detail": f"Collection not found: {e}"})
+        except Exception as e:
+            logger.error(f"Erro no streaming da pergunta: {e}")
+            yield _sse("error", {"detail": f"Error processing question: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/batch")
+async def ask_questions_batch(request: BatchQuestionRequest):
+    if len(request.questions) > BATCH_QUESTION_MAX:
+        raise HTTPException(status_code=413, detail=f"Too many questions: the limit is {BATCH_QUESTION_MAX} per request")
+    try:
+        resolve_collection(request.collection)
+    except InvalidCollectionName as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        try:
+            async for event, data in astream_questions(request.questions, request.collection):
+                yield _sse(event, data)
+        except CollectionNotFound as e:
+            yield _sse("error", {"detail": f"Collection not found: {e}"})
+        except Exception as e:
+            logger.error(f"Erro no lote de perguntas: {e}")
+            yield _sse("error", {"detail": f"Error processing questions: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,29 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+
+from libs.providers.http_clients import get_pool_stats
+from libs.services.answer_cache_service import get_answer_cache
+from libs.services.vector_service import (
+    InvalidCollectionName,
+    get_collection_stats,
+    get_embedding_cache_stats,
+    get_retrieval_cache_stats,
+    resolve_collection,
+)
+
+router = APIRouter(tags=["stats"])
+
+@router.get("/")
+def stats(collection: Optional[str] = None):
+    try:
+        collection = resolve_collection(collection)
+    except InvalidCollectionName as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "collection": get_collection_stats(collection),
+        "embedding_cache": get_embedding_cache_stats(),
+        "retrieval_cache": get_retrieval_cache_stats(),
+        "answer_cache": answer_cache.stats() if (answer_cache := get_answer_cache(collection)) else None,
+        "provider_http": get_pool_stats(),
+    }
@@ -1,11 +1,24 @@
 import streamlit as st
 import requests
 import os
+import time
+import json
 
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 
 DOCUMENTS_ENDPOINT = f"{API_BASE_URL}/documents"
+JOBS_ENDPOINT = f"{API_BASE_URL}/documents/jobs"
 QUESTION_ENDPOINT = f"{API_BASE_URL}/question"
+QUESTION_STREAM_ENDPOINT = f"{API_BASE_URL}/question/stream"
+
+
+def stream_events(response):
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: ") and event:
+            yield event, json.loads(line[len("data: "):])
 
 st.set_page_config(
     page_title="RAG - PDF Q&A",
@@ -27,18 +40,29 @@ if st.sidebar.button("Enviar documentos"):
     if not uploaded_files:
         st.sidebar.error("Selecione ao menos um arquivo PDF.")
     else:
-        with st.spinner("Processando documentos..."):
-            files = [("files", (f.name, f.read(), "application/pdf")) for f in uploaded_files]
-
-            response = requests.post(
-                DOCUMENTS_ENDPOINT,
-                files=files
-            )
-
-        if response.status_code == 200:
-            data = response.json()
-            st.sidebar.success("Documentos enviados com sucesso! ✅")
-            st.sidebar.json(data)
+        files = [("files", (f.name, f.read(), "application/pdf")) for f in uploaded_files]
+        response = requests.post(
+            JOBS_ENDPOINT,
+            files=files
+        )
+
+        if response.status_code == 202:
+            job = response.json()
+            with st.spinner("Processando documentos..."):
+                progress = st.sidebar.progress(0.0)
+                while job["status"] in ("queued", "running"):
+                    time.sleep(1)
+                    job = requests.get(f"{JOBS_ENDPOINT}/{job['id']}").json()
+                    done = sum(1 for f in job["files"] if f["status"] not in ("pending", "processing"))
+                    progress.progress(done / len(job["files"]))
+
+            if job["status"] == "completed":
+                st.sidebar.success("Documentos enviados com sucesso! ✅")
+            else:
+                st.sidebar.error("Erro ao processar documentos.")
+            st.sidebar.json(job)
+        elif response.status_code == 429:
+            st.sidebar.warning("Fila de processamento cheia, tente novamente em instantes.")
         else:
             st.sidebar.error(f"Erro ao enviar documentos: {response.text}")
 
@@ -50,25 +74,50 @@ if st.button("Perguntar"):
     if not question.strip():
         st.error("Digite uma pergunta primeiro.")
     else:
-        with st.spinner("Buscando resposta..."):
-            response = requests.post(
-                QUESTION_ENDPOINT,
-                json={"question": question}
-            )
+        response = requests.post(
+            QUESTION_STREAM_ENDPOINT,
+            json={"question": question},
+            stream=True
+        )
 
         if response.status_code == 200:
-            data = response.json()
+            result = {"references": [], "done": None, "error": None}
+
+            def tokens():
+                for event, data in stream_events(response):
+                    if event == "token":
+                        yield data["content"]
+                    elif event == "references":
+                        result["references"] = data["references"]
+                    elif event == "done":
+                        result["done"] = data
+                    elif event == "error":
+                        result["error"] = data["detail"]
 
             st.subheader("💬 Resposta")
-            st.write(data.get("answer", "Sem resposta"))
+            with st.spinner("Buscando resposta..."):
+                st.write_stream(tokens())
+
+            if result["error"]:
+                st.error(f"Erro ao buscar resposta: {result['error']}")
+            elif result["done"]:
+                st.caption(
+                    f"Primeiro token em {result['done']['time_to_first_token_ms']} ms · "
+                    f"total {result['done']['total_ms']} ms"
+                    + (" · cache" if result["done"]["cached"] else "")
+                )
 
             st.subheader("📚 Referências")
-            references = data.get("references", [])
+            references = result["references"]
 
             if references:
                 for i, ref in enumerate(references, start=1):
-                    with st.expander(f"Referência {i}"):
-                        st.write(ref)
+                    pages = ref["page_start"] if ref["page_start"] == ref["page_end"] else f"{ref['page_start']}-{ref['page_end']}"
+                    title = f"Referência {i} · {ref['source']}" + (f" · p. {pages}" if ref["page_start"] else "")
+                    with st.expander(title):
+                        st.write(ref["snippet"])
+                        # texto completo sob demanda em GET /chunks/{chunk_id}
+                        st.caption(f"chunk {ref['chunk_id']} · score {ref['score']}")
             else:
                 st.info("Nenhuma referência retornada.")
         else: